@@ -119,6 +119,68 @@ GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 ELEVEN_LABS_API_KEY = config('ELEVEN_LABS_API_KEY', default='')
 ELEVEN_LABS_VOICE_ID = config('ELEVEN_LABS_VOICE_ID', default='21m00Tcm4TlvDq8ikWAM')
 
+# LLM model tiering (task -> tier -> model); see api/utils/model_routing.py
+LLM_MODEL_TIERS = {
+    'fast': config('LLM_FAST_MODEL', default='gemini-2.5-flash-lite'),
+    'standard': config('LLM_STANDARD_MODEL', default='gemini-2.5-flash'),
+    'latest': config('LLM_LATEST_MODEL', default='gemini-flash-latest'),
+}
+# Per-task overrides of model_routing.DEFAULT_TASK_ROUTES, e.g. {'hint': 'local'}
+LLM_TASK_ROUTES = {}
+# Latency-aware fallback: primary -> secondary model, and degradation thresholds
+LLM_FALLBACK_MODELS = {
+    'gemini-flash-latest': 'gemini-2.5-flash',
+    'gemini-2.5-flash': 'gemini-2.5-flash-lite',
+}
+LLM_FALLBACK_LATENCY_THRESHOLD = config('LLM_FALLBACK_LATENCY_THRESHOLD', default=30.0, cast=float)
+LLM_FALLBACK_ERROR_RATE_THRESHOLD = config('LLM_FALLBACK_ERROR_RATE_THRESHOLD', default=0.5, cast=float)
+LLM_FALLBACK_PROBE_INTERVAL = config('LLM_FALLBACK_PROBE_INTERVAL', default=30.0, cast=float)
+# Prompt prefix caching (Gemini context cache), per-turn token metrics and hedged interactive turns
+GEMINI_CONTEXT_CACHE = config('GEMINI_CONTEXT_CACHE', default=False, cast=bool)
+LLM_CACHE_METRICS = config('LLM_CACHE_METRICS', default=False, cast=bool)
+LLM_HEDGING = config('LLM_HEDGING', default=False, cast=bool)
+
+# Evaluation cache (evaluate_candidate results keyed by inputs + model + prompt version)
+EVALUATION_CACHE_ENABLED = config('EVALUATION_CACHE_ENABLED', default=True, cast=bool)
+EVALUATION_CACHE_MAX_ENTRIES = config('EVALUATION_CACHE_MAX_ENTRIES', default=1000, cast=int)
+EVALUATION_CACHE_TTL_DAYS = config('EVALUATION_CACHE_TTL_DAYS', default=30, cast=int)
+
+# Behavioral interviews: turns kept verbatim in prompts (0 = full history), and
+# evaluating answers concurrently with generating the next question
+BEHAVIORAL_HISTORY_TURNS = config('BEHAVIORAL_HISTORY_TURNS', default=6, cast=int)
+BEHAVIORAL_SPLIT_TURNS = config('BEHAVIORAL_SPLIT_TURNS', default=False, cast=bool)
+
+# Behavioral session store (write-behind of split-mode evaluations)
+BEHAVIORAL_SESSION_FLUSH_INTERVAL = config('BEHAVIORAL_SESSION_FLUSH_INTERVAL', default=0.5, cast=float)
+BEHAVIORAL_SESSION_BATCH_SIZE = config('BEHAVIORAL_SESSION_BATCH_SIZE', default=50, cast=int)
+
+# Opening question pool (pre-generated first questions per job description + resume profile bucket)
+QUESTION_POOL_ENABLED = config('QUESTION_POOL_ENABLED', default=True, cast=bool)
+QUESTION_POOL_TARGET = config('QUESTION_POOL_TARGET', default=8, cast=int)
+QUESTION_POOL_LOW_WATERMARK = config('QUESTION_POOL_LOW_WATERMARK', default=3, cast=int)
+
+# DSA interviews: messages kept after the pinned interviewer prompt (0 = full history),
+# and the hidden analysis cache (entries, lifetime in seconds)
+DSA_HISTORY_MESSAGES = config('DSA_HISTORY_MESSAGES', default=12, cast=int)
+DSA_ANALYSIS_CACHE_SIZE = config('DSA_ANALYSIS_CACHE_SIZE', default=2048, cast=int)
+DSA_ANALYSIS_CACHE_TTL = config('DSA_ANALYSIS_CACHE_TTL', default=86400.0, cast=float)
+
+# DSA question bank (banked questions per ROLE_HINTS category and difficulty)
+DSA_QUESTION_BANK_ENABLED = config('DSA_QUESTION_BANK_ENABLED', default=True, cast=bool)
+DSA_QUESTION_BANK_TARGET = config('DSA_QUESTION_BANK_TARGET', default=20, cast=int)
+DSA_QUESTION_BANK_BATCH_SIZE = config('DSA_QUESTION_BANK_BATCH_SIZE', default=3, cast=int)
+DSA_QUESTION_BANK_MAX_SIMILARITY = config('DSA_QUESTION_BANK_MAX_SIMILARITY', default=0.5, cast=float)
+
+# DSA session log (background writer with rotation; compression: '', 'gzip' or 'zstd')
+SESSION_LOG_DIR = config('SESSION_LOG_DIR', default=str(BASE_DIR / 'session_logs'))
+SESSION_LOG_QUEUE_SIZE = config('SESSION_LOG_QUEUE_SIZE', default=1000, cast=int)
+SESSION_LOG_BATCH_SIZE = config('SESSION_LOG_BATCH_SIZE', default=100, cast=int)
+SESSION_LOG_FLUSH_INTERVAL = config('SESSION_LOG_FLUSH_INTERVAL', default=1.0, cast=float)
+SESSION_LOG_ENQUEUE_TIMEOUT = config('SESSION_LOG_ENQUEUE_TIMEOUT', default=0.05, cast=float)
+SESSION_LOG_MAX_BYTES = config('SESSION_LOG_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+SESSION_LOG_ROTATE_SECONDS = config('SESSION_LOG_ROTATE_SECONDS', default=86400, cast=int)
+SESSION_LOG_COMPRESSION = config('SESSION_LOG_COMPRESSION', default='')
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
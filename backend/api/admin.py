@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import JobDescription, InterviewReport
+from .models import JobDescription, InterviewReport, ConversationTurn, EvaluationCacheEntry, BehavioralSession, BehavioralEvaluation, OpeningQuestion, DSAQuestion
 
 @admin.register(JobDescription)
 class JobDescriptionAdmin(admin.ModelAdmin):
@@ -17,7 +17,7 @@ class InterviewReportAdmin(admin.ModelAdmin):
     ]
     list_filter = ['decision', 'overall_rating', 'job_description', 'interview_date', 'created_at']
     search_fields = ['candidate_name', 'candidate_email', 'position', 'job_description__title']
-    readonly_fields = ['id', 'created_at', 'updated_at', 'interview_date']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'interview_date', 'conversation']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -42,3 +42,43 @@ class InterviewReportAdmin(admin.ModelAdmin):
             'fields': ('id', 'interview_date', 'created_at', 'updated_at')
         }),
     )
+
+@admin.register(ConversationTurn)
+class ConversationTurnAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report', 'position', 'created_at']
+    readonly_fields = ['report', 'position', 'created_at']
+    ordering = ['report', 'position']
+
+@admin.register(EvaluationCacheEntry)
+class EvaluationCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['cache_key', 'model_name', 'prompt_version', 'hit_count', 'created_at', 'last_accessed_at']
+    list_filter = ['model_name', 'prompt_version']
+    readonly_fields = ['cache_key', 'created_at', 'last_accessed_at', 'hit_count']
+    ordering = ['-last_accessed_at']
+
+@admin.register(BehavioralSession)
+class BehavioralSessionAdmin(admin.ModelAdmin):
+    list_display = ['report', 'version', 'turns', 'evaluated', 'summarized_turns', 'updated_at']
+    readonly_fields = ['report', 'updated_at']
+    ordering = ['-updated_at']
+
+@admin.register(BehavioralEvaluation)
+class BehavioralEvaluationAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report', 'turn', 'status', 'updated_at']
+    list_filter = ['status']
+    readonly_fields = ['report', 'turn', 'created_at', 'updated_at']
+    ordering = ['-created_at']
+
+@admin.register(OpeningQuestion)
+class OpeningQuestionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'job_description', 'profile_bucket', 'served_at', 'created_at']
+    list_filter = ['profile_bucket', 'job_description']
+    readonly_fields = ['question_hash', 'created_at']
+    ordering = ['-created_at']
+
+@admin.register(DSAQuestion)
+class DSAQuestionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'role', 'difficulty', 'served_count', 'last_served_at', 'created_at']
+    list_filter = ['role', 'difficulty']
+    readonly_fields = ['question_hash', 'served_count', 'last_served_at', 'created_at']
+    ordering = ['-created_at']
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Compile the prompt registry at startup so a malformed prompt fails fast
+        from .utils import prompts  # noqa: F401
@@ -0,0 +1,107 @@
+"""
+Django management command to benchmark LLM JSON extraction.
+
+Runs the shared extractor in api.utils.llm_json against a corpus of malformed
+responses collected from Gemini, alongside the legacy per-module parsers it
+replaced, and reports success rate and per-call latency for each.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.utils.llm_json import LLMJSONError, parse_llm_json
+
+# (schema, raw response) pairs; every entry contains a recoverable object.
+MALFORMED_CORPUS = [
+    ("hint", '{"hint": "Think about what happens when the input is empty."}'),
+    ("hint", '```json\n{"hint": "Consider a hash map for lookups."}\n```'),
+    ("hint", '```\n{"hint": "Start from the smallest case."}\n```\nLet me know if that helps!'),
+    ("rephrase", 'Sure! Here is the rephrased question:\n{"rephrased_question": "How did you handle a tough deadline?"}'),
+    ("rephrase", '{"rephrased_question": "Tell me about a project you led.",}'),
+    ("interview_question", '```json\n{\n  "question": "Describe a time you\nresolved a conflict.",\n  "type": "behavioral",\n  "difficulty": "easy",\n  "rationale": "warm-up"\n}\n```'),
+    ("interview_question", 'Here you go: {"question": "What is {x} in your API design?", "type": "technical", "difficulty": "medium"} Hope this works.'),
+    ("evaluation_turn", '{"evaluation": {"score": "7", "strengths": ["clear"], "improvements": [], "reason": "ok"}, "coach_tip": "Quantify impact."}'),
+    ("evaluation_turn", '```json\n{"evaluation": {"score": 6, "strengths": ["structure",], "improvements": ["depth"], "reason": "fine"}, "coach_tip": "Use STAR."}\n```'),
+    ("evaluation_and_next_question", '{"evaluation": {"score": 8, "strengths": [], "improvements": [], "reason": "good"}, "coach_tip": "", "next_question": {"question": "How would you scale it?", "type": "technical", "difficulty": "hard", "rationale": "depth"}}\n{"note": "extra object"}'),
+    ("hidden_analysis", '```json\n{"approach_summary": "two pointers", "time_complexity": "O(n)", "space_complexity": "O(1)", "classification": "optimized", "potential_improvements": [], "edge_cases": ["empty array"]}\n```'),
+    ("hidden_analysis", 'The analysis is below.\n\n{"approach_summary": "nested loops", "time_complexity": "O(n^2)", "classification": "brute-force"}'),
+    ("dsa_question", '```json\n{\n"question_title": "Merge Intervals",\n"problem_statement": "Given intervals like [1,3] and {2,6}...\nDescribe your algorithm and provide pseudocode to solve this problem.",\n"difficulty": "medium",\n"expected_topics": ["sorting"],\n"example_input_output": {"input": "[[1,3],[2,6]]", "output": "[[1,6]]"}\n}\n```'),
+    ("dsa_question", '{"question_title": "Top K", "problem_statement": "Find the k most frequent words.", "difficulty": "medium", "expected_topics": ["heap", "hashmap"], "example_input_output": {"input": "a b a", "output": "a"}} ```'),
+    ("final_feedback", '```json\n{"overall_score": 7, "overall_assessment": "Solid.", "strengths": ["a"], "areas_for_improvement": ["b"], "technical_proficiency": {"score": 7, "comment": "ok"}, "communication_skills": {"score": 8, "comment": "ok"}, "problem_solving": {"score": 6, "comment": "ok"}, "key_focus_areas": ["c"], "recommendation": "Hire"}\n```\n\nRemember to follow up.'),
+    ("candidate_evaluation", 'Here is my evaluation:\n```json\n{"evaluation_metrics": [{"metric": "Technical Depth", "score": 5, "feedback": "thin", "evidence": "Candidate stated: \'I used a proxy server\'"}], "hiring_recommendation": "No Hire", "red_flags": ["short answers"]}\n```'),
+    ("candidate_evaluation", '{"evaluation_metrics": [{"metric": "JD Alignment", "score": 6, "feedback": "partial", "evidence": "React {frontend}"},], "hiring_recommendation": "Hire", "red_flags": [],}'),
+]
+
+
+def legacy_safe_json(text):
+    """The fence/brace-slicing parser previously duplicated in both interview engines."""
+    t = text.strip()
+    if t.startswith("```"):
+        parts = t.split("```")
+        t = parts[1] if len(parts) >= 3 else t.strip("`")
+    try:
+        return json.loads(t)
+    except json.JSONDecodeError:
+        t = t.replace("\r", " ").replace("\n", " ").strip()
+        start, end = t.find("{"), t.rfind("}")
+        if start != -1 and end > start:
+            return json.loads(t[start:end + 1])
+        raise
+
+
+class Command(BaseCommand):
+    """Management command to benchmark LLM JSON parsing."""
+
+    help = 'Benchmark shared LLM JSON extraction against the legacy parsers'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Number of passes over the corpus for timing',
+        )
+
+    def _run(self, parse):
+        failures = 0
+        for schema, raw in MALFORMED_CORPUS:
+            try:
+                parse(raw, schema)
+            except ValueError:
+                failures += 1
+        return failures
+
+    def _time(self, parse, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self._run(parse)
+        elapsed = time.perf_counter() - start
+        return elapsed / (iterations * len(MALFORMED_CORPUS)) * 1e6
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        parsers = {
+            'legacy': lambda raw, schema: legacy_safe_json(raw),
+            'llm_json': parse_llm_json,
+        }
+
+        self.stdout.write(f'Corpus: {len(MALFORMED_CORPUS)} responses, {iterations} iterations')
+        for name, parse in parsers.items():
+            failures = self._run(parse)
+            per_call_us = self._time(parse, iterations)
+            style = self.style.SUCCESS if failures == 0 else self.style.WARNING
+            self.stdout.write(style(
+                f'  {name:<10} failures: {failures}/{len(MALFORMED_CORPUS)}  '
+                f'avg: {per_call_us:.1f} us/response'
+            ))
+
+        remaining = self._run(parse_llm_json)
+        if remaining:
+            for schema, raw in MALFORMED_CORPUS:
+                try:
+                    parse_llm_json(raw, schema)
+                except LLMJSONError as e:
+                    self.stdout.write(self.style.ERROR(f'  [{schema}] {e}'))
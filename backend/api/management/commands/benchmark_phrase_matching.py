@@ -0,0 +1,150 @@
+"""
+Django management command to benchmark intent and closing phrase matching.
+
+Runs the compiled phrase matchers used by the interview engines
+(api.utils.phrase_matcher) against a labelled corpus of candidate replies and
+interviewer messages, alongside the legacy substring scans they replaced, and
+reports accuracy and per-text latency for each. Misclassifications by the
+compiled matchers fail the command.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.behavioral_interview import CLARIFY_PHRASES, EXTEND_PHRASES, HINT_PHRASES, INTENT_MATCHER
+from api.utils.dsa_interview import (
+    CANDIDATE_COMPLETION_PHRASES,
+    CANDIDATE_CONFIDENCE_PHRASES,
+    CANDIDATE_EXIT_PHRASES,
+    CANDIDATE_PHRASE_MATCHER,
+    INTERVIEWER_CLOSE_MATCHER,
+    INTERVIEWER_CLOSE_PHRASES,
+)
+
+MATCHERS = {
+    'dsa_candidate': CANDIDATE_PHRASE_MATCHER,
+    'dsa_interviewer': INTERVIEWER_CLOSE_MATCHER,
+    'behavioral': INTENT_MATCHER,
+}
+
+LEGACY_PHRASES = {
+    'dsa_candidate': {
+        'giveup': CANDIDATE_EXIT_PHRASES,
+        'confident': CANDIDATE_CONFIDENCE_PHRASES,
+        'completed': CANDIDATE_COMPLETION_PHRASES,
+    },
+    'dsa_interviewer': {'close': INTERVIEWER_CLOSE_PHRASES},
+    'behavioral': {'clarify': CLARIFY_PHRASES, 'hint': HINT_PHRASES, 'extend': EXTEND_PHRASES},
+}
+
+# (matcher, text, expected intents)
+ACCURACY_CORPUS = [
+    ('dsa_candidate', "I'm done.", {'completed'}),
+    ('dsa_candidate', 'I’m done with the pseudocode', {'completed'}),
+    ('dsa_candidate', 'All   DONE', {'completed'}),
+    ('dsa_candidate', 'I abandoned the recursive version and used a stack', set()),
+    ('dsa_candidate', 'The loop is unfinished until the pointers meet', set()),
+    ('dsa_candidate', 'Maybe a heap would be better here', set()),
+    ('dsa_candidate', 'I would stop the scan once the window is valid', {'giveup'}),
+    ('dsa_candidate', 'The loop stops when left passes right', set()),
+    ('dsa_candidate', 'It exits early on an empty input', set()),
+    ('dsa_candidate', "Honestly I don't know how to make it faster", {'giveup'}),
+    ('dsa_candidate', 'I give up', {'giveup'}),
+    ('dsa_candidate', "I'm stuck on the merge step", {'giveup'}),
+    ('dsa_candidate', 'The input is a list of unique tokens', set()),
+    ('dsa_candidate', 'Yeah now I can, I got it!', {'confident'}),
+    ('dsa_candidate', 'That makes sense now, I can do it', {'confident'}),
+    ('dsa_candidate', 'I got it, and I am done', {'confident', 'completed'}),
+    ('dsa_candidate', 'Not sure, I think that is it', {'giveup', 'completed'}),
+    ('dsa_candidate', 'We use a completed-set to skip visited nodes', {'completed'}),
+    ('dsa_candidate', 'Each task is marked completedAt when it runs', set()),
+    ('dsa_candidate', "Honestly, I'm giving up on this one", {'giveup'}),
+    ('dsa_candidate', "I've finished the pseudocode", {'completed'}),
+    ('dsa_candidate', 'I have completed both passes', {'completed'}),
+    ('dsa_interviewer', 'Well done. This concludes the interview.', {'close'}),
+    ('dsa_interviewer', 'Thank you, that is all for today. Goodbye!', {'close'}),
+    ('dsa_interviewer', 'Thanks for your time today. That is all.', {'close'}),
+    ('dsa_interviewer', 'That concludes our session, well done.', {'close'}),
+    ('dsa_interviewer', 'Can you walk me through the byte-level encoding?', set()),
+    ('dsa_interviewer', 'How would the algorithm behave if the input were unsorted?', set()),
+    ('dsa_interviewer', 'What is the time complexity of the bypass path?', set()),
+    ('dsa_interviewer', "Good job on the base case. What about negative numbers?", {'close'}),
+    ('behavioral', 'Could you rephrase that?', {'clarify'}),
+    ('behavioral', "Sorry, I didn’t understand the question", {'clarify'}),
+    ('behavioral', 'Can I get a hint?', {'hint'}),
+    ('behavioral', 'Can I get some hints?', {'hint'}),
+    ('behavioral', 'any clues?', {'hint'}),
+    ('behavioral', 'A couple of nudges would help', {'hint'}),
+    ('behavioral', 'I helped the team migrate our CI pipeline', set()),
+    ('behavioral', 'The guidelines were unclear so I wrote a helpful runbook', set()),
+    ('behavioral', 'My manager had a repeatable process for incidents', set()),
+    ('behavioral', 'Can you elaborate on the scope?', {'extend'}),
+    ('behavioral', 'Could you expand on what you mean by ownership?', {'extend'}),
+    ('behavioral', 'Can you explain more about the team?', {'clarify', 'extend'}),
+    ('behavioral', 'I led the rollout and we shipped two weeks early', set()),
+]
+
+
+def legacy_match(name, text):
+    """The substring scans previously inlined in both interview engines."""
+    lowered = (text or '').lower().strip()
+    return {
+        intent for intent, phrases in LEGACY_PHRASES[name].items()
+        if any(p in lowered for p in phrases)
+    }
+
+
+class Command(BaseCommand):
+    """Management command to benchmark phrase matching."""
+
+    help = 'Benchmark compiled phrase matchers against the legacy substring scans'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Number of passes over the corpus for timing',
+        )
+
+    def _misses(self, match):
+        return [
+            (name, text, expected, match(name, text))
+            for name, text, expected in ACCURACY_CORPUS
+            if match(name, text) != expected
+        ]
+
+    def _time(self, match, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for name, text, _ in ACCURACY_CORPUS:
+                match(name, text)
+        elapsed = time.perf_counter() - start
+        return elapsed / (iterations * len(ACCURACY_CORPUS)) * 1e6
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        matchers = {
+            'legacy': legacy_match,
+            'compiled': lambda name, text: set(MATCHERS[name].match(text)),
+        }
+
+        self.stdout.write(f'Corpus: {len(ACCURACY_CORPUS)} texts, {iterations} iterations')
+        for label, match in matchers.items():
+            misses = self._misses(match)
+            per_text_us = self._time(match, iterations)
+            style = self.style.SUCCESS if not misses else self.style.WARNING
+            self.stdout.write(style(
+                f'  {label:<10} correct: {len(ACCURACY_CORPUS) - len(misses)}/{len(ACCURACY_CORPUS)}  '
+                f'avg: {per_text_us:.1f} us/text'
+            ))
+
+        misses = self._misses(matchers['compiled'])
+        for name, text, expected, got in misses:
+            self.stdout.write(self.style.ERROR(
+                f'  [{name}] {text!r}: expected {sorted(expected)}, got {sorted(got)}'
+            ))
+        if misses:
+            raise CommandError(f'{len(misses)} texts misclassified by the compiled matchers')
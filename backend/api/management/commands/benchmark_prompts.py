@@ -0,0 +1,75 @@
+"""
+Django management command to benchmark prompt rendering.
+
+Renders every prompt in the registry (api.utils.prompts) with synthetic
+values and reports the per-render latency, alongside building and formatting
+the same messages through LangChain's ChatPromptTemplate as the interview
+engines did before the registry. Also checks that both produce the same text
+and reports the one-off compile cost of each prompt.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.prompts import PROMPTS, Prompt
+
+try:
+    from langchain.prompts import ChatPromptTemplate
+except ImportError:
+    ChatPromptTemplate = None
+
+
+def _langchain_render(prompt, values):
+    messages = ChatPromptTemplate.from_messages(list(prompt.messages)).format_messages(**values)
+    return [m.content for m in messages]
+
+
+def _per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    """Management command to benchmark prompt rendering."""
+
+    help = 'Benchmark rendering of the registered prompts'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--iterations', type=int, default=2000, help='Renders per prompt')
+        parser.add_argument('--value-chars', type=int, default=2000, help='Length of each synthetic placeholder value')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        if iterations < 1:
+            raise CommandError('--iterations must be at least 1')
+        if ChatPromptTemplate is None:
+            self.stdout.write(self.style.WARNING('langchain is not installed; timing the registry only'))
+
+        self.stdout.write(f'{len(PROMPTS)} prompts, {iterations} iterations, {options["value_chars"]}-char values')
+        self.stdout.write(f'  {"prompt":<52} {"compile":>9} {"registry":>9} {"langchain":>10}')
+        mismatches = []
+        totals = [0.0, 0.0]
+        for name, prompt in PROMPTS.items():
+            values = {field: (field + ' ') * (options['value_chars'] // (len(field) + 1)) for field in prompt.fields}
+            compile_us = _per_call_us(lambda: Prompt(name, prompt.messages, prompt.revision), max(iterations // 10, 1))
+            registry_us = _per_call_us(lambda: prompt.render(**values), iterations)
+            totals[0] += registry_us
+            langchain = '-'
+            if ChatPromptTemplate is not None:
+                langchain_us = _per_call_us(lambda: _langchain_render(prompt, values), iterations)
+                totals[1] += langchain_us
+                langchain = f'{langchain_us:.1f}'
+                if [text for _, text in prompt.render(**values)] != _langchain_render(prompt, values):
+                    mismatches.append(name)
+            self.stdout.write(f'  {prompt.version:<52} {compile_us:>9.1f} {registry_us:>9.1f} {langchain:>10}')
+
+        summary = f'Average render: registry {totals[0] / len(PROMPTS):.1f} us'
+        if ChatPromptTemplate is not None:
+            summary += f', langchain {totals[1] / len(PROMPTS):.1f} us'
+        if mismatches:
+            raise CommandError(f'{summary}; rendered text differs for: {", ".join(mismatches)}')
+        self.stdout.write(self.style.SUCCESS(summary))
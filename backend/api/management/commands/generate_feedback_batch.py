@@ -0,0 +1,153 @@
+"""
+Django management command to (re)generate behavioral feedback in bulk.
+
+Rebuilds each report's behavioral interview from its stored session
+(api.utils.session_store), generates final feedback and writes it to
+InterviewReport.behavioral_report. Reports are processed concurrently under a
+request rate limit; every finished report is appended to a checkpoint file so
+an interrupted run can be resumed with --resume. Progress and throughput are
+reported while running.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from api.models import InterviewReport
+from api.utils.feedback import generate_enhanced_final_feedback
+from api.utils.metrics import percentile
+from api.utils.session_store import session_store
+
+DEFAULT_CHECKPOINT = 'feedback_batch_checkpoint.jsonl'
+PROGRESS_EVERY = 10
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at most ``per_minute`` per minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Command(BaseCommand):
+    """Management command to generate behavioral feedback for many reports."""
+
+    help = 'Generate or regenerate behavioral feedback for many reports concurrently'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--report', action='append', dest='reports', help='Report id (repeatable; default: all eligible)')
+        parser.add_argument('--regenerate', action='store_true', help='Include reports that already have feedback')
+        parser.add_argument('--concurrency', type=int, default=4, help='Reports processed in parallel')
+        parser.add_argument('--rate', type=float, default=60.0, help='Max LLM requests per minute (0 = unlimited)')
+        parser.add_argument('--limit', type=int, default=0, help='Process at most this many reports')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file (JSON lines)')
+        parser.add_argument('--resume', action='store_true', help='Skip reports completed in the checkpoint file')
+        parser.add_argument('--dry-run', action='store_true', help='List the reports that would be processed')
+
+    def _completed(self, path):
+        done = set()
+        if not os.path.exists(path):
+            return done
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line from an interrupted run
+                    continue
+                if entry.get('status') == 'ok':
+                    done.add(entry['report_id'])
+        return done
+
+    def _select(self, options):
+        reports = InterviewReport.objects.filter(behavioral_session__isnull=False)
+        if options['reports']:
+            reports = reports.filter(id__in=options['reports'])
+        if not options['regenerate']:
+            reports = reports.filter(behavioral_report={})
+        report_ids = [str(pk) for pk in reports.order_by('created_at').values_list('id', flat=True)]
+        if options['resume']:
+            done = self._completed(options['checkpoint'])
+            report_ids = [pk for pk in report_ids if pk not in done]
+        if options['limit']:
+            report_ids = report_ids[:options['limit']]
+        return report_ids
+
+    def _process(self, report_id, limiter):
+        start = time.monotonic()
+        try:
+            report = InterviewReport.objects.get(pk=report_id)
+            svc = session_store.load_evaluated(report)
+            if svc is None:
+                raise ValueError('behavioral session could not be loaded')
+            limiter.wait()
+            feedback = generate_enhanced_final_feedback(svc, None, fallback=False)
+            InterviewReport.objects.filter(pk=report_id).update(behavioral_report=feedback)
+            return report_id, 'ok', None, time.monotonic() - start
+        except Exception as e:
+            return report_id, 'error', str(e), time.monotonic() - start
+        finally:
+            close_old_connections()
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+
+        report_ids = self._select(options)
+        total = len(report_ids)
+        self.stdout.write(
+            f"{total} report(s) to process, concurrency {options['concurrency']}, "
+            f"rate {options['rate'] or 'unlimited'}/min"
+        )
+        if options['dry_run']:
+            for report_id in report_ids:
+                self.stdout.write(f'  {report_id}')
+            return
+        if not total:
+            return
+
+        limiter = RateLimiter(options['rate'])
+        latencies, failures = [], 0
+        started = time.monotonic()
+        with open(options['checkpoint'], 'a', encoding='utf-8') as checkpoint, \
+                ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            futures = [executor.submit(self._process, report_id, limiter) for report_id in report_ids]
+            for done, future in enumerate(as_completed(futures), start=1):
+                report_id, status, error, seconds = future.result()
+                checkpoint.write(json.dumps({'report_id': report_id, 'status': status, 'error': error}) + '\n')
+                checkpoint.flush()
+                latencies.append(seconds)
+                if status != 'ok':
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f'  {report_id}: {error}'))
+                if done % PROGRESS_EVERY == 0 or done == total:
+                    elapsed = time.monotonic() - started
+                    rate = done / elapsed * 60 if elapsed else 0.0
+                    eta = (total - done) / (done / elapsed) if done else 0.0
+                    self.stdout.write(f'  {done}/{total} done, {rate:.1f} reports/min, eta {eta:.0f}s')
+
+        elapsed = time.monotonic() - started
+        style = self.style.SUCCESS if failures == 0 else self.style.WARNING
+        self.stdout.write(style(
+            f'Processed {total} report(s) in {elapsed:.1f}s: {total - failures} ok, {failures} failed, '
+            f'{total / elapsed * 60:.1f} reports/min, '
+            f'p50 {percentile(latencies, 0.5):.1f}s, p95 {percentile(latencies, 0.95):.1f}s per report'
+        ))
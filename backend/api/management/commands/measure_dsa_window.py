@@ -0,0 +1,97 @@
+"""
+Django management command to measure DSA conversation turn cost.
+
+Simulates a long DSA interview against a local stand-in for the
+interviewer model and reports, per turn, the history payload sent after
+the pinned prompt prefix and the thread CPU time of the turn, with the full
+history and with the bounded window (DSA_HISTORY_MESSAGES). Fails if the
+bounded payload ever exceeds its ceiling, i.e. if turn cost keeps growing
+with the conversation.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import dsa_interview as dsa
+from api.utils.turns import Exchange, Message
+
+REPORT_EVERY = 10
+
+
+class _StandInChat:
+    """Interviewer stand-in recording the messages of each call."""
+
+    def __init__(self):
+        self.payloads = []
+
+    def invoke(self, messages, **kwargs):
+        self.payloads.append(sum(len(content) for _, content in messages))
+        return f"Interviewer follow-up #{len(self.payloads)}: how does your approach handle duplicates and what is the cost?"
+
+
+def _reply(i):
+    return f"Candidate answer {i}: I would sort first, then sweep once, keeping a running best. " * (1 + i % 3)
+
+
+class Command(BaseCommand):
+    """Management command to measure bounded DSA conversation history."""
+
+    help = 'Measure DSA turn payload and CPU time over a long simulated conversation'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--turns', type=int, default=100, help='Number of simulated candidate turns')
+        parser.add_argument('--window', type=int, default=dsa.HISTORY_MESSAGES or 12,
+                            help='Messages kept after the prompt prefix')
+
+    def _simulate(self, turns, window):
+        chat = _StandInChat()
+        question = {"question_title": "Merge Intervals", "problem_statement": "Merge all overlapping intervals."}
+        session_log = {
+            "role": "general", "difficulty": "medium", "question": question,
+            "pseudocode": "sort intervals by start\nfor each interval: merge with last if overlapping",
+            "analysis": dsa.DEFAULT_HIDDEN_ANALYSIS.copy(), "exchanges": [Exchange(interviewer="Walk me through it.")],
+            "ended_by": None, "prompt": dsa.prompts.DSA_INTERVIEWER.version,
+            "messages": [Message("assistant", "Walk me through it.")],
+        }
+        session_idx = len(dsa.ANALYSIS_LOG)
+        dsa.ANALYSIS_LOG.append(session_log)
+
+        original_window, original_chat = dsa.HISTORY_MESSAGES, dsa._session_chat
+        dsa.HISTORY_MESSAGES = window
+        dsa._session_chat = lambda *args, **kwargs: chat
+        cpu = []
+        try:
+            for i in range(turns):
+                start = time.thread_time()
+                dsa.continue_pseudocode_analysis(session_idx, _reply(i))
+                cpu.append(time.thread_time() - start)
+        finally:
+            dsa.HISTORY_MESSAGES, dsa._session_chat = original_window, original_chat
+            dsa._release_session(session_idx)
+        return chat.payloads, cpu
+
+    def handle(self, *args, **options):
+        turns, window = options['turns'], options['window']
+        if window < 2:
+            raise CommandError('--window must be at least 2')
+
+        full, full_cpu = self._simulate(turns, 0)
+        bounded, bounded_cpu = self._simulate(turns, window)
+
+        longest = max(len(_reply(i)) for i in range(turns)) + len(_StandInChat().invoke([]))
+        ceiling = (window + window % 2) * longest
+
+        self.stdout.write(f'{turns} turns, window {window} messages, ceiling {ceiling} chars')
+        self.stdout.write('  turn  full chars  full us  bounded chars  bounded us')
+        for i in range(0, turns, REPORT_EVERY):
+            self.stdout.write(
+                f'  {i + 1:>4} {full[i]:>11} {full_cpu[i] * 1e6:>8.0f} {bounded[i]:>14} {bounded_cpu[i] * 1e6:>11.0f}'
+            )
+        self.stdout.write(f'  total {sum(full):>10} {sum(full_cpu) * 1e6:>8.0f} {sum(bounded):>14} {sum(bounded_cpu) * 1e6:>11.0f}')
+
+        worst = max(bounded)
+        if worst > ceiling:
+            raise CommandError(f'Bounded history reached {worst} chars (ceiling {ceiling})')
+        self.stdout.write(self.style.SUCCESS(f'Bounded history stayed within {worst}/{ceiling} chars'))
@@ -0,0 +1,104 @@
+"""
+Django management command to measure behavioral prompt history size.
+
+Simulates a long behavioral interview and reports the size of the history
+block sent with each turn, with the full history and with the bounded
+window plus rolling summary. Fails if the bounded size ever exceeds its
+theoretical ceiling, i.e. if prompt size keeps growing with the interview.
+
+By default the summary is produced by a local stand-in so the command runs
+without API calls; --live uses the configured summarizer model and
+--lagging simulates a summarizer that never completes.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import behavioral_interview as bi
+from api.utils.behavioral_interview import InterviewLLMService
+
+SUMMARY_WAIT_SECONDS = 60
+
+
+def _synthetic_turn(i):
+    question = f"Tell me about a time you handled situation #{i} involving a difficult stakeholder and a tight deadline."
+    answer = ("I clarified the goal, split the work, kept everyone updated and shipped on time. " * (1 + i % 4)).strip()
+    evaluation = {"score": 5 + i % 5, "strengths": ["structure"], "improvements": ["metrics"], "reason": "ok"}
+    return question, answer, evaluation
+
+
+def _local_summarize(summary, turns):
+    notes = (summary + " " if summary else "") + " ".join(t.split("\n", 1)[0][:80] for t in turns)
+    return notes[-bi.HISTORY_SUMMARY_MAX_CHARS:]
+
+
+def _lagging_summarize(summary, turns):
+    raise RuntimeError("summarizer unavailable")
+
+
+class Command(BaseCommand):
+    """Management command to measure bounded behavioral history."""
+
+    help = 'Measure behavioral prompt history size over a long simulated interview'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--turns', type=int, default=32, help='Number of simulated turns')
+        parser.add_argument('--window', type=int, default=bi.HISTORY_VERBATIM_TURNS or 6,
+                            help='Turns kept verbatim')
+        parser.add_argument('--live', action='store_true', help='Use the configured summarizer model')
+        parser.add_argument('--lagging', action='store_true', help='Simulate a summarizer that never completes')
+
+    def _wait_for_summary(self, svc):
+        deadline = time.monotonic() + SUMMARY_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            with bi._summary_lock:
+                if svc.session_key not in bi._summary_pending:
+                    return
+            time.sleep(0.01)
+
+    def _simulate(self, turns, window, summarize=None):
+        svc = InterviewLLMService(history_turns=window)
+        svc.initialize_interview("Synthetic resume", "Engineer")
+        if summarize is not None:
+            svc._summarize = summarize
+        sizes = []
+        max_turn_chars = 0
+        for i in range(turns):
+            question, answer, evaluation = _synthetic_turn(i)
+            svc._add_question_to_history({"question": question, "type": "behavioral", "difficulty": "medium"})
+            sizes.append(len(svc._build_history_string()))
+            svc._update_last_answer(answer, evaluation)
+            max_turn_chars = max(max_turn_chars, len(svc._format_turn(i)))
+            self._wait_for_summary(svc)
+        return sizes, max_turn_chars
+
+    def handle(self, *args, **options):
+        turns, window = options['turns'], options['window']
+        if window < 1:
+            raise CommandError('--window must be at least 1')
+        summarize = None if options['live'] else _local_summarize
+        if options['lagging']:
+            summarize = _lagging_summarize
+
+        full, _ = self._simulate(turns, 0)
+        bounded, max_turn_chars = self._simulate(turns, window, summarize)
+
+        # Summary header + summary + compact lines + omitted marker + verbatim window
+        ceiling = (
+            40 + bi.HISTORY_SUMMARY_MAX_CHARS
+            + bi.HISTORY_COMPACT_MAX_TURNS * (bi.HISTORY_COMPACT_LINE_CHARS + 20)
+            + 40 + window * (max_turn_chars + 1)
+        )
+
+        self.stdout.write(f'{turns} turns, window {window}, ceiling {ceiling} chars')
+        self.stdout.write('  turn   full  bounded')
+        for i, (f, b) in enumerate(zip(full, bounded), start=1):
+            self.stdout.write(f'  {i:>4} {f:>6} {b:>8}')
+        self.stdout.write(f'  total  {sum(full)} {sum(bounded)}')
+
+        worst = max(bounded)
+        if worst > ceiling:
+            raise CommandError(f'Bounded history reached {worst} chars (ceiling {ceiling})')
+        self.stdout.write(self.style.SUCCESS(f'Bounded history stayed within {worst}/{ceiling} chars'))
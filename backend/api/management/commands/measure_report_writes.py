@@ -0,0 +1,161 @@
+"""
+Django management command to measure the SQL written by InterviewReport saves.
+
+Calls the report endpoints (upload_resume, get_dsa_question_endpoint,
+submit_pseudocode, generate_behavioral_report, get_combined_final_report and
+update_report_decision) through the DRF test client against a scratch report
+with large resume and report columns, with the LLM, PDF and speech calls they
+make replaced by fixed results. The InterviewReport UPDATE statements each
+request issues are captured and checked to write only the columns the
+endpoint changed (see api.models.DirtyFieldsMixin). Statement sizes are
+compared with a full-row save. Appending to the conversation must only
+insert the new ConversationTurn rows. Everything runs in a transaction that is
+rolled back.
+"""
+
+import io
+import re
+from contextlib import ExitStack
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from api.models import InterviewReport, JobDescription
+
+_SET_COLUMN_RE = re.compile(r'"(\w+)"\s*=')
+
+RESUME_TEXT = 'Senior backend engineer. ' * 400
+DSA_QUESTION = {'question_title': 'Two Sum', 'problem_statement': 'Find two numbers...', 'difficulty': 'easy'}
+PSEUDOCODE = 'for i in nums:\n    if target - i in seen: return'
+BEHAVIORAL_REPORT = {'overall_score': 80, 'strengths': ['Ownership'], 'areas_for_improvement': []}
+
+
+def _update_columns(sql):
+    """Column names assigned in an UPDATE statement's SET clause."""
+    set_clause = sql.split(' SET ', 1)[1].rsplit(' WHERE ', 1)[0]
+    return set(_SET_COLUMN_RE.findall(set_clause))
+
+
+def _upload(name, content):
+    upload = io.BytesIO(content)
+    upload.name = name
+    return upload
+
+
+def _resume_parser():
+    parser = mock.Mock()
+    parser.return_value.extract.return_value = {'text': RESUME_TEXT}
+    return parser
+
+
+# (endpoint, method, url, request data, patched call -> replacement, columns
+# it should write besides updated_at)
+SCENARIOS = [
+    ('upload_resume', 'post', '/api/upload-resume/',
+     lambda report: {'resume_image': _upload('resume.pdf', b'%PDF-1.4 scratch'),
+                     'job_description_id': report.job_description_id},
+     {'api.views.ResumeParser': _resume_parser(), 'api.views.question_pool.warm_for_resume': mock.Mock()},
+     {'resume_text'}),
+    ('get_dsa_question_endpoint', 'post', '/api/get-dsa-question/',
+     lambda report: {'report_id': str(report.id)},
+     {'api.views.get_dsa_question': mock.Mock(return_value=DSA_QUESTION)},
+     {'dsa_question'}),
+    ('submit_pseudocode', 'post', '/api/submit-pseudocode/',
+     lambda report: {'report_id': str(report.id), 'pseudocode': PSEUDOCODE},
+     {'api.views.analyze_pseudocode_initial': mock.Mock(return_value={
+         'session_idx': 3, 'interviewer_question': 'Why a set?', 'is_closing': False})},
+     {'dsa_pseudocode', 'dsa_session_idx'}),
+    # The endpoint only sets the (unpersisted) transcript attribute
+    ('generate_behavioral_report', 'post', '/api/generate-behavioral-report/',
+     lambda report: {'report_id': str(report.id), 'audio': _upload('answer.webm', b'scratch audio')},
+     {'api.views.run_evaluation_stage': mock.Mock(return_value='Interviewer: ...'),
+      'api.views.evaluate_candidate': mock.Mock(return_value={})},
+     set()),
+    # Unchanged strengths and areas for improvement are not written
+    ('get_combined_final_report', 'post', '/api/get-combined-report/',
+     lambda report: {'report_id': str(report.id)},
+     {'api.utils.combined_report.session_fingerprint': mock.Mock(return_value=None)},
+     {'report_data', 'report_fingerprint', 'overall_score', 'overall_rating'}),
+    ('update_report_decision', 'patch', '/api/reports/{id}/decision/',
+     lambda report: {'decision': 'Declined'},
+     {},
+     {'decision'}),
+]
+
+
+class Command(BaseCommand):
+    """Management command to measure InterviewReport write amplification."""
+
+    help = 'Check that InterviewReport endpoints write only the changed columns'
+
+    def _scratch_report(self):
+        job = JobDescription.objects.create(title='Scratch', description='Scratch job description')
+        report = InterviewReport.objects.create(
+            job_description=job,
+            position='Backend Engineer',
+            resume_text='Resume line. ' * 2000,
+            report_data={'notes': ['Observation. ' * 20 for _ in range(50)]},
+            behavioral_report=BEHAVIORAL_REPORT,
+            strengths=['Ownership'],
+        )
+        report.append_turns({'question': f'Question {i}?', 'answer': 'Answer. ' * 50} for i in range(30))
+        return InterviewReport.objects.get(pk=report.pk)
+
+    def _capture(self, save, statement='UPDATE'):
+        with CaptureQueriesContext(connection) as queries:
+            result = save()
+        return result, [q['sql'] for q in queries.captured_queries if q['sql'].lstrip().upper().startswith(statement)]
+
+    def _request(self, client, method, url, data, patches):
+        with ExitStack() as stack:
+            for target, replacement in patches.items():
+                stack.enter_context(mock.patch(target, replacement))
+            return getattr(client, method)(url, data, format='json' if method == 'patch' else 'multipart')
+
+    def handle(self, *args, **options):
+        failures = []
+        table = InterviewReport._meta.db_table
+        client = APIClient()
+        with override_settings(ALLOWED_HOSTS=['testserver']), transaction.atomic():
+            report = self._scratch_report()
+            _, full_row = self._capture(lambda: models.Model.save(report))
+            full_bytes = sum(len(sql) for sql in full_row)
+            self.stdout.write(f'Full-row save: {len(_update_columns(full_row[0]))} columns, {full_bytes} bytes of SQL')
+
+            for name, method, url, data, patches, expected in SCENARIOS:
+                response, updates = self._capture(
+                    lambda: self._request(client, method, url.format(id=report.id), data(report), patches)
+                )
+                updates = [sql for sql in updates if f'"{table}"' in sql]
+                columns = set().union(*(_update_columns(sql) for sql in updates)) if updates else set()
+                written = sum(len(sql) for sql in updates)
+                expected_columns = expected | {'updated_at'} if expected else set()
+                ok = response.status_code == 200 and columns == expected_columns
+                style = self.style.SUCCESS if ok else self.style.ERROR
+                self.stdout.write(style(
+                    f'  {name:<28} HTTP {response.status_code}, {len(updates)} UPDATE, '
+                    f'columns: {", ".join(sorted(columns)) or "-"}  '
+                    f'({written} bytes, {written / full_bytes:.1%} of a full-row save)'
+                ))
+                if not ok:
+                    failures.append(name)
+
+            report = InterviewReport.objects.get(pk=report.pk)
+            _, writes = self._capture(lambda: report.append_turns([{'question': 'One more?'}]), statement='')
+            writes = [sql for sql in writes if sql.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+            written = sum(len(sql) for sql in writes)
+            ok = len(writes) == 1 and writes[0].lstrip().upper().startswith('INSERT')
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(
+                f'  {"append_turns":<28} {len(writes)} write(s) for 1 new turn of {len(report.conversation)} ({written} bytes)'
+            ))
+            if not ok:
+                failures.append('append_turns')
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'Unexpected writes by: {", ".join(failures)}')
@@ -0,0 +1,170 @@
+"""
+Django management command to measure memory per interview session.
+
+Builds synthetic behavioral and DSA sessions in the dict representation
+previously used for chat history and session logs (with the full DSA prompt
+prefix copied into every session) and in the slotted records from
+api.utils.turns, and reports the traced memory per session for each. Also
+times the behavioral state codec: dict state versus row state, each
+serialized to and from JSON.
+
+Turn contents go through json.loads, as LLM replies do, so strings are not
+shared between sessions unless interned.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils import prompts
+from api.utils.dsa_interview import TRIVIAL_PSEUDOCODE_LENGTH
+from api.utils.pseudocode_analyzer import analyze
+from api.utils.turns import Exchange, Message, Turn, decode, encode
+
+
+def _question(session, i):
+    return json.loads(json.dumps({
+        "question": f"Session {session}: tell me about a time you handled situation #{i} under a tight deadline.",
+        "type": "behavioral",
+        "difficulty": "medium",
+    }))
+
+
+def _answer(session, i):
+    return f"In session {session} I clarified the goal, split the work and shipped on time ({i})."
+
+
+def _evaluation(i):
+    return json.loads(json.dumps({"score": 5 + i % 5, "strengths": ["structure"], "improvements": ["metrics"], "reason": "ok"}))
+
+
+def _behavioral_dicts(session, turns):
+    history = []
+    for i in range(turns):
+        q = _question(session, i)
+        history.append({"question": q["question"], "type": q["type"], "difficulty": q["difficulty"],
+                        "answer": _answer(session, i), "evaluation": _evaluation(i)})
+    return history
+
+
+def _behavioral_turns(session, turns):
+    history = []
+    for i in range(turns):
+        q = _question(session, i)
+        history.append(Turn(q["question"], q["type"], q["difficulty"], _answer(session, i), _evaluation(i)))
+    return history
+
+
+def _dsa_question(session):
+    return json.loads(json.dumps({
+        "question_title": f"Merge Intervals {session}",
+        "problem_statement": "Given a list of intervals, merge all overlapping intervals. " * 6
+                             + "Describe your algorithm and provide pseudocode to solve this problem.",
+        "difficulty": "medium",
+        "expected_topics": ["sorting", "arrays"],
+        "example_input_output": {"input": "[[1,3],[2,6],[8,10]]", "output": "[[1,6],[8,10]]"},
+    }))
+
+
+def _pseudocode(session):
+    return f"sort intervals by start\nfor each interval: merge with last if overlapping ({session})"
+
+
+def _reply(session, i, who):
+    return f"{who} message {i} in session {session} about the sorting step and its complexity."
+
+
+def _dsa_dicts(session, turns):
+    question, pseudocode = _dsa_question(session), _pseudocode(session)
+    prefix = prompts.DSA_INTERVIEWER.render(
+        question_json=json.dumps(question, ensure_ascii=False),
+        problem_statement=question["problem_statement"],
+        pseudocode=pseudocode,
+        structure_summary=analyze(pseudocode, TRIVIAL_PSEUDOCODE_LENGTH).summary(),
+    )
+    messages = [{"role": json.loads('"%s"' % role), "content": content} for role, content in prefix]
+    exchanges = []
+    for i in range(turns):
+        interviewer, candidate = _reply(session, i, "interviewer"), _reply(session, i, "candidate")
+        messages.append({"role": json.loads('"assistant"'), "content": interviewer})
+        messages.append({"role": json.loads('"human"'), "content": candidate})
+        exchanges.append({"interviewer": interviewer, "candidate": candidate})
+    return {"question": question, "pseudocode": pseudocode, "messages": messages, "exchanges": exchanges}
+
+
+def _dsa_records(session, turns):
+    messages, exchanges = [], []
+    for i in range(turns):
+        interviewer, candidate = _reply(session, i, "interviewer"), _reply(session, i, "candidate")
+        messages.append(Message(json.loads('"assistant"'), interviewer))
+        messages.append(Message(json.loads('"human"'), candidate))
+        exchanges.append(Exchange(interviewer, candidate))
+    return {"question": _dsa_question(session), "pseudocode": _pseudocode(session),
+            "prompt": prompts.DSA_INTERVIEWER.version, "messages": messages, "exchanges": exchanges}
+
+
+def _bytes_per_session(build, sessions, turns):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [build(s, turns) for s in range(sessions)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+def _per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+class Command(BaseCommand):
+    """Management command to measure memory per interview session."""
+
+    help = 'Measure memory per session for dict-based and slotted interview history'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--sessions', type=int, default=500, help='Sessions built per representation')
+        parser.add_argument('--turns', type=int, default=8, help='Turns per session')
+        parser.add_argument('--iterations', type=int, default=2000, help='Codec iterations')
+
+    def handle(self, *args, **options):
+        sessions, turns = options['sessions'], options['turns']
+        if sessions < 1 or turns < 1:
+            raise CommandError('--sessions and --turns must be at least 1')
+
+        self.stdout.write(f'{sessions} sessions, {turns} turns each')
+        self.stdout.write(f'  {"session":<12} {"dicts":>10} {"slotted":>10} {"saved":>7}')
+        for name, old, new in (
+            ('behavioral', _behavioral_dicts, _behavioral_turns),
+            ('dsa', _dsa_dicts, _dsa_records),
+        ):
+            before = _bytes_per_session(old, sessions, turns)
+            after = _bytes_per_session(new, sessions, turns)
+            self.stdout.write(f'  {name:<12} {before:>9.0f}B {after:>9.0f}B {1 - after / before:>6.0%}')
+
+        history = _behavioral_turns(0, turns)
+        dict_state = json.dumps([turn.to_dict() for turn in history])
+        row_state = json.dumps(encode(history))
+        iterations = options['iterations']
+        codecs = {
+            'dict': (lambda: json.dumps([turn.to_dict() for turn in history]),
+                     lambda: [Turn.from_dict(item) for item in json.loads(dict_state)], len(dict_state)),
+            'rows': (lambda: json.dumps(encode(history)),
+                     lambda: decode(Turn, json.loads(row_state)), len(row_state)),
+        }
+        self.stdout.write('  codec        encode     decode    size')
+        for name, (dump, load, size) in codecs.items():
+            self.stdout.write(
+                f'  {name:<12} {_per_call_us(dump, iterations):>6.1f}us {_per_call_us(load, iterations):>8.1f}us {size:>6}B'
+            )
+        self.stdout.write(self.style.SUCCESS('Done'))
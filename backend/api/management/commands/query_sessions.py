@@ -0,0 +1,115 @@
+"""
+Django management command to query the DSA session log.
+
+Looks matching sessions up in the session log's sidecar index
+(api.utils.session_index) and reads only those records, seeking into the
+memory-mapped segments instead of scanning the log. --rebuild recreates the
+index from the segments in SESSION_LOG_DIR, e.g. after index errors
+(session_log.index_errors). The index is also rebuilt when it predates the
+current schema, and when a record read back does not match its index row.
+"""
+
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.session_index import SessionLogIndex, StaleIndexError
+from api.utils.session_log import ACTIVE_SEGMENT, COMPRESSION_SUFFIXES, SEGMENT_PREFIX
+
+
+def _segments(directory):
+    """Segment names in the directory, oldest first, the active segment last."""
+    suffixes = ('.jsonl',) + tuple('.jsonl' + suffix for suffix in COMPRESSION_SUFFIXES.values())
+    rotated = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(suffixes) and name != ACTIVE_SEGMENT
+    )
+    if os.path.exists(os.path.join(directory, ACTIVE_SEGMENT)):
+        rotated.append(ACTIVE_SEGMENT)
+    return rotated
+
+
+class Command(BaseCommand):
+    """Management command to query the DSA session log through its index."""
+
+    help = 'Find logged DSA sessions by role, difficulty, hire recommendation, question title and time'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument('--role', help='Target role (case-insensitive)')
+        parser.add_argument('--difficulty', help='Question difficulty')
+        parser.add_argument('--hire', help='Hire recommendation: yes, maybe or no')
+        parser.add_argument('--title', help='Question title')
+        parser.add_argument('--since', help='Logged at or after this ISO timestamp')
+        parser.add_argument('--until', help='Logged before this ISO timestamp')
+        parser.add_argument('--limit', type=int, default=20, help='Max records (0 = all)')
+        parser.add_argument('--oldest-first', action='store_true', help='Oldest records first')
+        parser.add_argument('--json', action='store_true', help='Print full records as JSON lines')
+        parser.add_argument('--count', action='store_true', help='Only print the number of matches')
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from the log segments first')
+
+    def _rebuild(self, index, directory):
+        start = time.monotonic()
+        with index.lock:
+            segments = _segments(directory)
+            total = index.rebuild(segments)
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {total} record(s) from {len(segments)} segment(s) in {time.monotonic() - start:.1f}s'
+        ))
+
+    def handle(self, *args, **options):
+        directory = str(settings.SESSION_LOG_DIR)
+        if not os.path.isdir(directory):
+            raise CommandError(f'Session log directory not found: {directory}')
+        index = SessionLogIndex(directory)
+
+        if options['rebuild'] or index.needs_rebuild():
+            self._rebuild(index, directory)
+
+        filters = {
+            key: options[option]
+            for key, option in (('role', 'role'), ('difficulty', 'difficulty'), ('hire', 'hire'), ('question_title', 'title'))
+            if options[option]
+        }
+        start = time.monotonic()
+        if options['count']:
+            total = index.count(filters, since=options['since'], until=options['until'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{total} matching record(s) in {(time.monotonic() - start) * 1000:.1f}ms'
+            ))
+            return
+
+        def find():
+            locations = index.query(
+                filters,
+                since=options['since'],
+                until=options['until'],
+                limit=options['limit'],
+                newest_first=not options['oldest_first'],
+            )
+            return index.read(locations)
+
+        try:
+            records = find()
+        except StaleIndexError as e:
+            self.stdout.write(self.style.WARNING(f'{e}; rebuilding the index'))
+            self._rebuild(index, directory)
+            records = find()
+        shown = 0
+        for record in records:
+            shown += 1
+            if options['json']:
+                self.stdout.write(json.dumps(record, ensure_ascii=False))
+                continue
+            session, report = record.get('session') or {}, record.get('report') or {}
+            self.stdout.write(
+                f"{record.get('logged_at', '?')}  #{record.get('session_idx', '?')}  "
+                f"{session.get('role', '?')}/{session.get('difficulty', '?')}  "
+                f"{report.get('question_title', '?')}  "
+                f"hire={report.get('hire_recommendation', '?')} ({report.get('classification', '?')})"
+            )
+        index.close()
+        self.stdout.write(self.style.SUCCESS(f'{shown} record(s) in {(time.monotonic() - start) * 1000:.1f}ms'))
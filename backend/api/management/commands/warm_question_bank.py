@@ -0,0 +1,60 @@
+"""
+Django management command to fill the DSA question bank.
+
+Tops up the DSA question bank (api.utils.question_bank) for every role
+category and difficulty, or a subset of them, to DSA_QUESTION_BANK_TARGET
+questions, so DSA questions are served from the bank. Near-duplicates of
+banked questions are rejected and reported.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.dsa_interview import ROLE_HINTS
+from api.utils.metrics import metrics
+from api.utils.question_bank import DIFFICULTIES, question_bank
+
+
+class Command(BaseCommand):
+    """Management command to warm the DSA question bank."""
+
+    help = 'Pre-generate DSA questions per role category and difficulty'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            '--role',
+            action='append',
+            dest='roles',
+            help=f"Role category: {', '.join(ROLE_HINTS)} (repeatable; default: all)",
+        )
+        parser.add_argument(
+            '--difficulty',
+            action='append',
+            dest='difficulties',
+            help=f"Difficulty: {', '.join(DIFFICULTIES)} (repeatable; default: all)",
+        )
+
+    def handle(self, *args, **options):
+        roles = options['roles'] or list(ROLE_HINTS)
+        difficulties = options['difficulties'] or list(DIFFICULTIES)
+        unknown = (set(roles) - set(ROLE_HINTS)) | (set(difficulties) - set(DIFFICULTIES))
+        if unknown:
+            raise CommandError(f"Unknown role category or difficulty: {', '.join(sorted(unknown))}")
+
+        total = 0
+        for role in roles:
+            for difficulty in difficulties:
+                key = (role, difficulty)
+                rejected = metrics.counter('dsa_bank.near_duplicates')
+                try:
+                    added = question_bank.replenish(key)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'  {role} [{difficulty}]: {e}'))
+                    continue
+                total += added
+                rejected = metrics.counter('dsa_bank.near_duplicates') - rejected
+                self.stdout.write(
+                    f'  {role} [{difficulty}]: +{added} ({question_bank.size(key)} banked, {rejected} near-duplicates rejected)'
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'Added {total} DSA questions'))
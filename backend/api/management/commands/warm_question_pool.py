@@ -0,0 +1,58 @@
+"""
+Django management command to pre-generate opening interview questions.
+
+Fills the opening question pool (api.utils.question_pool) for every job
+description and resume profile bucket, or a subset of them, so interview
+starts are served from the pool. Pools already at QUESTION_POOL_TARGET are
+left untouched.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import JobDescription
+from api.utils import question_pool
+
+
+class Command(BaseCommand):
+    """Management command to warm the opening question pool."""
+
+    help = 'Pre-generate opening interview questions per job description and resume profile bucket'
+
+    def add_arguments(self, parser):
+        """Add command-line arguments."""
+        parser.add_argument(
+            '--job-description',
+            type=int,
+            action='append',
+            dest='job_descriptions',
+            help='Job description id to warm (repeatable; default: all)',
+        )
+        parser.add_argument(
+            '--bucket',
+            action='append',
+            dest='buckets',
+            help="Profile bucket such as 'senior:backend' (repeatable; default: all)",
+        )
+
+    def handle(self, *args, **options):
+        job_descriptions = JobDescription.objects.all()
+        if options['job_descriptions']:
+            job_descriptions = job_descriptions.filter(id__in=options['job_descriptions'])
+
+        buckets = options['buckets'] or question_pool.all_buckets()
+        unknown = set(buckets) - set(question_pool.all_buckets())
+        if unknown:
+            raise CommandError(f"Unknown bucket(s): {', '.join(sorted(unknown))}")
+
+        total = 0
+        for job_description in job_descriptions:
+            for bucket in buckets:
+                try:
+                    added = question_pool.refill(job_description.id, bucket)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'  {job_description.title} [{bucket}]: {e}'))
+                    continue
+                total += added
+                self.stdout.write(f'  {job_description.title} [{bucket}]: +{added}')
+
+        self.stdout.write(self.style.SUCCESS(f'Added {total} opening questions'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_jobdescription_remove_interviewsession_demo_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(help_text='SHA-256 of JD/resume/transcript hashes + model + prompt version', max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('prompt_version', models.CharField(max_length=50)),
+                ('result', models.JSONField(default=dict, help_text='Parsed evaluation result')),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-last_accessed_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_evaluationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BehavioralSession',
+            fields=[
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='behavioral_session', serialize=False, to='api.interviewreport')),
+                ('version', models.PositiveSmallIntegerField(default=1, help_text='State format version')),
+                ('state', models.JSONField(default=dict, help_text='Compact InterviewLLMService state')),
+                ('turns', models.PositiveIntegerField(default=0, help_text='Questions asked when the state was saved')),
+                ('evaluated', models.PositiveIntegerField(default=0, help_text='Answers evaluated when the state was saved')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
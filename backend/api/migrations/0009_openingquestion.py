@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_behavioralsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_bucket', models.CharField(help_text="Coarse resume profile, e.g. 'senior:backend'", max_length=50)),
+                ('question', models.JSONField(default=dict, help_text='Question JSON as returned by the interview engine')),
+                ('question_hash', models.CharField(help_text='SHA-1 of the normalized question text', max_length=40)),
+                ('served_at', models.DateTimeField(blank=True, help_text='When the question was handed to a candidate', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_questions', to='api.jobdescription')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['job_description', 'profile_bucket', 'served_at'], name='opening_question_pool_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job_description', 'profile_bucket', 'question_hash'), name='unique_opening_question')],
+            },
+        ),
+    ]
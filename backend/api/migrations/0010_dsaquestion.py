@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_openingquestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DSAQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(help_text='Role category, a key of dsa_interview.ROLE_HINTS', max_length=20)),
+                ('difficulty', models.CharField(max_length=10)),
+                ('question', models.JSONField(default=dict, help_text='Question JSON as returned by generate_dsa_question')),
+                ('question_hash', models.CharField(help_text='SHA-1 of the normalized title and problem statement', max_length=40)),
+                ('served_count', models.PositiveIntegerField(default=0)),
+                ('last_served_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['role', 'difficulty', 'served_count'], name='dsa_question_bank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('role', 'difficulty', 'question_hash'), name='unique_dsa_question')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_dsaquestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewreport',
+            name='report_fingerprint',
+            field=models.CharField(blank=True, help_text='SHA-256 of the inputs report_data was combined from', max_length=64),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def backfill_turns(apps, schema_editor):
+    """One ConversationTurn per item of each report's conversation list."""
+    InterviewReport = apps.get_model('api', 'InterviewReport')
+    ConversationTurn = apps.get_model('api', 'ConversationTurn')
+    turns = []
+    for report_id, conversation in InterviewReport.objects.values_list('id', 'conversation').iterator():
+        for position, data in enumerate(conversation or []):
+            turns.append(ConversationTurn(report_id=report_id, position=position, data=data))
+        if len(turns) >= BATCH_SIZE:
+            ConversationTurn.objects.bulk_create(turns, batch_size=BATCH_SIZE)
+            turns = []
+    ConversationTurn.objects.bulk_create(turns, batch_size=BATCH_SIZE)
+
+
+def restore_conversations(apps, schema_editor):
+    """Fold the turns back into each report's conversation list."""
+    InterviewReport = apps.get_model('api', 'InterviewReport')
+    ConversationTurn = apps.get_model('api', 'ConversationTurn')
+    conversations = {}
+    for report_id, data in ConversationTurn.objects.order_by('report_id', 'position').values_list('report_id', 'data').iterator():
+        conversations.setdefault(report_id, []).append(data)
+    for report_id, conversation in conversations.items():
+        InterviewReport.objects.filter(pk=report_id).update(conversation=conversation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_interviewreport_report_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationTurn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(help_text='0-based index of the turn in the conversation')),
+                ('data', models.JSONField(default=dict, help_text='The turn (question and answer) as stored in the conversation')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_turns', to='api.interviewreport')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('report', 'position'), name='unique_conversation_turn')],
+            },
+        ),
+        migrations.RunPython(backfill_turns, restore_conversations),
+    ]
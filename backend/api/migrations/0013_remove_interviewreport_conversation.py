@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Separate from the backfill: PostgreSQL cannot alter interviewreport in
+    # the transaction that inserted turns referencing it (deferred FK checks)
+
+    dependencies = [
+        ('api', '0012_conversationturn'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='interviewreport',
+            name='conversation',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_remove_interviewreport_conversation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BehavioralEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('turn', models.PositiveIntegerField(help_text='0-based index of the evaluated turn in chat_history')),
+                ('evaluation', models.JSONField(default=dict, help_text='Answer evaluation as returned by the interview engine')),
+                ('coach_tip', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='behavioral_evaluations', to='api.interviewreport')),
+            ],
+            options={
+                'ordering': ['turn'],
+                'constraints': [models.UniqueConstraint(fields=('report', 'turn'), name='unique_behavioral_evaluation')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_behavioralevaluation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='behavioralevaluation',
+            name='status',
+            field=models.CharField(default='done', help_text='pending/done/failed', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='behavioralevaluation',
+            name='question',
+            field=models.TextField(blank=True, help_text='Evaluated question'),
+        ),
+        migrations.AddField(
+            model_name='behavioralevaluation',
+            name='answer',
+            field=models.TextField(blank=True, help_text='Evaluated answer'),
+        ),
+        migrations.AddField(
+            model_name='behavioralevaluation',
+            name='history',
+            field=models.TextField(blank=True, help_text='Interview history sent with the evaluation prompt'),
+        ),
+        migrations.AddField(
+            model_name='behavioralevaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
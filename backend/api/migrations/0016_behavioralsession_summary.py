@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_behavioralevaluation_pending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='behavioralsession',
+            name='history_summary',
+            field=models.TextField(blank=True, help_text='Latest background summary of older turns'),
+        ),
+        migrations.AddField(
+            model_name='behavioralsession',
+            name='summarized_turns',
+            field=models.PositiveIntegerField(default=0, help_text='Turns covered by history_summary'),
+        ),
+    ]
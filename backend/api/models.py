@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+import copy
 import uuid
 
 # ==================== Constants ====================
@@ -26,12 +27,74 @@ DECISION_PENDING = 'Pending'
 DECISION_ACCEPTED = 'Accepted'
 DECISION_DECLINED = 'Declined'
 
+# Split-mode behavioral evaluation states
+EVALUATION_PENDING = 'pending'
+EVALUATION_DONE = 'done'
+EVALUATION_FAILED = 'failed'
+
 # Default values
 DEFAULT_CANDIDATE_NAME = 'Anonymous Candidate'
 DEFAULT_CANDIDATE_EMAIL = 'ashkalbhattaarkar@gmail.com'
 DEFAULT_POSITION = 'Software Engineer'
 DEFAULT_DSA_SESSION_IDX = -1
 
+# ==================== Mixins ====================
+
+class DirtyFieldsMixin:
+    """Saves write only the columns changed since the instance was loaded or saved.
+
+    Values are snapshotted on load and after every save; a plain save() of
+    a stored row becomes save(update_fields=<changed fields>), plus any
+    auto_now fields, and is skipped when nothing changed. JSON values are
+    compared by value, so in-place edits (report.strengths.append(...))
+    count as changes. Explicit update_fields are passed through as-is.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _tracked_fields(self):
+        # Deferred fields are neither loaded nor tracked until assigned
+        return [f for f in self._meta.concrete_fields if not f.primary_key and f.attname in self.__dict__]
+
+    def _snapshot(self, fields=None):
+        if not hasattr(self, '_loaded_values'):
+            self._loaded_values = {}
+        for f in fields if fields is not None else self._tracked_fields():
+            self._loaded_values[f.attname] = copy.deepcopy(getattr(self, f.attname))
+
+    def get_dirty_fields(self):
+        """Names of the fields whose values differ from the stored row."""
+        loaded = getattr(self, '_loaded_values', {})
+        return [
+            f.name for f in self._tracked_fields()
+            if f.attname not in loaded or loaded[f.attname] != getattr(self, f.attname)
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and hasattr(self, '_loaded_values'):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            auto_now = [f.name for f in self._meta.concrete_fields if getattr(f, 'auto_now', False)]
+            kwargs['update_fields'] = list(dict.fromkeys(dirty + auto_now))
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self._snapshot()
+        else:
+            self._snapshot([f for f in self._tracked_fields() if f.name in update_fields or f.attname in update_fields])
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(None if fields is None else [
+            f for f in self._tracked_fields() if f.name in fields or f.attname in fields
+        ])
+
+
 # ==================== Models ====================
 
 class JobDescription(models.Model):
@@ -47,7 +110,7 @@ class JobDescription(models.Model):
     def __str__(self):
         return self.title
 
-class InterviewReport(models.Model):
+class InterviewReport(DirtyFieldsMixin, models.Model):
     """Stores interview reports linked to job descriptions"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
@@ -68,9 +131,9 @@ class InterviewReport(models.Model):
     areas_for_improvement = models.JSONField(default=list, help_text="List of areas for improvement")
     report_data = models.JSONField(default=dict, help_text="Complete interview report data")
     behavioral_report = models.JSONField(default=dict, help_text="Behavioral interview report (first 5 questions)")
+    report_fingerprint = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the inputs report_data was combined from")
     
-    # Conversation
-    conversation = models.JSONField(default=list, help_text="Complete interview conversation (questions and answers)")
+    # Conversation: one ConversationTurn row per turn (see the conversation property)
     
     # DSA
     dsa_question = models.JSONField(default=dict, help_text="DSA question from ask_ques_get_ans")
@@ -94,9 +157,25 @@ class InterviewReport(models.Model):
         setattr(self, field_name, value)
         self.save()
     
-    def update_conversation(self, conversation_data):
-        """Update the interview conversation"""
-        self._update_field('conversation', conversation_data)
+    @property
+    def conversation(self):
+        """Complete interview conversation (questions and answers), in order"""
+        # Served from prefetch_related('conversation_turns') when prefetched
+        return [turn.data for turn in self.conversation_turns.all()]
+    
+    def append_turns(self, turns):
+        """Append turns to the conversation; existing turns are not rewritten"""
+        turns = list(turns)
+        if not turns:
+            return
+        with transaction.atomic():
+            # Concurrent appends to the same report wait here, so positions never collide
+            InterviewReport.objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True).get()
+            start = ConversationTurn.objects.filter(report=self).aggregate(last=models.Max('position'))['last']
+            start = -1 if start is None else start
+            ConversationTurn.objects.bulk_create([
+                ConversationTurn(report=self, position=start + 1 + i, data=turn) for i, turn in enumerate(turns)
+            ])
     
     def add_report(self, report_data):
         """Add AI analysis report to the report"""
@@ -133,3 +212,140 @@ class InterviewReport(models.Model):
             DECISION_PENDING: COLOR_GRAY
         }
         return decision_colors.get(self.decision, COLOR_GRAY)
+
+
+class ConversationTurnQuerySet(models.QuerySet):
+    def conversations(self, report_ids):
+        """Conversations of several reports in one query, by report id"""
+        conversations = {report_id: [] for report_id in report_ids}
+        rows = self.filter(report_id__in=list(conversations)).order_by('report_id', 'position').values_list('report_id', 'data')
+        for report_id, data in rows:
+            conversations[report_id].append(data)
+        return conversations
+
+
+class ConversationTurn(models.Model):
+    """One turn of an interview conversation, appended in order"""
+    report = models.ForeignKey(InterviewReport, on_delete=models.CASCADE, related_name='conversation_turns')
+    position = models.PositiveIntegerField(help_text="0-based index of the turn in the conversation")
+    data = models.JSONField(default=dict, help_text="The turn (question and answer) as stored in the conversation")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = ConversationTurnQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'position'], name='unique_conversation_turn'),
+        ]
+    
+    def __str__(self):
+        return f"Turn {self.position} of {self.report_id}"
+
+
+class EvaluationCacheEntry(models.Model):
+    """Cached evaluate_candidate result keyed by input hashes, model and prompt version"""
+    cache_key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of JD/resume/transcript hashes + model + prompt version")
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=50)
+    result = models.JSONField(default=dict, help_text="Parsed evaluation result")
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-last_accessed_at']
+    
+    def __str__(self):
+        return f"Evaluation cache {self.cache_key[:12]} ({self.model_name}, {self.prompt_version})"
+
+
+class BehavioralSession(models.Model):
+    """Persisted InterviewLLMService state for the behavioral text flow, one per report
+    
+    History summaries are folded in the background and written to their own
+    columns when done, so they reach the next turn whichever worker serves it.
+    """
+    report = models.OneToOneField(InterviewReport, on_delete=models.CASCADE, primary_key=True, related_name='behavioral_session')
+    version = models.PositiveSmallIntegerField(default=1, help_text="State format version")
+    state = models.JSONField(default=dict, help_text="Compact InterviewLLMService state")
+    turns = models.PositiveIntegerField(default=0, help_text="Questions asked when the state was saved")
+    evaluated = models.PositiveIntegerField(default=0, help_text="Answers evaluated when the state was saved")
+    history_summary = models.TextField(blank=True, help_text="Latest background summary of older turns")
+    summarized_turns = models.PositiveIntegerField(default=0, help_text="Turns covered by history_summary")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Behavioral session for {self.report_id} ({self.turns} turns)"
+
+
+class BehavioralEvaluation(models.Model):
+    """Split-mode evaluation of one behavioral answer, stored apart from the session state
+    
+    The row is written as pending when the answer is accepted, with the
+    inputs of the evaluation, so any worker can wait for it or run it again.
+    """
+    report = models.ForeignKey(InterviewReport, on_delete=models.CASCADE, related_name='behavioral_evaluations')
+    turn = models.PositiveIntegerField(help_text="0-based index of the evaluated turn in chat_history")
+    status = models.CharField(max_length=10, default=EVALUATION_DONE, help_text="pending/done/failed")
+    evaluation = models.JSONField(default=dict, help_text="Answer evaluation as returned by the interview engine")
+    coach_tip = models.TextField(blank=True)
+    question = models.TextField(blank=True, help_text="Evaluated question")
+    answer = models.TextField(blank=True, help_text="Evaluated answer")
+    history = models.TextField(blank=True, help_text="Interview history sent with the evaluation prompt")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['turn']
+        constraints = [
+            models.UniqueConstraint(fields=['report', 'turn'], name='unique_behavioral_evaluation'),
+        ]
+    
+    def __str__(self):
+        return f"Evaluation of turn {self.turn} for {self.report_id}"
+
+
+class OpeningQuestion(models.Model):
+    """Pre-generated first interview question for a job description and resume profile bucket"""
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='opening_questions')
+    profile_bucket = models.CharField(max_length=50, help_text="Coarse resume profile, e.g. 'senior:backend'")
+    question = models.JSONField(default=dict, help_text="Question JSON as returned by the interview engine")
+    question_hash = models.CharField(max_length=40, help_text="SHA-1 of the normalized question text")
+    served_at = models.DateTimeField(null=True, blank=True, help_text="When the question was handed to a candidate")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['job_description', 'profile_bucket', 'question_hash'], name='unique_opening_question'),
+        ]
+        indexes = [
+            models.Index(fields=['job_description', 'profile_bucket', 'served_at'], name='opening_question_pool_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_description_id}/{self.profile_bucket}: {self.question.get('question', '')[:50]}"
+
+
+class DSAQuestion(models.Model):
+    """Banked DSA question for a role category and difficulty"""
+    role = models.CharField(max_length=20, help_text="Role category, a key of dsa_interview.ROLE_HINTS")
+    difficulty = models.CharField(max_length=10)
+    question = models.JSONField(default=dict, help_text="Question JSON as returned by generate_dsa_question")
+    question_hash = models.CharField(max_length=40, help_text="SHA-1 of the normalized title and problem statement")
+    served_count = models.PositiveIntegerField(default=0)
+    last_served_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['role', 'difficulty', 'question_hash'], name='unique_dsa_question'),
+        ]
+        indexes = [
+            models.Index(fields=['role', 'difficulty', 'served_count'], name='dsa_question_bank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.role}/{self.difficulty}: {self.question.get('question_title', '')[:50]}"
@@ -24,6 +24,7 @@ class InterviewReportSerializer(serializers.ModelSerializer):
     score_color = serializers.ReadOnlyField()
     rating_color = serializers.ReadOnlyField()
     decision_color = serializers.ReadOnlyField()
+    conversation = serializers.ReadOnlyField()
     job_description_title = serializers.CharField(source='job_description.title', read_only=True)
     
     class Meta:
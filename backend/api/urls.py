@@ -7,11 +7,18 @@ urlpatterns = [
     path('upload-resume/', views.upload_resume, name='upload_resume'),
     path('get-ephemeral-token/', views.GetEphemeralTokenView.as_view(), name='get_ephemeral_token'),
         
+    # Behavioral text interview endpoints
+    path('behavioral/start/', views.start_behavioral_interview, name='start_behavioral_interview'),
+    path('behavioral/answer/', views.answer_behavioral_question, name='answer_behavioral_question'),
+    path('behavioral/answer/stream/', views.answer_behavioral_question_stream, name='answer_behavioral_question_stream'),
+    
     # DSA interview endpoints
     path('generate-behavioral-report/', views.generate_behavioral_report, name='generate_behavioral_report'),
-    # path('get-dsa-question/', views.get_dsa_question_endpoint, name='get_dsa_question'),
+    path('get-dsa-question/', views.get_dsa_question_endpoint, name='get_dsa_question'),
     path('submit-pseudocode/', views.submit_pseudocode, name='submit_pseudocode'),
     path('continue-pseudocode/', views.continue_pseudocode_conversation, name='continue_pseudocode'),
+    path('submit-pseudocode/stream/', views.submit_pseudocode_stream, name='submit_pseudocode_stream'),
+    path('continue-pseudocode/stream/', views.continue_pseudocode_stream, name='continue_pseudocode_stream'),
     path('get-combined-report/', views.get_combined_final_report, name='get_combined_report'),
     
     # Report endpoints
@@ -20,4 +27,7 @@ urlpatterns = [
     path('reports/statistics/', views.get_dashboard_statistics, name='get_dashboard_statistics'),
     path('reports/<uuid:report_id>/delete/', views.delete_report, name='delete_report'),
     path('reports/<uuid:report_id>/decision/', views.update_report_decision, name='update_report_decision'),
+    
+    # Metrics
+    path('metrics/', views.get_metrics, name='get_metrics'),
 ]
@@ -0,0 +1,130 @@
+"""
+DSA Hidden Analysis Cache
+=========================
+In-process cache of hidden pseudocode analyses (dsa_interview's
+_create_hidden_analysis), so candidates who submit essentially the same
+pseudocode for the same question do not each pay for an LLM call.
+
+Keys hash the question, the analysis prompt version and the normalized
+pseudocode. Normalization lowercases, drops comments, line-end colons and
+semicolons and whitespace differences, and renames identifiers to v0, v1,
+... in order of first use. Keywords, operations and data-structure names
+(sort, heap, map, ...) are kept, so structurally different solutions never
+share a key. Analyses are hidden (they only feed the final report), so an
+analysis cached for ``arr`` is served as-is for ``nums``.
+
+The cache is an LRU of DSA_ANALYSIS_CACHE_SIZE entries that expire after
+DSA_ANALYSIS_CACHE_TTL seconds. Hits, misses and evictions are counted in
+api.utils.metrics, with size and hit-rate gauges.
+"""
+
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .conf import setting
+from .metrics import metrics
+
+# ==================== Constants ====================
+CACHE_SIZE = setting("DSA_ANALYSIS_CACHE_SIZE", 2048)
+CACHE_TTL = setting("DSA_ANALYSIS_CACHE_TTL", 86400.0)
+
+# Words kept as-is by normalization; every other identifier is renamed
+KEYWORDS = frozenset("""
+    algorithm function def procedure proc method call return returns yield
+    if then else elif elseif endif switch case default
+    for foreach each in of from to downto step by until while do loop repeat endfor endwhile end begin
+    break continue pass and or not xor is null none nil true false
+    let var set get new init initialize create declare input output print
+    array list vector matrix grid string str char int integer float number bool boolean
+    map hashmap dict dictionary hash table hashtable set hashset counter frequency
+    stack queue deque heap priority min max minheap maxheap tree node root left right parent child children
+    graph edge edges neighbor neighbors adjacency visited dfs bfs path
+    push pop peek enqueue dequeue append add insert remove delete contains has find search lookup
+    sort sorted reverse reversed binary mid low high start end first last next prev
+    len length size count sum abs mod floor ceil range keys values items empty
+    memo dp cache recursion recursive recurse helper swap increment decrement infinity inf
+""".split())
+
+# Only "#" comments: "//" is floor division in Python-style pseudocode
+_COMMENT_RE = re.compile(r"#.*?$", re.MULTILINE)
+# Block and statement terminators at line ends (Python colons, C semicolons)
+_LINE_END_RE = re.compile(r"[:;]+[ \t]*$", re.MULTILINE)
+_TOKEN_RE = re.compile(r"[a-z_][a-z0-9_]*|\d+|\S")
+
+
+def normalize_pseudocode(pseudocode: str) -> str:
+    """Canonical form of pseudocode: comments, spacing, case and identifier names removed."""
+    text = _COMMENT_RE.sub("", (pseudocode or "").lower())
+    text = _LINE_END_RE.sub("", text)
+    names: Dict[str, str] = {}
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if (token[0].isalpha() or token[0] == "_") and token not in KEYWORDS:
+            token = names.setdefault(token, f"v{len(names)}")
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+def make_key(question_json: str, prompt_version: str, pseudocode: str) -> str:
+    question_id = hashlib.sha1(question_json.encode("utf-8")).hexdigest()
+    normalized = normalize_pseudocode(pseudocode)
+    return hashlib.sha256(f"{question_id}|{prompt_version}|{normalized}".encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Thread-safe LRU of analyses with a TTL."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._lookups = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        metrics.incr("dsa_analysis_cache.hits" if entry else "dsa_analysis_cache.misses")
+        # Callers get their own copy; sessions keep the analysis
+        return copy.deepcopy(entry[1]) if entry else None
+
+    def put(self, key: str, analysis: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(analysis))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.incr("dsa_analysis_cache.evictions", evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        return self._hits / self._lookups if self._lookups else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+analysis_cache = AnalysisCache()
+metrics.register_gauge("dsa_analysis_cache.size", lambda: len(analysis_cache))
+metrics.register_gauge("dsa_analysis_cache.hit_rate", lambda: round(analysis_cache.hit_rate(), 3))
@@ -1,10 +1,23 @@
+import logging
 import os
-import json
-from typing import Dict, Any, List
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
+
+from . import prompts
+from .conf import setting
+from .llm_json import LLMJSONError, StreamingFieldExtractor, invoke_chat_json, json_generation_config, parse_llm_json
+from .hedging import HedgedChat
+from .model_routing import RoutedChat, chunk_text, get_chat_model, is_local
+from .phrase_matcher import PLURAL_SUFFIXES, PhraseMatcher
+from .prompt_cache import PrefixedChat, prefix_registry
+from .turns import Turn, decode, encode
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -12,124 +25,264 @@ if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in .env")
 
 # ==================== Constants ====================
-DEFAULT_MODEL = "gemini-2.5-flash"
 DEFAULT_TEMPERATURE = 0.4
 DEFAULT_TOTAL_QUESTIONS = 5
 DEFAULT_HINT_FALLBACK = "Think aloud and outline your approach; consider key trade-offs relevant to the role."
-
-# ==================== Helper Functions ====================
-
-def _safe_json(text: str) -> Dict[str, Any]:
-    t = text.strip()
-    if t.startswith("```"):
-        parts = t.split("```")
-        if len(parts) >= 3:
-            t = parts[1]
-        else:
-            t = t.strip("`")
-    try:
-        return json.loads(t)
-    except json.JSONDecodeError:
-        t = t.replace("\r", " ").replace("\n", " ").strip()
-        start = t.find("{")
-        end = t.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(t[start:end+1])
-        raise
+BEHAVIORAL_HINT_FALLBACK = "Structure your answer around one concrete example: the situation, what you did, and the result."
+
+# Bounded history: the last N turns are sent verbatim and older turns are
+# folded into a rolling summary in the background. 0 keeps the full history.
+HISTORY_VERBATIM_TURNS = setting("BEHAVIORAL_HISTORY_TURNS", 6)
+HISTORY_SUMMARY_MAX_CHARS = 1500
+# Turns past the window that the summary has not caught up with yet are sent
+# as one-liners, at most this many.
+HISTORY_COMPACT_MAX_TURNS = 8
+HISTORY_COMPACT_LINE_CHARS = 160
+SUMMARY_STORE_SIZE = 1024
+
+# Split turns: evaluate the answer and generate the next question as two
+# concurrent calls; the next question is returned first and the evaluation is
+# merged into chat_history when it finishes.
+SPLIT_TURNS = setting("BEHAVIORAL_SPLIT_TURNS", False)
+EVALUATION_WORKERS = 8
+EVALUATION_WAIT_SECONDS = 60.0
+PENDING_EVALUATION_SESSIONS = 1024
+
+# Candidate intents, compiled into one matcher (see phrase_matcher) in
+# priority order: a reply is scanned once for all of them
+CLARIFY_PHRASES = [
+    "don't understand", "dont understand", "didn't understand", "didnt understand",
+    "repeat", "say again", "rephrase", "rephrase it", "simplify", "simpler",
+    "can you explain", "explain again", "not clear", "confused"
+]
+HINT_PHRASES = ["hint", "help", "nudge", "clue", "guide me", "guide"]
+EXTEND_PHRASES = [
+    "can you elaborate", "can you give more details", "can you expand", "can you provide more info",
+    "can you clarify further", "can you explain more", "could you elaborate", "could you expand"
+]
+INTENT_MATCHER = PhraseMatcher(
+    {"clarify": CLARIFY_PHRASES, "hint": HINT_PHRASES, "extend": EXTEND_PHRASES},
+    suffixes=PLURAL_SUFFIXES,  # "hints", "clues"
+)
+
+# ==================== History Summaries ====================
+# Services are rebuilt from to_dict() state on every request, so background
+# summaries are published here by session key and picked up by the next turn
+# in this process; on_summary (see __init__) persists them for other workers.
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+_summary_store: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+_summary_pending = set()
+_summary_lock = threading.Lock()
+
+
+def _publish_summary(session_key: str, summarized_turns: int, summary: str) -> None:
+    with _summary_lock:
+        current = _summary_store.get(session_key)
+        if current and current[0] >= summarized_turns:
+            return
+        _summary_store[session_key] = (summarized_turns, summary)
+        _summary_store.move_to_end(session_key)
+        while len(_summary_store) > SUMMARY_STORE_SIZE:
+            _summary_store.popitem(last=False)
+
+
+# Split-mode evaluations still running, by session key and turn index. Like
+# summaries, they outlive the service instance that started them.
+_evaluation_executor = ThreadPoolExecutor(max_workers=EVALUATION_WORKERS, thread_name_prefix="behavioral-eval")
+_pending_evaluations: "OrderedDict[str, Dict[int, Future]]" = OrderedDict()
+_evaluation_lock = threading.Lock()
 
 # ==================== Interview Service ====================
 
 class InterviewLLMService:
-    def __init__(self, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE, total_questions: int = DEFAULT_TOTAL_QUESTIONS):
-        self.llm = ChatGoogleGenerativeAI(
-            model=model,
-            api_key=GEMINI_API_KEY,
-            temperature=temperature,
-        )
+    def __init__(self, model: Optional[str] = None, temperature: float = DEFAULT_TEMPERATURE, total_questions: int = DEFAULT_TOTAL_QUESTIONS, history_turns: int = HISTORY_VERBATIM_TURNS):
+        # model=None routes each task to its configured tier (see model_routing);
+        # an explicit model pins every task to it.
+        self.model = model
+        self.temperature = temperature
+        self.llm = self._chat("behavioral_turn")
         self.resume_text = None
         self.role = None
-        self.chat_history: List[Dict[str, str]] = []
+        self.chat_history: List[Turn] = []
         self.total_questions = total_questions
+        self.session_key = uuid.uuid4().hex
+        self.history_turns = history_turns
+        self.history_summary = ""
+        self.summarized_turns = 0
+        # (history, question, answer) of split-mode evaluations started by this instance
+        self.evaluation_inputs: Dict[int, Tuple[str, str, str]] = {}
+        # Called with (summarized_turns, summary) when a background summary is done
+        self.on_summary: Optional[Callable[[int, str], None]] = None
 
     def initialize_interview(self, resume_text: str, role: str):
         """Initialize the interview with resume and role context"""
         self.resume_text = resume_text
         self.role = role
         self.chat_history = []
+        self.history_summary = ""
+        self.summarized_turns = 0
     
+    def _format_turn(self, i: int) -> str:
+        item = self.chat_history[i]
+        answer = "N/A" if item.answer is None else item.answer
+        return f"Q{i+1}: {item.question}\nA{i+1}: {answer}"
+
+    def _compact_turn(self, i: int) -> str:
+        item = self.chat_history[i]
+        return f"Q{i+1}: {item.question}"[:HISTORY_COMPACT_LINE_CHARS] + f" (score {item.score})"
+
+    def _history_cutoff(self) -> int:
+        """Index of the first turn that is always sent verbatim."""
+        return max(0, len(self.chat_history) - self.history_turns)
+
     def _build_history_string(self) -> str:
-        """Build formatted history string from chat history."""
-        return "\n".join([
-            f"Q{i+1}: {item['question']}\nA{i+1}: {item.get('answer', 'N/A')}"
-            for i, item in enumerate(self.chat_history)
-        ])
+        """Build formatted history string from chat history.
+
+        In bounded mode (history_turns > 0) older turns are replaced by the
+        rolling summary, so the string stays bounded however long the interview.
+        """
+        if not self.history_turns:
+            return "\n".join(self._format_turn(i) for i in range(len(self.chat_history)))
+
+        self._sync_summary()
+        cutoff = self._history_cutoff()
+        parts = []
+        if self.summarized_turns:
+            parts.append(f"Summary of Q1-Q{self.summarized_turns}:\n{self.history_summary}")
+        lagging = list(range(self.summarized_turns, cutoff))
+        omitted = max(0, len(lagging) - HISTORY_COMPACT_MAX_TURNS)
+        if omitted:
+            parts.append(f"({omitted} earlier turns omitted)")
+        parts.extend(self._compact_turn(i) for i in lagging[omitted:])
+        parts.extend(self._format_turn(i) for i in range(max(cutoff, self.summarized_turns), len(self.chat_history)))
+        return "\n".join(parts)
+
+    def _sync_summary(self):
+        """Adopt a newer summary published by a background fold."""
+        with _summary_lock:
+            published = _summary_store.get(self.session_key)
+        if published and published[0] > self.summarized_turns:
+            self.summarized_turns, self.history_summary = published
+
+    def _schedule_summary(self):
+        """Fold turns that left the verbatim window into the summary, off the request path."""
+        if not self.history_turns:
+            return
+        self._sync_summary()
+        cutoff = self._history_cutoff()
+        if cutoff <= self.summarized_turns:
+            return
+        with _summary_lock:
+            if self.session_key in _summary_pending:
+                return
+            _summary_pending.add(self.session_key)
+        start = self.summarized_turns
+        turns = [self._format_turn(i) for i in range(start, cutoff)]
+        _summary_executor.submit(self._fold_history, self.history_summary, start, turns)
+
+    def _fold_history(self, summary: str, start: int, turns: List[str]):
+        try:
+            updated = self._summarize(summary, turns)
+            _publish_summary(self.session_key, start + len(turns), updated)
+            if self.on_summary is not None:
+                self.on_summary(start + len(turns), updated)
+        except Exception as e:
+            # The next turn falls back to one-line entries for these turns
+            logger.warning(f"History summary failed for {self.session_key}: {e}")
+        finally:
+            with _summary_lock:
+                _summary_pending.discard(self.session_key)
+
+    def _summarize(self, summary: str, turns: List[str]) -> str:
+        messages = prompts.BEHAVIORAL_HISTORY_SUMMARY.render(
+            max_chars=HISTORY_SUMMARY_MAX_CHARS,
+            summary=summary or "(none yet)",
+            turns="\n".join(turns),
+        )
+        resp = self._chat("history_summary").invoke(messages)
+        return (resp.content or "").strip()[:HISTORY_SUMMARY_MAX_CHARS]
     
-    def _invoke_llm(self, prompt: ChatPromptTemplate, **kwargs) -> Dict[str, Any]:
-        """Invoke LLM with prompt and return parsed JSON response."""
-        messages = prompt.format_messages(**kwargs)
-        resp = self.llm.invoke(messages)
-        return _safe_json(resp.content)
+    def _chat(self, task: str) -> RoutedChat:
+        """Chat model for ``task`` at this interview's temperature."""
+        return get_chat_model(task, self.temperature, self.model)
+    
+    def _prefixed_llm(self, hedge_policy: Optional[str] = None) -> PrefixedChat:
+        """Chat model that sends the static interviewer prefix once per session.
+
+        With ``hedge_policy`` the underlying calls are hedged (see hedging).
+        """
+        prefix = prompts.BEHAVIORAL_INTERVIEWER_PREFIX.render(role=self.role, resume=self.resume_text)
+        llm = HedgedChat(self.llm, hedge_policy) if hedge_policy else self.llm
+        return PrefixedChat(llm, self._prefix_key(), prefix)
+
+    def _prefix_key(self) -> str:
+        return f"behavioral:{self.session_key}"
+
+    def _release_prefix(self):
+        """Release the session's cached prefix once no running evaluation can still use it."""
+        key = self._prefix_key()
+        with _evaluation_lock:
+            running = list(_pending_evaluations.get(self.session_key, {}).values())
+
+        def release(_=None):
+            if all(future.done() for future in running):
+                prefix_registry.release(key)
+
+        if not running:
+            release()
+        for future in running:
+            future.add_done_callback(release)
+    
+    def _invoke_llm(self, prompt: prompts.Prompt, schema: Optional[str] = None, chat=None, **kwargs) -> Dict[str, Any]:
+        """Invoke LLM with prompt and return the JSON response validated against ``schema``.
+
+        With a schema the call uses Gemini's constrained JSON output and a
+        bounded repair retry; without one the raw reply is parsed as-is.
+        ``chat`` overrides the model, e.g. with a prefix-cached one.
+        """
+        chat = chat or self.llm
+        messages = prompt.render(**kwargs)
+        if schema is None:
+            resp = chat.invoke(messages)
+            return parse_llm_json(resp.content)
+        return invoke_chat_json(chat, messages, schema)
     
     def _add_question_to_history(self, question_data: Dict[str, Any]):
         """Add question data to chat history."""
-        self.chat_history.append({
-            "question": question_data["question"],
-            "type": question_data["type"],
-            "difficulty": question_data["difficulty"]
-        })
+        self.chat_history.append(Turn(question_data["question"], question_data["type"], question_data["difficulty"]))
     
     def _update_last_answer(self, answer: str, evaluation: Dict[str, Any]):
         """Update the last question with answer and evaluation."""
-        self.chat_history[-1]["answer"] = answer
-        self.chat_history[-1]["evaluation"] = evaluation
+        self.chat_history[-1].answer = answer
+        self.chat_history[-1].evaluation = evaluation
+        self._schedule_summary()
 
     def generate_first_question(self) -> Dict[str, Any]:
         """Generate the first tailored interview question"""
         if not self.resume_text or not self.role:
             raise ValueError("Call initialize_interview() first")
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a senior interviewer crafting precise, tailored questions."),
-            ("human", """Using the candidate profile and target role, generate ONE interview question optimized to start the interview.
-
-Constraints:
-- Make it relevant to the resume and role.
-- Prefer a behavioral warm-up unless the resume shows very strong hands-on indicators, then a light technical warm-up is fine.
-- Set difficulty as 'easy'|'medium'|'hard'.
-Return ONLY valid JSON:
-{{
-  "question": "one clear question",
-  "type": "behavioral|technical",
-  "difficulty": "easy|medium|hard",
-  "rationale": "why this question as opener"
-}}
-
-Role: {role}
-Candidate Profile:
-{profile}""")
-        ])
-
-        data = self._invoke_llm(prompt, role=self.role, profile=self.resume_text)
+        data = self._invoke_llm(prompts.BEHAVIORAL_FIRST_QUESTION, "interview_question", chat=self._chat("behavioral_question"), role=self.role, profile=self.resume_text)
         self._add_question_to_history(data)
         return data
 
+    def start_with_question(self, question_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Start the interview with a pre-generated first question (see question_pool)."""
+        if not self.resume_text or not self.role:
+            raise ValueError("Call initialize_interview() first")
+        self._add_question_to_history(question_data)
+        return question_data
+
     # ------------- Interactive helpers -------------
     def detect_intent(self, user_text: str) -> str:
         """Detect user intent for the current turn.
 
         Returns one of: 'clarify' | 'hint' | 'answer'
         """
-        t = (user_text or "").lower().strip()
-        clarify_keywords = [
-            "don't understand", "dont understand", "didn't understand", "didnt understand",
-            "repeat", "say again", "rephrase", "rephrase it", "simplify", "simpler",
-            "can you explain", "explain again", "not clear", "confused"
-        ]
-        hint_keywords = ["hint", "help", "nudge", "clue", "guide me", "guide"]
-
-        if any(k in t for k in clarify_keywords):
+        matched = INTENT_MATCHER.match(user_text)
+        if "clarify" in matched:
             return "clarify"
-        if any(k in t for k in hint_keywords):
+        if "hint" in matched:
             return "hint"
         return "answer"
 
@@ -137,151 +290,161 @@ Candidate Profile:
         """Rephrase the last question more simply without changing its intent."""
         if not self.chat_history:
             raise ValueError("No question to rephrase. Start the interview first.")
-        last_q = self.chat_history[-1]["question"]
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a helpful interviewer. You can rephrase questions more simply without giving away answers."),
-            ("human", """Rewrite the following interview question in simpler, clearer terms for the same role.
-Keep the same intent and difficulty, but use plain language and be concise (1 sentence).
-Return ONLY JSON: {{ "rephrased_question": "..." }}
-
-Question: {q}
-Role: {role}
-""")
-        ])
+        last_q = self.chat_history[-1].question
 
-        data = self._invoke_llm(prompt, q=last_q, role=self.role)
-        return data.get("rephrased_question", last_q)
+        data = self._invoke_llm(prompts.BEHAVIORAL_REPHRASE, "rephrase", chat=HedgedChat(self._chat("rephrase"), "rephrase"), q=last_q, role=self.role)
+        return data.get("rephrased_question") or last_q
 
     def hint_for_current_question(self) -> str:
         """Provide a subtle, non-spoiler hint for the current question."""
         if not self.chat_history:
             raise ValueError("No question to hint for. Start the interview first.")
-        last_q = self.chat_history[-1]["question"]
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a coaching interviewer: offer subtle, guiding hints without revealing full answers."),
-            ("human", """Given the role, resume, and the current question, provide 1 brief hint to guide the candidate.
-Rules:
-- Do NOT reveal the full answer
-- Keep it short (max 1 sentence)
-- Focus on guiding their thinking (e.g., what concepts to consider)
-Return ONLY JSON: {{ "hint": "..." }}
-
-Role: {role}
-Resume: {resume}
-Question: {q}
-""")
-        ])
+        if is_local("hint"):
+            return self._local_hint()
+        last_q = self.chat_history[-1].question
+
+        data = self._invoke_llm(prompts.BEHAVIORAL_HINT, "hint", chat=HedgedChat(self._chat("hint"), "hint"), role=self.role, resume=self.resume_text, q=last_q)
+        return data.get("hint") or DEFAULT_HINT_FALLBACK
 
-        data = self._invoke_llm(prompt, role=self.role, resume=self.resume_text, q=last_q)
-        return data.get("hint", DEFAULT_HINT_FALLBACK)
+    def _local_hint(self) -> str:
+        """Heuristic hint used when hints are routed to the local tier."""
+        if self.chat_history[-1].type == "behavioral":
+            return BEHAVIORAL_HINT_FALLBACK
+        return DEFAULT_HINT_FALLBACK
 
-    def evaluate_and_get_next_question(self, user_answer: str, generate_next: bool = True) -> Dict[str, Any]:
+    def evaluate_and_get_next_question(self, user_answer: str, generate_next: bool = True, hedge: bool = False, split: Optional[bool] = None) -> Dict[str, Any]:
         """Evaluate the latest answer and optionally generate the next adaptive question.
 
         Params:
         - user_answer: the candidate's answer for the last asked question
         - generate_next: when False, only evaluate and do NOT generate/append a next question (useful for final question)
+        - hedge: hedge the LLM call against tail latency (interactive turns)
+        - split: run evaluation and next-question generation as concurrent calls
+          and return as soon as the next question is ready (defaults to BEHAVIORAL_SPLIT_TURNS)
         Returns:
-        - dict with at least 'evaluation'; includes 'next_question' only when generate_next=True
+        - dict with at least 'evaluation'; includes 'next_question' only when generate_next=True.
+          In split mode 'evaluation' is None and 'evaluation_pending' is True; the
+          evaluation is merged into chat_history once it finishes.
         """
         if not self.chat_history:
             raise ValueError("No previous question found. Call generate_first_question() first")
 
+        self._merge_evaluations()
         last_q = self.chat_history[-1]
         history_str = self._build_history_string()
+        split = SPLIT_TURNS if split is None else split
 
-        if generate_next:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are a senior interviewer. Evaluate answers, adapt the next question, and be conversational and supportive without revealing full solutions."),
-                ("human", """Context:
-Role: {role}
-Resume: {resume}
-
-Previous Interview History:
-{history}
-
-Latest Question: {latest_q}
-Latest Answer: {latest_a}
-
-Task:
-1) Briefly evaluate the latest answer (score 0-10, strengths, improvements, reason).
-2) Generate ONE next question tailored to the role and resume.
-3) Adapt difficulty:
-   - score >= 8 → increase difficulty
-   - score 5-7 → keep difficulty
-   - score <= 4 → decrease difficulty
-
-Also produce a brief coaching tip (one sentence) that helps the candidate improve next time, WITHOUT giving away full answers.
-
-Return ONLY valid JSON:
-{{
-  "evaluation": {{
-    "score": 7,
-    "strengths": ["..."],
-    "improvements": ["..."],
-    "reason": "..."
-  }},
-    "coach_tip": "one sentence helpful but non-spoiler guidance",
-  "next_question": {{
-    "question": "one clear question",
-    "type": "behavioral|technical",
-    "difficulty": "easy|medium|hard",
-    "rationale": "why this next"
-  }}
-}}""")
-            ])
-
-            result = self._invoke_llm(
-                prompt,
-                role=self.role,
-                resume=self.resume_text,
-                history=history_str,
-                latest_q=last_q["question"],
-                latest_a=user_answer,
-            )
-
+        if not generate_next:
+            result = self._evaluate_answer(history_str, last_q.question, user_answer, hedge)
             self._update_last_answer(user_answer, result["evaluation"])
-            self._add_question_to_history(result["next_question"])
+            # Last answer: the interviewer prefix is not needed any more
+            self._release_prefix()
             return result
-        else:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are a senior interviewer. Evaluate answers precisely and provide a brief coaching tip, without revealing full solutions."),
-                ("human", """Context:
-Role: {role}
-Resume: {resume}
-
-Previous Interview History:
-{history}
-
-Latest Question: {latest_q}
-Latest Answer: {latest_a}
-
-Task:
-Evaluate the latest answer with a brief JSON:
-{{
-  "evaluation": {{
-    "score": 7,
-    "strengths": ["..."],
-    "improvements": ["..."],
-    "reason": "..."
-    }},
-    "coach_tip": "one sentence helpful but non-spoiler guidance"
-}}""")
-            ])
-
-            result = self._invoke_llm(
-                prompt,
-                role=self.role,
-                resume=self.resume_text,
-                history=history_str,
-                latest_q=last_q["question"],
-                latest_a=user_answer,
-            )
 
-            self._update_last_answer(user_answer, result["evaluation"])
-            return result
+        if split:
+            return self._split_turn(history_str, last_q.question, user_answer, hedge)
+
+        result = self._invoke_llm(
+            prompts.BEHAVIORAL_EVALUATION_AND_NEXT,
+            "evaluation_and_next_question",
+            chat=self._prefixed_llm("behavioral_answer" if hedge else None),
+            history=history_str,
+            latest_q=last_q.question,
+            latest_a=user_answer,
+        )
+
+        self._update_last_answer(user_answer, result["evaluation"])
+        self._add_question_to_history(result["next_question"])
+        return result
+
+    def _evaluate_answer(self, history_str: str, latest_q: str, user_answer: str, hedge: bool = False) -> Dict[str, Any]:
+        """Evaluate the latest answer only (evaluation + coach tip)."""
+        return self._invoke_llm(
+            prompts.BEHAVIORAL_EVALUATION,
+            "evaluation_turn",
+            chat=self._prefixed_llm("behavioral_answer" if hedge else None),
+            history=history_str,
+            latest_q=latest_q,
+            latest_a=user_answer,
+        )
+
+    def _generate_next_question(self, history_str: str, latest_q: str, user_answer: str, hedge: bool = False) -> Dict[str, Any]:
+        """Generate the next question without scoring the latest answer (split mode)."""
+        return self._invoke_llm(
+            prompts.BEHAVIORAL_NEXT_QUESTION,
+            "interview_question",
+            chat=self._prefixed_llm("behavioral_next_question" if hedge else None),
+            history=history_str,
+            latest_q=latest_q,
+            latest_a=user_answer,
+        )
+
+    def _split_turn(self, history_str: str, latest_q: str, user_answer: str, hedge: bool) -> Dict[str, Any]:
+        """Run evaluation and next-question generation concurrently; return with the question."""
+        evaluation = _evaluation_executor.submit(self._evaluate_answer, history_str, latest_q, user_answer, hedge)
+        try:
+            next_question = self._generate_next_question(history_str, latest_q, user_answer, hedge)
+        except Exception:
+            evaluation.cancel()
+            raise
+        return self._record_split_turn(history_str, latest_q, user_answer, evaluation, next_question)
+
+    def _record_split_turn(self, history_str: str, latest_q: str, user_answer: str, evaluation: Future, next_question: Dict[str, Any]) -> Dict[str, Any]:
+        idx = len(self.chat_history) - 1
+        self.evaluation_inputs[idx] = (history_str, latest_q, user_answer)
+        with _evaluation_lock:
+            _pending_evaluations.setdefault(self.session_key, {})[idx] = evaluation
+            _pending_evaluations.move_to_end(self.session_key)
+            while len(_pending_evaluations) > PENDING_EVALUATION_SESSIONS:
+                _pending_evaluations.popitem(last=False)
+        self.chat_history[idx].answer = user_answer
+        self._schedule_summary()
+        self._add_question_to_history(next_question)
+        return {"evaluation": None, "evaluation_pending": True, "next_question": next_question}
+
+    def _merge_evaluations(self, timeout: Optional[float] = 0) -> bool:
+        """Merge finished split-mode evaluations into chat_history.
+
+        ``timeout=0`` only takes evaluations that are already done; otherwise
+        waits up to ``timeout`` seconds for each one. Returns True when none
+        are left pending.
+        """
+        with _evaluation_lock:
+            pending = dict(_pending_evaluations.get(self.session_key, {}))
+        if not pending:
+            return True
+        for idx, future in sorted(pending.items()):
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                # The turn keeps its answer; it just has no evaluation
+                logger.warning(f"Evaluation of turn {idx + 1} failed for {self.session_key}: {e}")
+                result = None
+            if result and idx < len(self.chat_history):
+                self.chat_history[idx].evaluation = result["evaluation"]
+                if result.get("coach_tip"):
+                    self.chat_history[idx].coach_tip = result["coach_tip"]
+            with _evaluation_lock:
+                session = _pending_evaluations.get(self.session_key, {})
+                session.pop(idx, None)
+                if not session:
+                    _pending_evaluations.pop(self.session_key, None)
+        with _evaluation_lock:
+            return self.session_key not in _pending_evaluations
+
+    def wait_for_evaluations(self, timeout: float = EVALUATION_WAIT_SECONDS) -> bool:
+        """Block until pending split-mode evaluations are merged (e.g. before final feedback)."""
+        return self._merge_evaluations(timeout=timeout)
+
+    def evaluate_turn(self, idx: int, history_str: str, question: str, answer: str) -> Dict[str, Any]:
+        """Evaluate turn ``idx`` now, e.g. a split-mode evaluation lost with another worker."""
+        result = self._evaluate_answer(history_str, question, answer)
+        self.chat_history[idx].evaluation = result["evaluation"]
+        if result.get("coach_tip"):
+            self.chat_history[idx].coach_tip = result["coach_tip"]
+        return result
 
     # ------------- Web-friendly helpers -------------
     def get_current_question(self) -> Dict[str, Any]:
@@ -289,63 +452,107 @@ Evaluate the latest answer with a brief JSON:
         if not self.chat_history:
             raise ValueError("No question available. Initialize and generate the first question first.")
         last = self.chat_history[-1]
-        return {"question": last["question"], "type": last["type"], "difficulty": last["difficulty"]}
+        return {"question": last.question, "type": last.type, "difficulty": last.difficulty}
 
     def answer(self, user_answer: str) -> Dict[str, Any]:
         """Answer the current question and advance to the next one."""
-        return self.evaluate_and_get_next_question(user_answer, generate_next=True)
+        return self.evaluate_and_get_next_question(user_answer, generate_next=True, hedge=True)
+
+    def answer_stream(self, user_answer: str) -> Iterator[Dict[str, Any]]:
+        """Streaming variant of answer(), always in split mode.
+
+        Yields {"type": "token", "text"} events with the next question's text
+        as it is generated, then {"type": "done", ...} with the same fields as
+        a split-mode answer(). The evaluation is merged later as usual.
+        """
+        if not self.chat_history:
+            raise ValueError("No previous question found. Call generate_first_question() first")
+
+        self._merge_evaluations()
+        latest_q = self.chat_history[-1].question
+        history_str = self._build_history_string()
+        evaluation = _evaluation_executor.submit(self._evaluate_answer, history_str, latest_q, user_answer, True)
+
+        try:
+            messages = prompts.BEHAVIORAL_NEXT_QUESTION.render(
+                history=history_str, latest_q=latest_q, latest_a=user_answer,
+            )
+            # Unconstrained, so "question" comes first as in the prompt (see json_generation_config)
+            extractor = StreamingFieldExtractor("question")
+            parts = []
+            config = json_generation_config("interview_question", constrained=False)
+            for chunk in self._prefixed_llm().stream(messages, generation_config=config):
+                raw = chunk_text(chunk)
+                parts.append(raw)
+                text = extractor.feed(raw)
+                if text:
+                    yield {"type": "token", "text": text}
+            try:
+                next_question = parse_llm_json("".join(parts), "interview_question")
+            except LLMJSONError:
+                # Streams cannot be repaired in place; fall back to a regular call
+                next_question = self._generate_next_question(history_str, latest_q, user_answer, hedge=True)
+        except BaseException:
+            evaluation.cancel()
+            raise
+
+        yield {"type": "done", **self._record_split_turn(history_str, latest_q, user_answer, evaluation, next_question)}
 
     def feedback(self) -> Dict[str, Any]:
         return self.generate_final_feedback()
 
     def transcript(self) -> List[Dict[str, Any]]:
-        return self.chat_history
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {"role": self.role, "resume_text": self.resume_text, "chat_history": self.chat_history}
+        self.wait_for_evaluations()
+        return [turn.to_dict() for turn in self.chat_history]
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Any]:
+        """Serializable state; ``compact`` stores chat_history as rows (see turns)."""
+        self._merge_evaluations()
+        return {
+            "role": self.role,
+            "resume_text": self.resume_text,
+            "chat_history": encode(self.chat_history) if compact else [turn.to_dict() for turn in self.chat_history],
+            "session_key": self.session_key,
+            "total_questions": self.total_questions,
+            "history_summary": self.history_summary,
+            "summarized_turns": self.summarized_turns,
+        }
 
     @staticmethod
-    def from_dict(state: Dict[str, Any], model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> "InterviewLLMService":
-        svc = InterviewLLMService(model=model, temperature=temperature)
+    def from_dict(state: Dict[str, Any], model: Optional[str] = None, temperature: float = DEFAULT_TEMPERATURE) -> "InterviewLLMService":
+        svc = InterviewLLMService(model=model, temperature=temperature, total_questions=state.get("total_questions", DEFAULT_TOTAL_QUESTIONS))
         svc.role = state.get("role")
         svc.resume_text = state.get("resume_text")
-        svc.chat_history = state.get("chat_history", [])
+        svc.chat_history = decode(Turn, state.get("chat_history", []))
+        svc.session_key = state.get("session_key") or svc.session_key
+        svc.history_summary = state.get("history_summary", "")
+        svc.summarized_turns = state.get("summarized_turns", 0)
+        svc._merge_evaluations()
         return svc
 
     def generate_final_feedback(self) -> Dict[str, Any]:
         """Generate comprehensive feedback summary"""
+        self.wait_for_evaluations()
+        self._release_prefix()
         transcript = "\n\n".join([
-            f"Question {i+1} ({item['type']}, {item['difficulty']}):\n{item['question']}\n\nAnswer:\n{item.get('answer', 'N/A')}\n\nScore: {item.get('evaluation', {}).get('score', 'N/A')}"
+            f"Question {i+1} ({item.type}, {item.difficulty}):\n{item.question}\n\nAnswer:\n{'N/A' if item.answer is None else item.answer}\n\nScore: {item.score}"
             for i, item in enumerate(self.chat_history)
         ])
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a senior hiring manager providing comprehensive interview feedback."),
-            ("human", """Based on the complete interview below, provide a detailed performance summary.
-
-Role: {role}
-Resume: {resume}
-
-Full Interview Transcript:
-{transcript}
-
-Provide a comprehensive analysis in JSON format:
-{{
-  "overall_score": (0-10),
-  "overall_assessment": "2-3 sentence summary",
-  "strengths": ["...", "...", "..."],
-  "areas_for_improvement": ["...", "...", "..."],
-  "technical_proficiency": {{"score": (0-10), "comment": "..."}},
-  "communication_skills": {{"score": (0-10), "comment": "..."}},
-  "problem_solving": {{"score": (0-10), "comment": "..."}},
-    "key_focus_areas": ["...", "...", "..."],
-    "recommendation": "Strong Hire|Hire|Maybe|No Hire"
-}}""")
-        ])
-        
-        return self._invoke_llm(prompt, role=self.role, resume=self.resume_text, transcript=transcript)
+        return self._invoke_llm(prompts.BEHAVIORAL_FINAL_FEEDBACK, "final_feedback", chat=self._chat("final_feedback"), role=self.role, resume=self.resume_text, transcript=transcript)
+
 
 
+def generate_opening_questions(role: str, job_description: str, profile: str, count: int, temperature: float = DEFAULT_TEMPERATURE) -> List[Dict[str, Any]]:
+    """Generate ``count`` distinct opening questions for a role and a resume profile bucket.
+
+    Used to pre-fill the opening question pool, so the prompt describes a
+    profile rather than one candidate's resume.
+    """
+    messages = prompts.BEHAVIORAL_OPENING_QUESTIONS.render(count=count, role=role, job_description=job_description, profile=profile)
+    data = invoke_chat_json(get_chat_model("behavioral_question", temperature), messages, "opening_questions")
+    return data["questions"]
+
 
 def main():
     mock_resume_text = """
@@ -384,10 +591,7 @@ def main():
         # print("="*60)
 
         # Detect if user is trying to extend the question (not a real answer)
-        extend_keywords = [
-            "can you elaborate", "can you give more details", "can you expand", "can you provide more info", "can you clarify further", "can you explain more", "could you elaborate", "could you expand"
-        ]
-        is_extending = any(k in ans.lower() for k in extend_keywords)
+        is_extending = "extend" in INTENT_MATCHER.match(ans)
 
         if intent == "clarify":
             print("\n🔄 Let me rephrase that question for you:")
@@ -442,17 +646,12 @@ def main():
     shown = 0
     for i, item in enumerate(service.chat_history, start=1):
         # Skip placeholder questions that never received an answer
-        if "answer" not in item:
+        if item.answer is None:
             continue
         shown += 1
-        q = item.get("question", "")
-        a = item.get("answer", "N/A")
-        score = item.get("evaluation", {}).get("score", "N/A")
-        qtype = item.get("type", "?")
-        diff = item.get("difficulty", "?")
-        print(f"Q{shown} [{qtype}, {diff}]: {q}")
-        print(f"A{shown}: {a}")
-        print(f"Score: {score}\n")
+        print(f"Q{shown} [{item.type}, {item.difficulty}]: {item.question}")
+        print(f"A{shown}: {item.answer}")
+        print(f"Score: {item.score}\n")
 
 
 if __name__ == "__main__":
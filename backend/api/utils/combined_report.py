@@ -0,0 +1,109 @@
+"""
+Combined Report
+===============
+Idempotent combined (behavioral + DSA) reports for get_combined_final_report.
+
+A combined report is a pure function of its inputs: the behavioral report
+and the DSA session state (dsa_interview.session_fingerprint). Their
+fingerprint is stored on the report next to report_data, so a request whose
+inputs are unchanged is answered from report_data without rebuilding the DSA
+report or writing the row, and the row is only written when the fingerprint
+changes. Concurrent requests for the same report and fingerprint collapse
+into one computation: the first builds and saves, the others wait for its
+result.
+
+When the DSA session is not in this process (the in-memory session log does
+not survive restarts), the stored dsa_report stands in for it.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Tuple
+
+from .dsa_interview import final_report as dsa_final_report, session_fingerprint
+from .metrics import metrics
+from .scoring import calculate_overall_score, determine_overall_recommendation, score_to_rating
+
+# Bumped when the combined report's shape or scoring changes
+REPORT_VERSION = "1"
+
+_inflight: Dict[Tuple[str, str], Future] = {}
+_lock = threading.Lock()
+
+
+def _dsa_state(report) -> str:
+    fingerprint = session_fingerprint(report.dsa_session_idx) if report.dsa_session_idx >= 0 else None
+    if fingerprint is not None:
+        return fingerprint
+    return "stored:" + json.dumps(report.dsa_report or {}, sort_keys=True, default=str)
+
+
+def fingerprint(report) -> str:
+    """Fingerprint of everything the combined report is built from."""
+    parts = [
+        REPORT_VERSION,
+        json.dumps(report.behavioral_report or {}, sort_keys=True, default=str),
+        _dsa_state(report),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _build(report, report_fingerprint: str) -> Dict[str, Any]:
+    """Build the combined report and save it with its fingerprint."""
+    dsa_report = report.dsa_report or {}
+    if session_fingerprint(report.dsa_session_idx) is not None:
+        dsa_report = dsa_final_report(report.dsa_session_idx, return_dict=True)
+        report.dsa_report = dsa_report
+
+    behavioral_report = report.behavioral_report or {}
+    combined_report = {
+        'behavioral_interview': behavioral_report,
+        'dsa_interview': dsa_report,
+        'overall_recommendation': determine_overall_recommendation(behavioral_report, dsa_report)
+    }
+
+    behavioral_score = behavioral_report.get('overall_score', 0)
+    dsa_score = dsa_report.get('overall_score', 0) if dsa_report else 0
+    overall_score = calculate_overall_score(behavioral_score, dsa_score)
+
+    report.overall_score = overall_score
+    report.overall_rating = score_to_rating(overall_score)
+    report.strengths = behavioral_report.get('strengths', [])
+    report.areas_for_improvement = behavioral_report.get('areas_for_improvement', [])
+    report.report_data = combined_report
+    report.report_fingerprint = report_fingerprint
+    # Only the columns that changed are written (see DirtyFieldsMixin)
+    report.save()
+    metrics.incr("combined_report.built")
+    return combined_report
+
+
+def get_combined_report(report) -> Dict[str, Any]:
+    """The combined report for ``report``, rebuilt and saved only when its inputs changed."""
+    report_fingerprint = fingerprint(report)
+    if report.report_fingerprint == report_fingerprint and report.report_data:
+        metrics.incr("combined_report.hits")
+        return copy.deepcopy(report.report_data)
+
+    key = (str(report.id), report_fingerprint)
+    with _lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        metrics.incr("combined_report.collapsed")
+        return copy.deepcopy(future.result())
+
+    try:
+        future.set_result(_build(report, report_fingerprint))
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+    return copy.deepcopy(future.result())
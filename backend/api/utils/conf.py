@@ -0,0 +1,18 @@
+"""
+Settings Access
+===============
+Django settings for the interview engines, which also run outside Django
+(CLI usage): when settings are not configured, the given default applies.
+"""
+
+from typing import Any
+
+
+def setting(name: str, default: Any) -> Any:
+    """``settings.<name>``, or ``default`` if it is unset or Django is not configured."""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        # Settings not configured (module used from the CLI)
+        return default
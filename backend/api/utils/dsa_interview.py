@@ -1,7 +1,25 @@
 import os
+import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+from . import prompts
+from .analysis_cache import analysis_cache, make_key as make_analysis_key
+from .conf import setting
+from .hedging import HedgedChat
+from .llm_json import invoke_chat_json
+from .metrics import metrics, percentile
+from .model_routing import chunk_text, get_chat_model
+from .phrase_matcher import PhraseMatcher
+from .prompt_cache import PrefixedChat, prefix_registry
+from .pseudocode_analyzer import analyze as analyze_structure
+from .session_log import session_log_writer
+from .turns import Exchange, Message
 
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -9,17 +27,24 @@ if not GEMINI_API_KEY:
     raise ValueError("Missing GEMINI_API_KEY")
 
 # ==================== Constants ====================
-DEFAULT_MODEL = "gemini-2.5-flash"
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_ROLE = "general"
 DEFAULT_DIFFICULTY = "medium"
 TRIVIAL_PSEUDOCODE_LENGTH = 10
-DEFAULT_SESSION_LOG_PATH = "session_logs.jsonl"
+ANALYSIS_WORKERS = 4
+
+# Bounded conversation window: the interviewer prompt prefix stays pinned
+# (see _session_chat) and only the last N messages after it are sent, so
+# turn cost stays flat in long conversations. 0 sends the full history.
+HISTORY_MESSAGES = setting("DSA_HISTORY_MESSAGES", 12)
+WINDOW_SESSIONS = 1024
+TURN_PAYLOAD_SAMPLES = 500
 
 # Candidate phrases
 CANDIDATE_EXIT_PHRASES = [
     "exit", "quit", "bye", "goodbye", "give up", "i give up", "can't solve", "cannot solve",
-    "stuck", "don't know", "do not know", "not sure", "stop", "end interview"
+    "stuck", "don't know", "do not know", "not sure", "stop", "end interview",
+    "giving up", "quitting", "end the interview"
 ]
 
 CANDIDATE_CONFIDENCE_PHRASES = [
@@ -29,18 +54,32 @@ CANDIDATE_CONFIDENCE_PHRASES = [
 
 CANDIDATE_COMPLETION_PHRASES = [
     "i am done", "i'm done", "done", "completed", "that's it", "that is it",
-    "finished", "i'm finished", "i am finished", "all done", "i'm all done"
+    "finished", "i'm finished", "i am finished", "all done", "i'm all done",
+    "i've finished", "i have finished", "i've completed", "i have completed"
 ]
 
 INTERVIEWER_CLOSE_PHRASES = [
     "good job", "well done", "thank you", "excellent work", "that's all", "great work",
-    "this concludes", "we're done", "no further questions", "end of interview", "goodbye", "bye"
+    "this concludes", "we're done", "no further questions", "end of interview", "goodbye", "bye",
+    "thanks for your time", "that is all", "we are done", "concludes our"
 ]
 
+# All phrase lists compiled once; a reply is scanned in one pass (see
+# phrase_matcher). Candidate intents are declared in priority order.
+# Matches are whole words without suffixes ("stops" and "exits" describe
+# code), so inflected forms are listed as phrases.
+CANDIDATE_PHRASE_MATCHER = PhraseMatcher({
+    "giveup": CANDIDATE_EXIT_PHRASES,
+    "confident": CANDIDATE_CONFIDENCE_PHRASES,
+    "completed": CANDIDATE_COMPLETION_PHRASES,
+})
+INTERVIEWER_CLOSE_MATCHER = PhraseMatcher({"close": INTERVIEWER_CLOSE_PHRASES})
+
 # Closing messages
 CLOSING_CANDIDATE_GIVEUP = "Understood. We'll wrap up here. Thank you for your time and effort today."
 CLOSING_CANDIDATE_CONFIDENT = "Great! I'm glad things are clearer now. Thank you for working through this with me."
 CLOSING_CANDIDATE_COMPLETED = "Excellent! Thank you for completing the pseudocode analysis. We'll wrap up here."
+CLOSING_TRIVIAL_SUBMISSION = "It looks like no pseudocode was submitted, so there is nothing to discuss yet. We'll wrap up here. Thank you for your time."
 
 # Default analysis structure
 DEFAULT_HIDDEN_ANALYSIS = {
@@ -53,115 +92,135 @@ DEFAULT_HIDDEN_ANALYSIS = {
 }
 
 # ==================== Global State ====================
-llm = ChatGoogleGenerativeAI(
-    model=DEFAULT_MODEL,
-    api_key=GEMINI_API_KEY,
-    temperature=DEFAULT_TEMPERATURE
-)
+# Models are chosen per task by the routing table (see model_routing)
+llm = get_chat_model("dsa_turn", DEFAULT_TEMPERATURE)
 
 ANALYSIS_LOG = []
+# Fingerprint of the session state last queued for the session log, by session index
+_logged_sessions = {}
 
-# ==================== Helper Functions ====================
+# Per-session message windows, appended to as messages arrive instead of
+# being rebuilt from session_log["messages"] every turn. Evicted windows
+# are rebuilt on next use.
+_windows: "OrderedDict[int, deque]" = OrderedDict()
+_windows_lock = threading.Lock()
+_turn_payloads = deque(maxlen=TURN_PAYLOAD_SAMPLES)
 
-def _safe_json(text: str):
-    """Safely parse JSON from text, handling markdown code blocks."""
-    t = text.strip()
-    if t.startswith("```"):
-        parts = t.split("```")
-        if len(parts) >= 3:
-            t = parts[1]
-        else:
-            t = t.strip("`")
-    try:
-        return json.loads(t)
-    except:
-        start = t.find("{")
-        end = t.rfind("}")
-        if start != -1 and end != -1:
-            return json.loads(t[start:end+1])
-        raise
+def _payload_stats() -> dict:
+    recent = list(_turn_payloads)
+    return {"p50_chars": percentile(recent, 0.5), "p95_chars": percentile(recent, 0.95), "max_chars": max(recent, default=0)}
+
+metrics.register_gauge("dsa.turn_payload", _payload_stats)
+
+# The hidden analysis is not part of the interviewer prompt, so it runs
+# alongside the first interviewer turn instead of before it.
+_analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="dsa-analysis")
+
+# ==================== Helper Functions ====================
 
 def _create_hidden_analysis(question_json: str, problem_statement: str, pseudocode: str) -> dict:
-    """Create hidden backend analysis of pseudocode."""
-    hidden_prompt = f"""
-You are analyzing a candidate's pseudocode for the following problem. Produce STRICT JSON only.
-
-Question JSON:
-{question_json}
-
-Problem Statement:
-{problem_statement}
-
-Candidate Pseudocode:
-{pseudocode}
-
-Return ONLY valid JSON with keys:
-{{
-  "approach_summary": "string",
-  "time_complexity": "string",
-  "space_complexity": "string",
-  "classification": "brute-force|optimized|unclear",
-  "potential_improvements": ["string", "string"],
-  "edge_cases": ["string", "string"]
-}}
-"""
-
-    hidden_messages = [
-        ("system", "You are a precise algorithm evaluator. Output only valid JSON."),
-        ("human", hidden_prompt),
-    ]
+    """Create hidden backend analysis of pseudocode.
+
+    Analyses are cached by question and normalized pseudocode (see
+    analysis_cache); fallbacks after a failed call are not cached.
+    """
+    cache_key = make_analysis_key(question_json, prompts.DSA_HIDDEN_ANALYSIS.version, pseudocode)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    hidden_messages = prompts.DSA_HIDDEN_ANALYSIS.render(
+        question_json=question_json, problem_statement=problem_statement, pseudocode=pseudocode,
+    )
     try:
-        hidden_resp = llm.invoke(hidden_messages)
-        return _safe_json(getattr(hidden_resp, "content", str(hidden_resp)))
+        analysis = invoke_chat_json(get_chat_model("dsa_hidden_analysis", DEFAULT_TEMPERATURE), hidden_messages, "hidden_analysis")
     except Exception:
         return DEFAULT_HIDDEN_ANALYSIS.copy()
+    analysis_cache.put(cache_key, analysis)
+    return analysis
 
-def _create_interviewer_prompt(question_json: str, problem_statement: str, pseudocode: str) -> str:
-    """Create interviewer prompt for pseudocode evaluation."""
-    return f"""
-You are a DSA interviewer evaluating a candidate's pseudocode for the following problem.
+def _reconstruct_messages(session_messages: list) -> list:
+    """Reconstruct LangChain message format from session messages."""
+    return [(msg.role, msg.content) for msg in session_messages if msg.role in ("system", "human", "assistant")]
+
+def _window(session_idx: int, session_log: dict) -> deque:
+    """The session's bounded message window, rebuilt once if missing."""
+    with _windows_lock:
+        window = _windows.get(session_idx)
+        if window is not None:
+            _windows.move_to_end(session_idx)
+            return window
+    # Even length: messages alternate, so the window always starts with an
+    # interviewer message, right after the prefix's human message
+    size = HISTORY_MESSAGES + HISTORY_MESSAGES % 2 or None
+    window = deque(_reconstruct_messages(session_log["messages"]), maxlen=size)
+    with _windows_lock:
+        _windows[session_idx] = window
+        while len(_windows) > WINDOW_SESSIONS:
+            _windows.popitem(last=False)
+    return window
+
+def _append_message(session_idx: int, session_log: dict, role: str, content: str) -> None:
+    window = _window(session_idx, session_log)
+    session_log["messages"].append(Message(role, content))
+    window.append((role, content))
+
+def _release_session(session_idx: int) -> None:
+    """Drop per-session caches once the conversation is over."""
+    prefix_registry.release(_session_cache_key(session_idx))
+    with _windows_lock:
+        _windows.pop(session_idx, None)
+
+def _record_turn(messages: list, cpu_start: float) -> None:
+    """Per-turn metrics: history payload sent after the prefix and thread CPU time."""
+    _turn_payloads.append(sum(len(content) for _, content in messages))
+    metrics.observe("dsa.turn_cpu", time.thread_time() - cpu_start)
+
+def _session_prefix(session_log: dict) -> list:
+    """The session's static prompt prefix (system + interviewer prompt).
+
+    Sessions keep a reference to the prompt version instead of a copy of
+    the rendered prefix; it is rebuilt from the question and pseudocode.
+    """
+    question = session_log["question"]
+    return prompts.DSA_INTERVIEWER.render(
+        question_json=json.dumps(question, ensure_ascii=False),
+        problem_statement=question.get("problem_statement", ""),
+        pseudocode=session_log["pseudocode"],
+        structure_summary=_structure(session_log["pseudocode"]).summary(),
+    )
 
-Full Question (from generator, JSON):
-{question_json}
+def _structure(pseudocode: str):
+    """Local structure analysis of the pseudocode (see pseudocode_analyzer)."""
+    return analyze_structure(pseudocode, TRIVIAL_PSEUDOCODE_LENGTH)
 
-Problem Statement (reference):
-{problem_statement}
+def _session_cache_key(session_idx: int) -> str:
+    return f"dsa:{session_idx}"
 
-Candidate's Pseudocode:
-{pseudocode}
+def _session_chat(session_idx: int, session_log: dict, hedge: bool = False) -> PrefixedChat:
+    """Chat model that sends the session's static prefix once (see prompt_cache).
 
-Your tasks:
-1) First turn (no candidate reply yet): Ask ONE concise follow-up question. Do NOT reveal any analysis.
-2) Subsequent turns (after the candidate replies): Start with a brief, specific acknowledgment reflecting their last answer (1-2 short sentences), THEN ask exactly ONE follow-up question that ties directly to their response. Do NOT reveal any hidden analysis.
-3) Continue until you feel the candidate has fully addressed concerns, then end with a supportive closing statement.
-Output constraints: On each turn, output ONLY one compact message that is either (a) acknowledgment + one follow-up question, or (b) a closing statement. No extra commentary, no analysis.
-"""
+    With hedge=True the calls are hedged against tail latency (see hedging).
+    """
+    prefix = _session_prefix(session_log)
+    chat = HedgedChat(llm, "dsa_turn") if hedge else llm
+    return PrefixedChat(chat, _session_cache_key(session_idx), prefix)
 
-def _reconstruct_messages(session_messages: list) -> list:
-    """Reconstruct LangChain message format from session messages."""
-    messages = []
-    for msg in session_messages:
-        role = msg["role"]
-        if role in ("system", "human", "assistant"):
-            messages.append((role, msg["content"]))
-    return messages
-
-def _handle_candidate_closing(session_log: dict, candidate_reply: str, reply_lower: str) -> dict:
+def _handle_candidate_closing(session_log: dict, candidate_reply: str) -> dict:
     """Handle candidate-initiated closing scenarios."""
-    if any(p in reply_lower for p in CANDIDATE_EXIT_PHRASES):
+    intent = CANDIDATE_PHRASE_MATCHER.first(candidate_reply)
+    if intent == "giveup":
         closing = CLOSING_CANDIDATE_GIVEUP
-        ended_by = "candidate_giveup"
-    elif any(p in reply_lower for p in CANDIDATE_CONFIDENCE_PHRASES):
+    elif intent == "confident":
         closing = CLOSING_CANDIDATE_CONFIDENT
-        ended_by = "candidate_confident"
-    elif any(p in reply_lower for p in CANDIDATE_COMPLETION_PHRASES):
+    elif intent == "completed":
         closing = CLOSING_CANDIDATE_COMPLETED
-        ended_by = "candidate_completed"
     else:
         return None
+    ended_by = f"candidate_{intent}"
     
-    session_log["exchanges"][-1]["candidate"] = candidate_reply
-    session_log["exchanges"].append({"interviewer": closing})
+    session_log["exchanges"][-1].candidate = candidate_reply
+    session_log["exchanges"].append(Exchange(interviewer=closing))
     session_log["ended_by"] = ended_by
     return {
         "interviewer_question": closing,
@@ -181,6 +240,7 @@ def _synthesize_report(session: dict) -> dict:
     exchanges = session.get("exchanges", []) or []
     ended_by = session.get("ended_by")
     pseudocode = (session.get("pseudocode", "") or "").strip()
+    structure = session.get("structure") or _structure(pseudocode).to_dict()
 
     strengths = []
     weaknesses = []
@@ -207,10 +267,10 @@ def _synthesize_report(session: dict) -> dict:
     # Simple heuristic for hire recommendation
     exchanges_count = len(exchanges)
     gave_up = (ended_by == "candidate") or any(
-        isinstance(x.get("candidate"), str) and any(p in x["candidate"].lower() for p in CANDIDATE_EXIT_PHRASES)
+        isinstance(x.candidate, str) and "giveup" in CANDIDATE_PHRASE_MATCHER.match(x.candidate)
         for x in exchanges
     )
-    trivial_pseudo = len(pseudocode) < TRIVIAL_PSEUDOCODE_LENGTH
+    trivial_pseudo = structure["trivial"]
 
     # Stricter hire heuristic
     if gave_up or trivial_pseudo or (classification == "unclear" and not approach):
@@ -223,32 +283,55 @@ def _synthesize_report(session: dict) -> dict:
         else:
             hire = "no"
 
+    # The local estimate stands in when the hidden analysis has no complexity
+    estimated_time = structure.get("time_complexity") or ""
+    estimated_space = structure.get("space_complexity") or ""
     return {
         "role": session.get("role"),
         "difficulty": session.get("difficulty"),
         "question_title": session.get("question", {}).get("question_title"),
-        "time_complexity": time_c,
-        "space_complexity": space_c,
+        "time_complexity": time_c or estimated_time,
+        "space_complexity": space_c or estimated_space,
+        "estimated_time_complexity": estimated_time,
+        "estimated_space_complexity": estimated_space,
         "classification": classification,
         "strengths": strengths,
         "weaknesses": weaknesses,
         "suggested_improvements": improvements,
         "noted_edge_cases": edge_cases,
         "hire_recommendation": hire,
-        "exchanges_count": exchanges_count
+        "exchanges_count": exchanges_count,
+        "structure": structure
     }
 
-def _persist_session(session: dict, report: dict, path: str = DEFAULT_SESSION_LOG_PATH) -> None:
-    try:
-        record = {
-            "session": session,
-            "report": report,
-        }
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-    except Exception:
-        # Non-fatal: persistence shouldn't crash the interview
-        pass
+def session_to_dict(session: dict) -> dict:
+    """JSON-serializable form of a session log."""
+    record = dict(session)
+    for key in ("messages", "exchanges"):
+        if key in record:
+            record[key] = [item.to_dict() for item in record[key]]
+    return record
+
+def session_fingerprint(session_index: int):
+    """Hash of the session state the final report is built from, or None for unknown sessions."""
+    if session_index < 0 or session_index >= len(ANALYSIS_LOG):
+        return None
+    session = ANALYSIS_LOG[session_index]
+    state = [session.get(key) for key in ("role", "difficulty", "question", "pseudocode", "analysis", "ended_by")]
+    state.append([(x.interviewer, x.candidate) for x in session.get("exchanges", [])])
+    return hashlib.sha1(json.dumps(state, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _persist_session(session_index: int, session: dict, report: dict) -> None:
+    """Queue the session and its report for the session log, once per session state."""
+    fingerprint = session_fingerprint(session_index)
+    if _logged_sessions.get(session_index) == fingerprint:
+        return
+    _logged_sessions[session_index] = fingerprint
+    session_log_writer.write({
+        "session_idx": session_index,
+        "session": session_to_dict(session),
+        "report": dict(report),
+    })
 
 def final_report(session_index: int = -1, return_dict: bool = False):
     """Generate, display, and persist the final report for the given session index.
@@ -269,6 +352,8 @@ def final_report(session_index: int = -1, return_dict: bool = False):
         session_index = len(ANALYSIS_LOG) - 1
     session = ANALYSIS_LOG[session_index]
     report = _synthesize_report(session)
+    # Written by the session log's background thread
+    _persist_session(session_index, session, report)
 
     if return_dict:
         # Return the report for API usage
@@ -293,16 +378,16 @@ def final_report(session_index: int = -1, return_dict: bool = False):
     print(f"Exchanges: {report['exchanges_count']}")
     print(f"Hire? Recommendation: {report['hire_recommendation'].upper()}")
 
-    # Persist session + report to disk
-    _persist_session(session, report)
-
 
 def get_dsa_question(role: str = DEFAULT_ROLE, difficulty: str = DEFAULT_DIFFICULTY) -> dict:
     """
     API-friendly wrapper for generate_dsa_question.
-    Generates a DSA question and returns it.
+    Serves a banked question for the role and difficulty when one is
+    available (see question_bank), otherwise generates one.
     """
-    return generate_dsa_question(role=role, difficulty=difficulty)
+    # Imported here: the bank needs the Django models, the CLI flow does not
+    from .question_bank import get_question
+    return get_question(role, difficulty)
 
 # ---- Role-based topic hints ----
 ROLE_HINTS = {
@@ -329,88 +414,50 @@ def generate_dsa_question(role: str = DEFAULT_ROLE, difficulty: str = "easy"):
     role = role.lower()
     role_hint = ROLE_HINTS.get(role, ROLE_HINTS["general"])
 
-    prompt = f"""
-You are an expert technical interviewer designing algorithm design questions for technical interviews.
-
-Create ONE algorithm design problem where the candidate must describe their approach and provide pseudocode.
-
-IMPORTANT GUIDELINES:
-- Present a clear problem that requires designing an algorithm to solve it
-- Focus on WHAT needs to be solved, not HOW to implement it in any specific language
-- The candidate should explain their algorithmic approach and write pseudocode (not actual code)
-- Ask for step-by-step logic: what data structures to use, the algorithm steps, and complexity analysis
-- Include concrete examples with input/output to clarify the problem
-- Specify constraints (input size, value ranges, time/space requirements)
-- The problem should test algorithmic thinking, not syntax knowledge
-- End the problem statement with: "Describe your algorithm and provide pseudocode to solve this problem."
-
-Role: {role}
-Difficulty: {difficulty}
-Guidelines: {role_hint}
-
-Return ONLY valid JSON in this exact format
-:
-{{
-  "question_title": "string",
-  "problem_statement": "string (the problem description ending with request for algorithm and pseudocode)",
-  "difficulty": "easy|medium|hard",
-  "expected_topics": ["topic1", "topic2"],
-  "example_input_output": {{
-    "input": "string",
-    "output": "string"
-  }}
-}}
-    """
+    messages = prompts.DSA_QUESTION.render(role=role, difficulty=difficulty, role_hint=role_hint)
 
-    messages = [
-        ("system", "You are a strict DSA question generator that outputs ONLY JSON."),
-        ("human", prompt)
-    ]
+    return invoke_chat_json(get_chat_model("dsa_question", DEFAULT_TEMPERATURE), messages, "dsa_question")
 
-    resp = llm.invoke(messages)
-    return _safe_json(resp.content)
 
 
+def _start_session(pseudocode: str, question: dict, role: str, difficulty: str):
+    """Register a new session; the hidden analysis runs in the background.
 
-def analyze_pseudocode_initial(pseudocode: str, question: dict, role: str = DEFAULT_ROLE, difficulty: str = DEFAULT_DIFFICULTY) -> dict:
-    """
-    Initialize pseudocode analysis session and get first interviewer question.
-    Returns dict with session data and first interviewer question.
+    Trivial submissions get no hidden analysis (see _close_trivial).
     """
     question_json = json.dumps(question, ensure_ascii=False)
     problem_statement = question.get("problem_statement", "")
+    structure = _structure(pseudocode)
     
-    hidden_analysis = _create_hidden_analysis(question_json, problem_statement, pseudocode)
-    interviewer_prompt = _create_interviewer_prompt(question_json, problem_statement, pseudocode)
+    if structure.trivial:
+        analysis = Future()
+        analysis.set_result(DEFAULT_HIDDEN_ANALYSIS.copy())
+    else:
+        analysis = _analysis_executor.submit(_create_hidden_analysis, question_json, problem_statement, pseudocode)
 
     session_log = {
         "role": role,
         "difficulty": difficulty,
         "question": question,
         "pseudocode": pseudocode,
-        "analysis": hidden_analysis,
+        "structure": structure.to_dict(),
+        "analysis": DEFAULT_HIDDEN_ANALYSIS.copy(),
         "exchanges": [],
         "ended_by": None,
+        # Messages after the prompt prefix, which is referenced by version (see _session_prefix)
+        "prompt": prompts.DSA_INTERVIEWER.version,
         "messages": []
     }
     session_idx = len(ANALYSIS_LOG)
     ANALYSIS_LOG.append(session_log)
+    return session_idx, session_log, analysis
 
-    messages = [
-        ("system", "You are a senior technical interviewer focusing on algorithms and data structures."),
-        ("human", interviewer_prompt),
-    ]
 
-    resp = llm.invoke(messages)
-    response = getattr(resp, "content", str(resp)).strip()
-    
-    session_log["messages"] = [
-        {"role": "system", "content": "You are a senior technical interviewer focusing on algorithms and data structures."},
-        {"role": "human", "content": interviewer_prompt},
-        {"role": "assistant", "content": response}
-    ]
-    
-    session_log["exchanges"].append({"interviewer": response})
+def _finish_initial(session_idx: int, session_log: dict, analysis: Future, response: str) -> dict:
+    """Record the first interviewer turn once the hidden analysis is in."""
+    session_log["analysis"] = analysis.result()
+    _append_message(session_idx, session_log, "assistant", response)
+    session_log["exchanges"].append(Exchange(interviewer=response))
     
     return {
         "session_idx": session_idx,
@@ -419,37 +466,88 @@ def analyze_pseudocode_initial(pseudocode: str, question: dict, role: str = DEFA
     }
 
 
-def continue_pseudocode_analysis(session_idx: int, candidate_reply: str) -> dict:
+def _close_trivial(session_idx: int, session_log: dict, analysis: Future) -> dict:
+    """Close a session whose pseudocode is empty or trivial, without any LLM call."""
+    metrics.incr("dsa.trivial_submissions")
+    session_log["ended_by"] = "trivial_submission"
+    result = _finish_initial(session_idx, session_log, analysis, CLOSING_TRIVIAL_SUBMISSION)
+    result["is_closing"] = True
+    _release_session(session_idx)
+    return result
+
+
+def analyze_pseudocode_initial(pseudocode: str, question: dict, role: str = DEFAULT_ROLE, difficulty: str = DEFAULT_DIFFICULTY) -> dict:
     """
-    Continue pseudocode analysis conversation with candidate reply.
-    Returns dict with next interviewer question or closing status.
+    Initialize pseudocode analysis session and get first interviewer question.
+    Returns dict with session data and first interviewer question.
     """
+    session_idx, session_log, analysis = _start_session(pseudocode, question, role, difficulty)
+    if session_log["structure"]["trivial"]:
+        return _close_trivial(session_idx, session_log, analysis)
+
+    resp = _session_chat(session_idx, session_log).invoke([])
+    response = getattr(resp, "content", str(resp)).strip()
+    
+    return _finish_initial(session_idx, session_log, analysis, response)
+
+
+def stream_pseudocode_initial(pseudocode: str, question: dict, role: str = DEFAULT_ROLE, difficulty: str = DEFAULT_DIFFICULTY) -> Iterator[dict]:
+    """
+    Streaming variant of analyze_pseudocode_initial.
+    Yields {"type": "session", "session_idx"} first, then {"type": "token", "text"}
+    events as the interviewer reply arrives, then {"type": "done", ...} with the
+    same fields analyze_pseudocode_initial returns.
+    """
+    session_idx, session_log, analysis = _start_session(pseudocode, question, role, difficulty)
+    yield {"type": "session", "session_idx": session_idx}
+    if session_log["structure"]["trivial"]:
+        yield {"type": "done", **_close_trivial(session_idx, session_log, analysis)}
+        return
+
+    parts = []
+    for chunk in _session_chat(session_idx, session_log).stream([]):
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield {"type": "token", "text": text}
+
+    yield {"type": "done", **_finish_initial(session_idx, session_log, analysis, "".join(parts).strip())}
+
+
+def _begin_turn(session_idx: int, candidate_reply: str):
+    """Record the candidate reply; returns (session_log, closing result or None)."""
     if session_idx < 0 or session_idx >= len(ANALYSIS_LOG):
         raise ValueError("Invalid session index")
     
     session_log = ANALYSIS_LOG[session_idx]
-    candidate_reply_lower = candidate_reply.strip().lower()
     
     # Check for candidate-initiated closing
-    closing_result = _handle_candidate_closing(session_log, candidate_reply, candidate_reply_lower)
+    closing_result = _handle_candidate_closing(session_log, candidate_reply)
     if closing_result:
-        return closing_result
+        _release_session(session_idx)
+        return session_log, closing_result
     
     # Update conversation with candidate reply
-    session_log["messages"].append({"role": "human", "content": candidate_reply})
-    session_log["exchanges"][-1]["candidate"] = candidate_reply
-    
-    # Get next interviewer response
-    messages = _reconstruct_messages(session_log["messages"])
-    resp = llm.invoke(messages)
-    response = getattr(resp, "content", str(resp)).strip()
-    
-    session_log["messages"].append({"role": "assistant", "content": response})
-    session_log["exchanges"].append({"interviewer": response})
+    _append_message(session_idx, session_log, "human", candidate_reply)
+    session_log["exchanges"][-1].candidate = candidate_reply
+    return session_log, None
+
+
+def _turn_messages(session_idx: int, session_log: dict) -> list:
+    # The static prefix is sent once per session (see _session_chat); only
+    # the bounded window follows it
+    return list(_window(session_idx, session_log))
+
+
+def _finish_turn(session_idx: int, session_log: dict, response: str) -> dict:
+    """Record the interviewer reply; closing detection runs on the full text."""
+    _append_message(session_idx, session_log, "assistant", response)
+    session_log["exchanges"].append(Exchange(interviewer=response))
     
     is_closing = _is_interviewer_closing(response)
     if is_closing:
         session_log["ended_by"] = "interviewer"
+        _release_session(session_idx)
     
     return {
         "interviewer_question": response,
@@ -458,9 +556,54 @@ def continue_pseudocode_analysis(session_idx: int, candidate_reply: str) -> dict
     }
 
 
+def continue_pseudocode_analysis(session_idx: int, candidate_reply: str) -> dict:
+    """
+    Continue pseudocode analysis conversation with candidate reply.
+    Returns dict with next interviewer question or closing status.
+    """
+    cpu_start = time.thread_time()
+    session_log, closing_result = _begin_turn(session_idx, candidate_reply)
+    if closing_result:
+        return closing_result
+    
+    messages = _turn_messages(session_idx, session_log)
+    resp = _session_chat(session_idx, session_log, hedge=True).invoke(messages)
+    response = getattr(resp, "content", str(resp)).strip()
+    
+    result = _finish_turn(session_idx, session_log, response)
+    _record_turn(messages, cpu_start)
+    return result
+
+
+def stream_pseudocode_analysis(session_idx: int, candidate_reply: str) -> Iterator[dict]:
+    """
+    Streaming variant of continue_pseudocode_analysis.
+    Yields {"type": "token", "text"} events, then {"type": "done", ...} with the
+    same fields continue_pseudocode_analysis returns. Candidate-initiated
+    closings yield only the done event.
+    """
+    cpu_start = time.thread_time()
+    session_log, closing_result = _begin_turn(session_idx, candidate_reply)
+    if closing_result:
+        yield {"type": "done", **closing_result}
+        return
+
+    messages = _turn_messages(session_idx, session_log)
+    parts = []
+    for chunk in _session_chat(session_idx, session_log).stream(messages):
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield {"type": "token", "text": text}
+
+    result = _finish_turn(session_idx, session_log, "".join(parts).strip())
+    _record_turn(messages, cpu_start)
+    yield {"type": "done", **result}
+
+
 def _is_interviewer_closing(response: str) -> bool:
     """Check if interviewer response contains closing phrases"""
-    return any(phrase in response.lower() for phrase in INTERVIEWER_CLOSE_PHRASES)
+    return bool(INTERVIEWER_CLOSE_MATCHER.find(response))
 
 
 def analyze_pseudocode(pseudocode: str, role: str = DEFAULT_ROLE, difficulty: str = DEFAULT_DIFFICULTY) -> int:
@@ -477,46 +620,47 @@ def analyze_pseudocode(pseudocode: str, role: str = DEFAULT_ROLE, difficulty: st
     question_json = json.dumps(question, ensure_ascii=False)
     problem_statement = question.get("problem_statement", "")
 
+    structure = _structure(pseudocode)
     hidden_analysis = _create_hidden_analysis(question_json, problem_statement, pseudocode)
-    interviewer_prompt = _create_interviewer_prompt(question_json, problem_statement, pseudocode)
 
     session_log = {
         "role": role,
         "difficulty": difficulty,
         "question": question,
         "pseudocode": pseudocode,
+        "structure": structure.to_dict(),
         "analysis": hidden_analysis,
         "exchanges": [],
         "ended_by": None
     }
     ANALYSIS_LOG.append(session_log)
 
-    messages = [
-        ("system", "You are a senior technical interviewer focusing on algorithms and data structures."),
-        ("human", interviewer_prompt),
-    ]
+    messages = prompts.DSA_INTERVIEWER.render(
+        question_json=question_json, problem_statement=problem_statement, pseudocode=pseudocode,
+        structure_summary=structure.summary(),
+    )
 
     while True:
         resp = llm.invoke(messages)
         response = getattr(resp, "content", str(resp)).strip()
         print("\nInterviewer: " + response)
 
-        session_log["exchanges"].append({"interviewer": response})
+        session_log["exchanges"].append(Exchange(interviewer=response))
 
-        if any(phrase in response.lower() for phrase in INTERVIEWER_CLOSE_PHRASES):
+        if _is_interviewer_closing(response):
             session_log["ended_by"] = "interviewer"
             return len(ANALYSIS_LOG) - 1
         
         candidate_reply = input("Your answer: ")
-        if any(p in candidate_reply.strip().lower() for p in CANDIDATE_EXIT_PHRASES):
+        if "giveup" in CANDIDATE_PHRASE_MATCHER.match(candidate_reply):
             print("\nInterviewer: " + CLOSING_CANDIDATE_GIVEUP)
-            session_log["exchanges"].append({"interviewer": CLOSING_CANDIDATE_GIVEUP, "candidate": candidate_reply})
+            session_log["exchanges"].append(Exchange(CLOSING_CANDIDATE_GIVEUP, candidate_reply))
             session_log["ended_by"] = "candidate"
             return len(ANALYSIS_LOG) - 1
         
         messages.append(("assistant", response))
         messages.append(("human", candidate_reply))
-        session_log["exchanges"][-1]["candidate"] = candidate_reply
+        session_log["exchanges"][-1].candidate = candidate_reply
     
     return len(ANALYSIS_LOG) - 1
 
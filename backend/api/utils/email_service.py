@@ -16,6 +16,8 @@ from email.mime.multipart import MIMEMultipart
 from google import genai
 from google.genai import types
 
+from .model_routing import model_for, track_task
+
 logger = logging.getLogger(__name__)
 
 # ==================== Constants ====================
@@ -24,7 +26,7 @@ SMTP_PORT = 465
 SMTP_TIMEOUT = 30
 DEFAULT_RECRUITER_NAME = 'Ritiz'
 DEFAULT_MEETING_LINK = 'https://calendly.com/ritiz'
-GEMINI_MODEL = 'gemini-2.0-flash-exp'
+EMAIL_DRAFT_TASK = 'email_draft'
 GEMINI_TEMPERATURE = 0.7
 DEFAULT_STRENGTHS_FALLBACK = 'Strong fundamentals'
 SUBJECT_FALLBACK_TEMPLATE = "Exciting Opportunity - {position} Role"
@@ -150,15 +152,17 @@ class EmailService:
 
             logger.info("📡 Calling Gemini API...")
             client = genai.Client(api_key=self.gemini_api_key)
-            response = client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=email_schema,
-                    temperature=GEMINI_TEMPERATURE,
-                ),
-            )
+            model = model_for(EMAIL_DRAFT_TASK)
+            with track_task(EMAIL_DRAFT_TASK, model):
+                response = client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_schema=email_schema,
+                        temperature=GEMINI_TEMPERATURE,
+                    ),
+                )
 
             draft_data = json.loads(response.text)
             body_text = self._enforce_greeting_and_opening(
@@ -1,8 +1,16 @@
 import json
-import re
 from google import genai
 from google.genai import types
 
+from . import evaluation_cache, prompts
+from .llm_json import generate_json, json_generation_config, parse_llm_json
+from .model_routing import model_for, track_task
+
+# The prompt's registry version changes with its text, so cached evaluations
+# produced by an older prompt are no longer served.
+EVALUATION_TASK = "candidate_evaluation"
+EVALUATION_PROMPT = prompts.CANDIDATE_EVALUATION
+
 def parse_evaluation_result(json_string):
     """
     Parses the JSON result from the LLM evaluation.
@@ -17,125 +25,67 @@ def parse_evaluation_result(json_string):
         dict: Parsed JSON as a Python dictionary
         
     Raises:
-        ValueError: If the JSON cannot be parsed or is invalid
-        KeyError: If required fields are missing from the parsed JSON
+        ValueError: If the JSON cannot be parsed or is missing required fields
     """
     if not json_string or not isinstance(json_string, str):
         raise ValueError("Invalid input: json_string must be a non-empty string")
     
-    # Remove markdown code blocks if present (e.g., ```json ... ```)
-    json_string = re.sub(r'```json\s*', '', json_string)
-    json_string = re.sub(r'```\s*$', '', json_string)
-    json_string = json_string.strip()
-    
-    # Try to extract JSON if there's extra text around it
-    # Look for the first { and last } to extract the JSON object
-    first_brace = json_string.find('{')
-    last_brace = json_string.rfind('}')
-    
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        json_string = json_string[first_brace:last_brace + 1]
-    
-    try:
-        parsed_data = json.loads(json_string)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON: {str(e)}\nReceived text: {json_string[:200]}...")
-    
-    # Validate required fields
-    required_fields = [ 'evaluation_metrics', 'hiring_recommendation', 'red_flags']
-    missing_fields = [field for field in required_fields if field not in parsed_data]
-    
-    if missing_fields:
-        raise KeyError(f"Missing required fields in parsed JSON: {', '.join(missing_fields)}")
-    
-    # Validate evaluation_metrics structure
-    if not isinstance(parsed_data['evaluation_metrics'], list):
-        raise ValueError("evaluation_metrics must be a list")
-    
-    # Validate each metric has required fields
-    required_metric_fields = ['metric', 'score', 'feedback', 'evidence']
-    for i, metric in enumerate(parsed_data['evaluation_metrics']):
-        missing_metric_fields = [field for field in required_metric_fields if field not in metric]
-        if missing_metric_fields:
-            raise KeyError(f"Metric at index {i} missing required fields: {', '.join(missing_metric_fields)}")
-    
-    # Validate hiring_recommendation
-    valid_recommendations = ['Strong Hire', 'Hire', 'No Hire']
-    if parsed_data['hiring_recommendation'] not in valid_recommendations:
-        # Allow it but log a warning (in case LLM uses slightly different wording)
-        pass
-    
-    # Validate red_flags is a list
-    if not isinstance(parsed_data['red_flags'], list):
-        raise ValueError("red_flags must be a list")
-    
-    return parsed_data
+    # 'hiring_recommendation' is not restricted to Strong Hire/Hire/No Hire
+    # (the LLM sometimes uses slightly different wording).
+    return parse_llm_json(json_string, "candidate_evaluation")
 
 
 
-def evaluate_candidate(jd_text, resume_text, transcript_text):
+def evaluate_candidate(jd_text, resume_text, transcript_text, use_cache=True):
     """
     Evaluates a candidate by cross-referencing their Resume, Transcript, 
     and Job Description using 6 specific metrics.
-    """
     
-    SYSTEM_PROMPT = """
-    You are a Principal Technical Recruiter. Analyze the JD, Resume, and Transcript provided.
-    You must output ONLY a valid JSON object. Do not include markdown formatting or prose outside the JSON.
-
-    ### SCHEMA REQUIREMENTS:
-    1. Technical Depth (0-10)
-    2. JD Alignment (0-10)
-    3. Claim Verification (0-10)
-    4. Problem-Solving Structure (0-10)
-    5. Learning Agility (0-10)
-    6. Communication & Professionalism (0-10)
-
-    ### JSON STRUCTURE EXAMPLE:
-    {
-      "evaluation_metrics": [
-        {
-          "metric": "Technical Depth",
-          "score": 7,
-          "feedback": "Demonstrated understanding of backend state, but struggled with architectural trade-offs.",
-          "evidence": "Candidate stated: 'I used a proxy server' but could not explain the underlying security implications."
-        }
-      ],
-      "hiring_recommendation": "Strong Hire / Hire / No Hire",
-      "red_flags": ["List of specific concerns found"]
-    }
-
-    ### RULES:
-    - Evidence must be direct quotes from the transcript.
-    - If a resume claim is not supported by the transcript, the 'Claim Verification' score must be low.
-    - If the transcript shows a lack of depth (e.g., short, one-sentence technical answers), penalize 'Technical Depth'.
-    """
-
-    USER_CONTENT = f"""
-    ### JOB DESCRIPTION:
-    {jd_text}
-
-    ### RESUME:
-    {resume_text}
-
-    ### INTERVIEW TRANSCRIPT:
-    {transcript_text}
+    Results are served from / stored in the evaluation cache unless
+    use_cache is False (the fresh result still refreshes the cache).
     """
+    model = model_for(EVALUATION_TASK)
+    cache_key = None
+    if evaluation_cache.is_enabled():
+        cache_key = evaluation_cache.make_cache_key(
+            jd_text, resume_text, transcript_text, model, EVALUATION_PROMPT.version
+        )
+        if use_cache:
+            cached = evaluation_cache.get_cached_evaluation(cache_key)
+            if cached is not None:
+                return cached
+    
+    system_instruction, user_content = EVALUATION_PROMPT.render_parts(
+        jd_text=jd_text, resume_text=resume_text, transcript_text=transcript_text,
+    )
     
     client = genai.Client()
+    config = types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=0.2, # Low temperature for consistent, objective analysis
+        **json_generation_config("candidate_evaluation"),
+    )
+    
+    def call(repair_note):
+        contents = [types.Part.from_text(text=user_content)]
+        if repair_note:
+            contents.append(types.Part.from_text(text=repair_note))
+        with track_task(EVALUATION_TASK, model):
+            response = client.models.generate_content(
+                model=model,
+                config=config,
+                contents=contents
+            )
+        return response.text
     
     try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                temperature=0.2 # Low temperature for consistent, objective analysis
-            ),
-            contents=[types.Part.from_text(text=USER_CONTENT)]
-        )
-        return parse_evaluation_result(response.text)
+        result = generate_json(call, "candidate_evaluation")
     except Exception as e:
         return f"Error during evaluation: {str(e)}"
+    
+    if cache_key:
+        evaluation_cache.store_evaluation(cache_key, result, model, EVALUATION_PROMPT.version)
+    return result
 
 
 
@@ -244,5 +194,5 @@ Developer Methods: Software Development Life Cycle (SDLC), Agile Methodologies,
         parsed_report = parse_evaluation_result(report_json_string)
         print("Parsed JSON:")
         print(json.dumps(parsed_report, indent=2))
-    except (ValueError, KeyError) as e:
+    except ValueError as e:
         print(f"Error parsing JSON: {e}")
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Evaluation Cache Utilities
+==========================
+Persistent cache for evaluate_candidate results.
+
+Entries are keyed by content hashes of the job description, resume and
+transcript plus the model name and prompt version, so any change to the
+inputs or to the evaluation prompt produces a new key. Expired entries
+(older than EVALUATION_CACHE_TTL_DAYS) and the least recently used entries
+beyond EVALUATION_CACHE_MAX_ENTRIES are evicted on write.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import EvaluationCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def make_cache_key(jd_text: str, resume_text: str, transcript_text: str, model: str, prompt_version: str) -> str:
+    """Build the cache key from per-input content hashes, model and prompt version."""
+    parts = [_sha256(jd_text), _sha256(resume_text), _sha256(transcript_text), model, prompt_version]
+    return _sha256("|".join(parts))
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "EVALUATION_CACHE_ENABLED", True)
+
+
+def _ttl_cutoff():
+    return timezone.now() - timedelta(days=settings.EVALUATION_CACHE_TTL_DAYS)
+
+
+def get_cached_evaluation(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for ``cache_key`` (and record the hit), or None."""
+    entry = (
+        EvaluationCacheEntry.objects
+        .filter(cache_key=cache_key, created_at__gte=_ttl_cutoff())
+        .only("id", "result")
+        .first()
+    )
+    if entry is None:
+        return None
+    EvaluationCacheEntry.objects.filter(pk=entry.pk).update(
+        hit_count=F("hit_count") + 1,
+        last_accessed_at=timezone.now(),
+    )
+    logger.info(f"Evaluation cache hit: {cache_key[:12]}")
+    return entry.result
+
+
+def store_evaluation(cache_key: str, result: Dict[str, Any], model: str, prompt_version: str) -> None:
+    """Store ``result`` under ``cache_key`` and evict expired / least recently used entries."""
+    try:
+        EvaluationCacheEntry.objects.update_or_create(
+            cache_key=cache_key,
+            defaults={
+                "model_name": model,
+                "prompt_version": prompt_version,
+                "result": result,
+                "created_at": timezone.now(),
+                "last_accessed_at": timezone.now(),
+            },
+        )
+        evict()
+    except Exception as e:
+        # Non-fatal: a cache write failure must not lose the evaluation
+        logger.error(f"Failed to store evaluation cache entry: {e}")
+
+
+def evict() -> int:
+    """Apply the TTL and max-entries policies; returns the number of rows removed."""
+    removed, _ = EvaluationCacheEntry.objects.filter(created_at__lt=_ttl_cutoff()).delete()
+
+    overflow = EvaluationCacheEntry.objects.count() - settings.EVALUATION_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = list(
+            EvaluationCacheEntry.objects
+            .order_by("last_accessed_at")
+            .values_list("id", flat=True)[:overflow]
+        )
+        overflow_removed, _ = EvaluationCacheEntry.objects.filter(id__in=stale_ids).delete()
+        removed += overflow_removed
+    return removed
@@ -1,6 +1,10 @@
 from google import genai
 from google.genai import types
 
+from .model_routing import model_for, track_task
+
+TRANSCRIPTION_TASK = "transcription"
+
 def get_safe_transcript(response):
     """
     Safely extracts the transcript text or returns the failure reason.
@@ -44,18 +48,20 @@ def run_evaluation_stage(audio_bytes, job_description):
     [MM:SS] **Candidate:** [Text]
     """
 
-    response = client.models.generate_content(
-        model="gemini-flash-latest",
-        config=types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            temperature=0.0
-        ),
-        contents=[types.Part.from_bytes(
-                data=audio_bytes,
-                mime_type="audio/webm"
+    model = model_for(TRANSCRIPTION_TASK)
+    with track_task(TRANSCRIPTION_TASK, model):
+        response = client.models.generate_content(
+            model=model,
+            config=types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                temperature=0.0
             ),
-            types.Part.from_text(text=user_prompt)
-        ]
-    )
+            contents=[types.Part.from_bytes(
+                    data=audio_bytes,
+                    mime_type="audio/webm"
+                ),
+                types.Part.from_text(text=user_prompt)
+            ]
+        )
 
     return get_safe_transcript(response)
\ No newline at end of file
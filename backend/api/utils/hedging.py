@@ -0,0 +1,129 @@
+"""
+Hedged LLM Requests
+===================
+Opt-in tail-latency hedging for interactive interview turns.
+
+A hedged call starts the request, and if it has not finished after a delay
+derived from the recent p95 latency of that call class, starts an identical
+second request. Whichever answer arrives first is returned; the other is
+cancelled if it has not started yet, otherwise its result is discarded.
+
+Settings:
+- LLM_HEDGING enables hedging (off by default).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List
+
+from .conf import setting
+from .metrics import metrics, percentile
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+HEDGE_PERCENTILE = 0.95
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+DEFAULT_HEDGE_DELAY = 4.0  # seconds, used until enough samples exist
+MIN_HEDGE_DELAY = 0.5
+MAX_HEDGE_DELAY = 15.0
+HEDGE_WORKERS = 16
+
+_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+
+
+def is_enabled() -> bool:
+    return bool(setting("LLM_HEDGING", False))
+
+
+class HedgePolicy:
+    """Latency window and hedge delay for one class of calls (e.g. 'hint')."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        metrics.register_gauge(f"hedge.{name}.delay_s", lambda: round(self.delay(), 3))
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+        metrics.observe(f"llm.{self.name}", seconds)
+
+    def delay(self) -> float:
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return min(MAX_HEDGE_DELAY, max(MIN_HEDGE_DELAY, percentile(samples, HEDGE_PERCENTILE)))
+
+
+_policies: Dict[str, HedgePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(name: str) -> HedgePolicy:
+    with _policies_lock:
+        policy = _policies.get(name)
+        if policy is None:
+            policy = _policies[name] = HedgePolicy(name)
+        return policy
+
+
+def _timed(fn: Callable[[], Any], policy: HedgePolicy) -> Callable[[], Any]:
+    def run():
+        start = time.monotonic()
+        result = fn()
+        # Every completed attempt feeds the window, losers included, so the
+        # p95 reflects the real latency distribution.
+        policy.record(time.monotonic() - start)
+        return result
+    return run
+
+
+def hedged_call(fn: Callable[[], Any], policy: HedgePolicy) -> Any:
+    """Call ``fn``, hedging with a duplicate call if it is slower than the policy delay."""
+    if not is_enabled():
+        return _timed(fn, policy)()
+
+    metrics.incr(f"hedge.{policy.name}.calls")
+    primary = _executor.submit(_timed(fn, policy))
+    done, _ = wait([primary], timeout=policy.delay())
+    if done:
+        return primary.result()
+
+    metrics.incr(f"hedge.{policy.name}.fired")
+    backup = _executor.submit(_timed(fn, policy))
+    pending: List = [primary, backup]
+    error = None
+    while pending:
+        done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in not_done:
+                    other.cancel()
+                if future is backup:
+                    metrics.incr(f"hedge.{policy.name}.backup_won")
+                return future.result()
+            error = future.exception()
+        pending = list(not_done)
+    raise error
+
+
+class HedgedChat:
+    """Chat model wrapper whose ``invoke`` goes through ``hedged_call``."""
+
+    def __init__(self, llm, policy_name: str):
+        self.llm = llm
+        self.policy = get_policy(policy_name)
+
+    def invoke(self, messages, **kwargs):
+        return hedged_call(lambda: self.llm.invoke(messages, **kwargs), self.policy)
+
+    def __getattr__(self, name):
+        # Expose the wrapped model's attributes (model name, etc.)
+        return getattr(self.llm, name)
@@ -0,0 +1,500 @@
+"""
+LLM JSON Utilities
+==================
+Single place for turning raw LLM output into validated Python dicts.
+
+Extraction strips markdown fences and uses ``JSONDecoder.raw_decode`` so that
+prose before/after the object never forces a second scan. Each response type
+the app asks for has a schema that is compiled once at import time and
+validates (and fills defaults for) the decoded object.
+
+The same schemas are exported as Gemini ``response_schema`` definitions so
+call sites can request constrained JSON output, with a bounded number of
+repair round trips when the model still returns something unusable.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+# ==================== Constants ====================
+FENCE = "```"
+MAX_DECODE_ATTEMPTS = 16
+JSON_MIME_TYPE = "application/json"
+DEFAULT_REPAIR_BUDGET = 1
+REPAIR_PROMPT = (
+    "Your previous reply could not be used: {error}\n"
+    "Reply again with ONLY the corrected JSON object, no markdown and no extra text."
+)
+
+# strict=False lets raw newlines/tabs inside strings through, which is the
+# most common way Gemini breaks otherwise-valid JSON.
+_DECODER = json.JSONDecoder(strict=False)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_NUMERIC_RE = re.compile(r"^\s*-?\d+(?:\.\d+)?\s*$")
+
+KIND_STRING = "string"
+KIND_INTEGER = "integer"
+KIND_NUMBER = "number"
+KIND_BOOLEAN = "boolean"
+KIND_ARRAY = "array"
+KIND_OBJECT = "object"
+
+# Gemini Schema.Type enum names, accepted by google-genai, google-generativeai
+# and langchain-google-genai generation configs alike.
+_GEMINI_TYPES = {
+    KIND_STRING: "STRING",
+    KIND_INTEGER: "INTEGER",
+    KIND_NUMBER: "NUMBER",
+    KIND_BOOLEAN: "BOOLEAN",
+    KIND_ARRAY: "ARRAY",
+    KIND_OBJECT: "OBJECT",
+}
+
+
+class LLMJSONError(ValueError):
+    """Raised when no JSON object can be extracted from an LLM response."""
+
+
+class SchemaError(LLMJSONError):
+    """Raised when an extracted object does not match its response schema."""
+
+
+# ==================== Extraction ====================
+
+def strip_fences(text: str) -> str:
+    """Return the body of the first markdown code fence, or the text unchanged."""
+    start = text.find(FENCE)
+    if start == -1:
+        return text
+    body_start = text.find("\n", start)
+    if body_start == -1:
+        # Single-line fence such as ```{"a": 1}```
+        body_start = start + len(FENCE)
+        lang_end = body_start
+        while lang_end < len(text) and text[lang_end].isalpha():
+            lang_end += 1
+        if lang_end < len(text) and text[lang_end] in "{[":
+            body_start = lang_end
+    end = text.find(FENCE, body_start)
+    return text[body_start:end] if end != -1 else text[body_start:]
+
+
+def _decode_from(text: str, expect_object: bool, max_attempts: int = MAX_DECODE_ATTEMPTS) -> Optional[Any]:
+    """Try raw_decode at each candidate opening brace, left to right."""
+    opener = "{" if expect_object else "["
+    idx = text.find(opener)
+    attempts = 0
+    while idx != -1 and attempts < max_attempts:
+        attempts += 1
+        try:
+            obj, _ = _DECODER.raw_decode(text, idx)
+            return obj
+        except json.JSONDecodeError:
+            idx = text.find(opener, idx + 1)
+    return None
+
+
+def extract_json(text: str, expect_object: bool = True) -> Any:
+    """Extract the first JSON object (or array) embedded in ``text``.
+
+    Handles fenced blocks, leading/trailing prose, raw control characters in
+    strings and trailing commas. Raises LLMJSONError if nothing decodes.
+    """
+    if not text or not isinstance(text, str):
+        raise LLMJSONError("Invalid input: expected a non-empty string")
+
+    stripped = text.strip()
+    candidates = [stripped]
+    if FENCE in stripped:
+        candidates.insert(0, strip_fences(stripped).strip())
+
+    for candidate in candidates:
+        repaired = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+        variants = (candidate, repaired) if repaired != candidate else (candidate,)
+
+        # Outermost value first (in both forms) so a broken outer object is
+        # repaired rather than shadowed by one of its nested objects.
+        for variant in variants:
+            obj = _decode_from(variant, expect_object, max_attempts=1)
+            if obj is not None:
+                return obj
+        for variant in variants:
+            obj = _decode_from(variant, expect_object)
+            if obj is not None:
+                return obj
+
+    raise LLMJSONError(f"No JSON object found in response: {text[:200]}...")
+
+
+# ==================== Schemas ====================
+
+class Field:
+    """Description of a single JSON value inside a response schema.
+
+    ``enum`` documents the expected values but is not enforced on parse:
+    a slightly off-vocabulary label is better than a fallback.
+    """
+
+    __slots__ = ("kind", "required", "default", "schema", "items", "enum", "description")
+
+    def __init__(
+        self,
+        kind: str,
+        required: bool = True,
+        default: Any = None,
+        schema: Optional["ResponseSchema"] = None,
+        items: Optional["Field"] = None,
+        enum: Optional[Iterable[str]] = None,
+        description: str = "",
+    ):
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.schema = schema
+        self.items = items
+        self.enum = tuple(enum) if enum else None
+        self.description = description
+
+    def make_default(self) -> Any:
+        """Return a fresh copy of the default so callers can mutate it."""
+        if isinstance(self.default, (list, dict)):
+            return json.loads(json.dumps(self.default))
+        return self.default
+
+    def coerce(self, value: Any, path: str) -> Any:
+        kind = self.kind
+        if kind == KIND_STRING:
+            if isinstance(value, str):
+                return value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+        elif kind in (KIND_NUMBER, KIND_INTEGER):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return int(value) if kind == KIND_INTEGER and float(value).is_integer() else value
+            if isinstance(value, str) and _NUMERIC_RE.match(value):
+                number = float(value)
+                return int(number) if number.is_integer() else number
+        elif kind == KIND_BOOLEAN:
+            if isinstance(value, bool):
+                return value
+        elif kind == KIND_ARRAY:
+            if isinstance(value, list):
+                if self.items is None:
+                    return value
+                return [self.items.coerce(v, f"{path}[{i}]") for i, v in enumerate(value)]
+        elif kind == KIND_OBJECT:
+            if isinstance(value, dict):
+                return self.schema.validate(value, f"{path}.") if self.schema else value
+        raise SchemaError(f"Field '{path}' expected {kind}, got {type(value).__name__}")
+
+    def to_response_schema(self) -> Dict[str, Any]:
+        """Render this field as a Gemini response_schema fragment."""
+        if self.kind == KIND_OBJECT and self.schema is not None:
+            out = self.schema.to_response_schema()
+        else:
+            out = {"type": _GEMINI_TYPES[self.kind]}
+            if self.kind == KIND_ARRAY and self.items is not None:
+                out["items"] = self.items.to_response_schema()
+        if self.enum:
+            out["enum"] = list(self.enum)
+        if self.description:
+            out["description"] = self.description
+        return out
+
+
+class ResponseSchema:
+    """Precompiled validator for one LLM response type."""
+
+    __slots__ = ("name", "fields", "_required", "_response_schema")
+
+    def __init__(self, name: str, fields: Dict[str, Field]):
+        self.name = name
+        self.fields = fields
+        self._required = tuple(k for k, f in fields.items() if f.required)
+        self._response_schema = None
+
+    @property
+    def response_schema(self) -> Dict[str, Any]:
+        """Gemini response_schema for this response type (built once)."""
+        if self._response_schema is None:
+            self._response_schema = self.to_response_schema()
+        return self._response_schema
+
+    def to_response_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "OBJECT",
+            "properties": {k: f.to_response_schema() for k, f in self.fields.items()},
+            "required": list(self._required),
+        }
+
+    def validate(self, data: Any, path: str = "") -> Dict[str, Any]:
+        """Validate ``data`` in place, coercing values and filling defaults."""
+        if not isinstance(data, dict):
+            raise SchemaError(f"{self.name}: expected a JSON object, got {type(data).__name__}")
+
+        missing = [k for k in self._required if k not in data]
+        if missing:
+            raise SchemaError(f"{self.name}: missing required fields: {', '.join(missing)}")
+
+        for key, field in self.fields.items():
+            value = data.get(key)
+            if value is not None:
+                data[key] = field.coerce(value, f"{path}{key}")
+            elif field.default is not None:
+                data[key] = field.make_default()
+        return data
+
+
+def _str(required: bool = True, default: str = "", **kwargs) -> Field:
+    return Field(KIND_STRING, required=required, default=default, **kwargs)
+
+
+def _str_list(required: bool = True) -> Field:
+    return Field(KIND_ARRAY, required=required, default=[], items=Field(KIND_STRING))
+
+
+def _score(required: bool = True) -> Field:
+    return Field(KIND_NUMBER, required=required, default=0)
+
+
+QUESTION_SCHEMA = ResponseSchema("interview_question", {
+    "question": _str(),
+    "type": _str(enum=("behavioral", "technical")),
+    "difficulty": _str(enum=("easy", "medium", "hard")),
+    "rationale": _str(required=False),
+})
+
+OPENING_QUESTIONS_SCHEMA = ResponseSchema("opening_questions", {
+    "questions": Field(KIND_ARRAY, items=Field(KIND_OBJECT, schema=QUESTION_SCHEMA)),
+})
+
+ANSWER_EVALUATION_SCHEMA = ResponseSchema("answer_evaluation", {
+    "score": _score(),
+    "strengths": _str_list(required=False),
+    "improvements": _str_list(required=False),
+    "reason": _str(required=False),
+})
+
+EVALUATION_TURN_SCHEMA = ResponseSchema("evaluation_turn", {
+    "evaluation": Field(KIND_OBJECT, schema=ANSWER_EVALUATION_SCHEMA),
+    "coach_tip": _str(required=False),
+})
+
+EVALUATION_AND_NEXT_SCHEMA = ResponseSchema("evaluation_and_next_question", {
+    "evaluation": Field(KIND_OBJECT, schema=ANSWER_EVALUATION_SCHEMA),
+    "coach_tip": _str(required=False),
+    "next_question": Field(KIND_OBJECT, schema=QUESTION_SCHEMA),
+})
+
+REPHRASE_SCHEMA = ResponseSchema("rephrase", {
+    "rephrased_question": _str(required=False, default=None),
+})
+
+HINT_SCHEMA = ResponseSchema("hint", {
+    "hint": _str(required=False, default=None),
+})
+
+_SCORED_COMMENT_SCHEMA = ResponseSchema("scored_comment", {
+    "score": _score(),
+    "comment": _str(required=False),
+})
+
+FINAL_FEEDBACK_SCHEMA = ResponseSchema("final_feedback", {
+    "overall_score": _score(),
+    "overall_assessment": _str(),
+    "strengths": _str_list(),
+    "areas_for_improvement": _str_list(),
+    "technical_proficiency": Field(KIND_OBJECT, schema=_SCORED_COMMENT_SCHEMA),
+    "communication_skills": Field(KIND_OBJECT, schema=_SCORED_COMMENT_SCHEMA),
+    "problem_solving": Field(KIND_OBJECT, schema=_SCORED_COMMENT_SCHEMA),
+    "key_focus_areas": _str_list(),
+    "recommendation": _str(enum=("Strong Hire", "Hire", "Maybe", "No Hire")),
+})
+
+DSA_QUESTION_SCHEMA = ResponseSchema("dsa_question", {
+    "question_title": _str(),
+    "problem_statement": _str(),
+    "difficulty": _str(required=False, default="medium", enum=("easy", "medium", "hard")),
+    "expected_topics": _str_list(required=False),
+    "example_input_output": Field(KIND_OBJECT, required=False, default={"input": "", "output": ""},
+                                  schema=ResponseSchema("example_input_output", {
+                                      "input": _str(required=False),
+                                      "output": _str(required=False),
+                                  })),
+})
+
+HIDDEN_ANALYSIS_SCHEMA = ResponseSchema("hidden_analysis", {
+    "approach_summary": _str(required=False),
+    "time_complexity": _str(required=False),
+    "space_complexity": _str(required=False),
+    "classification": _str(required=False, default="unclear", enum=("brute-force", "optimized", "unclear")),
+    "potential_improvements": _str_list(required=False),
+    "edge_cases": _str_list(required=False),
+})
+
+_EVALUATION_METRIC_SCHEMA = ResponseSchema("evaluation_metric", {
+    "metric": _str(),
+    "score": _score(),
+    "feedback": _str(),
+    "evidence": _str(),
+})
+
+CANDIDATE_EVALUATION_SCHEMA = ResponseSchema("candidate_evaluation", {
+    "evaluation_metrics": Field(KIND_ARRAY, items=Field(KIND_OBJECT, schema=_EVALUATION_METRIC_SCHEMA)),
+    # Gemini sometimes echoes "Strong Hire / Hire / No Hire"; tolerated downstream.
+    "hiring_recommendation": _str(),
+    "red_flags": _str_list(),
+})
+
+SCHEMAS: Dict[str, ResponseSchema] = {
+    schema.name: schema
+    for schema in (
+        QUESTION_SCHEMA,
+        OPENING_QUESTIONS_SCHEMA,
+        ANSWER_EVALUATION_SCHEMA,
+        EVALUATION_TURN_SCHEMA,
+        EVALUATION_AND_NEXT_SCHEMA,
+        REPHRASE_SCHEMA,
+        HINT_SCHEMA,
+        FINAL_FEEDBACK_SCHEMA,
+        DSA_QUESTION_SCHEMA,
+        HIDDEN_ANALYSIS_SCHEMA,
+        CANDIDATE_EVALUATION_SCHEMA,
+    )
+}
+
+
+def get_schema(schema: Union[str, ResponseSchema]) -> ResponseSchema:
+    """Resolve a schema name from the registry (or pass a schema through)."""
+    if isinstance(schema, ResponseSchema):
+        return schema
+    try:
+        return SCHEMAS[schema]
+    except KeyError:
+        raise KeyError(f"Unknown response schema: {schema}")
+
+
+def parse_llm_json(text: str, schema: Union[str, ResponseSchema, None] = None) -> Dict[str, Any]:
+    """Extract a JSON object from ``text`` and validate it against ``schema``.
+
+    Raises LLMJSONError (a ValueError) when extraction or validation fails.
+    """
+    data = extract_json(text)
+    if schema is None:
+        return data
+    return get_schema(schema).validate(data)
+
+
+# ==================== Constrained generation ====================
+
+def json_generation_config(schema: Union[str, ResponseSchema], constrained: bool = True) -> Dict[str, Any]:
+    """Generation config fields that make Gemini emit JSON matching ``schema``.
+
+    Gemini emits schema-constrained properties in alphabetical order. Streams
+    that show one field while the rest generates pass ``constrained=False``:
+    the output is still JSON, but fields follow the order of the prompt's
+    example, and the result is validated against ``schema`` afterwards.
+    """
+    if not constrained:
+        return {"response_mime_type": JSON_MIME_TYPE}
+    return {
+        "response_mime_type": JSON_MIME_TYPE,
+        "response_schema": get_schema(schema).response_schema,
+    }
+
+
+def generate_json(
+    call: Callable[[Optional[str]], str],
+    schema: Union[str, ResponseSchema],
+    repair_budget: int = DEFAULT_REPAIR_BUDGET,
+) -> Dict[str, Any]:
+    """Run ``call`` and parse its output, re-asking at most ``repair_budget`` times.
+
+    ``call`` receives ``None`` on the first attempt and a repair instruction
+    describing the previous failure on each retry; it returns the raw text.
+    """
+    repair_note = None
+    for attempt in range(repair_budget + 1):
+        text = call(repair_note)
+        try:
+            return parse_llm_json(text, schema)
+        except LLMJSONError as e:
+            if attempt == repair_budget:
+                raise
+            repair_note = REPAIR_PROMPT.format(error=str(e)[:300])
+
+
+def invoke_chat_json(
+    llm,
+    messages: List[Any],
+    schema: Union[str, ResponseSchema],
+    repair_budget: int = DEFAULT_REPAIR_BUDGET,
+) -> Dict[str, Any]:
+    """Invoke a LangChain Gemini chat model with constrained JSON output."""
+    generation_config = json_generation_config(schema)
+
+    def call(repair_note: Optional[str]) -> str:
+        turn = list(messages) if repair_note is None else [*messages, ("human", repair_note)]
+        resp = llm.invoke(turn, generation_config=generation_config)
+        return getattr(resp, "content", str(resp))
+
+    return generate_json(call, schema, repair_budget)
+
+
+# ==================== Streaming ====================
+
+_STRING_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class StreamingFieldExtractor:
+    """Incrementally decodes one string field from a streamed JSON object.
+
+    ``feed`` takes the next raw chunk and returns the newly decoded text of
+    the field, so its value can be shown while the rest is still generating.
+    """
+
+    def __init__(self, field: str):
+        self._marker = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done or not chunk:
+            return ""
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._marker.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buf, i, out = self._buffer, self._pos, []
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            if c == "\\":
+                # Wait for the rest of a split escape sequence
+                if i + 1 >= len(buf):
+                    break
+                esc = buf[i + 1]
+                if esc == "u":
+                    if i + 6 > len(buf):
+                        break
+                    try:
+                        out.append(chr(int(buf[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                out.append(_STRING_ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            out.append(c)
+            i += 1
+        self._pos = i
+        return "".join(out)
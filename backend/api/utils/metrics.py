@@ -0,0 +1,95 @@
+"""
+In-Process Metrics
+==================
+Thread-safe counters, timings and gauges for the LLM call path and other
+background machinery, exposed to staff users through GET /api/metrics/.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict
+
+# ==================== Constants ====================
+TIMING_WINDOW = 500
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[idx]
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "window")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window = deque(maxlen=TIMING_WINDOW)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.window.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = list(self.window)
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "p50_ms": round(percentile(recent, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(recent, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(recent, 0.99) * 1000, 1),
+            "max_ms": round(self.max * 1000, 1),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide metrics; one instance (``metrics``) is shared by all modules."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, _Timing] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing()
+            timing.add(seconds)
+
+    def register_gauge(self, name: str, fn: Callable[[], Any]) -> None:
+        """Register a callable evaluated on every snapshot (live values)."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: t.snapshot() for name, t in self._timings.items()}
+            gauges = dict(self._gauges)
+        gauge_values = {}
+        for name, fn in gauges.items():
+            try:
+                gauge_values[name] = fn()
+            except Exception as e:
+                gauge_values[name] = f"error: {e}"
+        return {"counters": counters, "timings": timings, "gauges": gauge_values}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,321 @@
+"""
+Model Routing
+=============
+Maps each LLM task to a model tier, and each tier to a Gemini model.
+
+Short interactive tasks (rephrasing, hints, question generation, email
+drafting) go to the fastest tier; evaluation-heavy tasks keep the larger
+models. Tasks routed to the ``local`` tier never call an LLM; their callers
+use a cheap local heuristic instead.
+
+Both tables can be overridden in Django settings (LLM_MODEL_TIERS and
+LLM_TASK_ROUTES); outside Django (CLI usage) the defaults below apply.
+Per-task call counts and latencies are recorded in api.utils.metrics.
+
+Each model also has a moving window of call latencies and errors. When a
+model's median latency or error rate crosses its threshold, calls are
+rerouted to its configured secondary (LLM_FALLBACK_MODELS) and a background
+probe keeps checking the primary, switching back once it recovers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .conf import setting
+from .metrics import metrics, percentile
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+LOCAL_TIER = "local"
+
+DEFAULT_MODEL_TIERS = {
+    "fast": "gemini-2.5-flash-lite",
+    "standard": "gemini-2.5-flash",
+    "latest": "gemini-flash-latest",
+}
+
+DEFAULT_TASK_ROUTES = {
+    # Interactive, short outputs
+    "rephrase": "fast",
+    "hint": "fast",
+    "dsa_question": "fast",
+    "email_draft": "fast",
+    "history_summary": "fast",
+    # Interview turns
+    "behavioral_question": "standard",
+    "behavioral_turn": "standard",
+    "dsa_turn": "standard",
+    "dsa_hidden_analysis": "standard",
+    "final_feedback": "standard",
+    # Heavy evaluation
+    "candidate_evaluation": "latest",
+    "transcription": "latest",
+}
+
+DEFAULT_TIER = "standard"
+
+DEFAULT_FALLBACK_MODELS = {
+    "gemini-flash-latest": "gemini-2.5-flash",
+    "gemini-2.5-flash": "gemini-2.5-flash-lite",
+}
+
+HEALTH_WINDOW = 20
+HEALTH_MIN_SAMPLES = 5
+DEFAULT_LATENCY_THRESHOLD = 30.0  # seconds, median over the window
+DEFAULT_ERROR_RATE_THRESHOLD = 0.5
+PROBE_INTERVAL = 30.0
+PROBE_PROMPT = "Reply with OK."
+
+
+def _setting(name: str, default):
+    return setting(name, default) or default
+
+
+def get_tiers() -> Dict[str, str]:
+    return {**DEFAULT_MODEL_TIERS, **_setting("LLM_MODEL_TIERS", {})}
+
+
+def get_routes() -> Dict[str, str]:
+    return {**DEFAULT_TASK_ROUTES, **_setting("LLM_TASK_ROUTES", {})}
+
+
+def tier_for(task: str) -> str:
+    return get_routes().get(task, DEFAULT_TIER)
+
+
+def is_local(task: str) -> bool:
+    """True when ``task`` is routed to a local heuristic instead of an LLM."""
+    return tier_for(task) == LOCAL_TIER
+
+
+def model_for(task: str) -> str:
+    """Gemini model name for ``task``, after latency-aware fallback.
+
+    Local tasks resolve to the standard tier.
+    """
+    tiers = get_tiers()
+    tier = tier_for(task)
+    return health_router.resolve(tiers.get(tier) or tiers[DEFAULT_TIER])
+
+
+@contextmanager
+def track_task(task: str, model: str):
+    """Record count, errors and latency of one LLM call for ``task``."""
+    start = time.monotonic()
+    metrics.incr(f"task.{task}.calls")
+    metrics.incr(f"model.{model}.calls")
+    ok = False
+    try:
+        yield
+        ok = True
+    except GeneratorExit:
+        # A streaming consumer stopped reading; not a model failure
+        ok = True
+        raise
+    except Exception:
+        metrics.incr(f"task.{task}.errors")
+        raise
+    finally:
+        elapsed = time.monotonic() - start
+        metrics.observe(f"task.{task}", elapsed)
+        health_router.record(model, elapsed, ok)
+
+
+# ==================== Latency-aware fallback ====================
+
+class _ModelWindow:
+    __slots__ = ("samples", "degraded_since")
+
+    def __init__(self):
+        self.samples = deque(maxlen=HEALTH_WINDOW)  # (seconds, ok)
+        self.degraded_since = None
+
+
+class ModelHealthRouter:
+    """Tracks per-model latency/error windows and reroutes degraded models."""
+
+    def __init__(self):
+        self._windows: Dict[str, _ModelWindow] = {}
+        self._probing: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, model: str) -> _ModelWindow:
+        window = self._windows.get(model)
+        if window is None:
+            window = self._windows[model] = _ModelWindow()
+        return window
+
+    def _thresholds(self) -> Tuple[float, float]:
+        return (
+            _setting("LLM_FALLBACK_LATENCY_THRESHOLD", DEFAULT_LATENCY_THRESHOLD),
+            _setting("LLM_FALLBACK_ERROR_RATE_THRESHOLD", DEFAULT_ERROR_RATE_THRESHOLD),
+        )
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        latency_threshold, error_threshold = self._thresholds()
+        with self._lock:
+            window = self._window(model)
+            window.samples.append((seconds, ok))
+            if window.degraded_since is not None or len(window.samples) < HEALTH_MIN_SAMPLES:
+                return
+            latencies = [s for s, _ in window.samples]
+            error_rate = sum(1 for _, good in window.samples if not good) / len(window.samples)
+            median = percentile(latencies, 0.5)
+            if median <= latency_threshold and error_rate <= error_threshold:
+                return
+            window.degraded_since = time.time()
+        logger.warning(
+            f"Model {model} degraded (median {median:.1f}s, error rate {error_rate:.0%}); "
+            f"routing to {self._fallbacks().get(model)}"
+        )
+        metrics.incr(f"model.{model}.degraded")
+        self._start_probe(model)
+
+    def is_degraded(self, model: str) -> bool:
+        with self._lock:
+            window = self._windows.get(model)
+            return bool(window and window.degraded_since is not None)
+
+    def _fallbacks(self) -> Dict[str, str]:
+        return {**DEFAULT_FALLBACK_MODELS, **_setting("LLM_FALLBACK_MODELS", {})}
+
+    def resolve(self, model: str) -> str:
+        """Follow the fallback chain past degraded models."""
+        fallbacks = self._fallbacks()
+        seen: List[str] = []
+        current = model
+        while self.is_degraded(current) and current in fallbacks and current not in seen:
+            seen.append(current)
+            current = fallbacks[current]
+        return current
+
+    def _start_probe(self, model: str) -> None:
+        with self._lock:
+            if model in self._probing:
+                return
+            thread = threading.Thread(target=self._probe_loop, args=(model,), name=f"probe-{model}", daemon=True)
+            self._probing[model] = thread
+        thread.start()
+
+    def _probe_loop(self, model: str) -> None:
+        latency_threshold, _ = self._thresholds()
+        try:
+            from google import genai
+
+            client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+            while True:
+                time.sleep(_setting("LLM_FALLBACK_PROBE_INTERVAL", PROBE_INTERVAL))
+                start = time.monotonic()
+                try:
+                    client.models.generate_content(model=model, contents=PROBE_PROMPT)
+                except Exception as e:
+                    logger.info(f"Probe of {model} failed: {e}")
+                    continue
+                elapsed = time.monotonic() - start
+                if elapsed <= latency_threshold:
+                    with self._lock:
+                        window = self._window(model)
+                        window.samples.clear()
+                        window.degraded_since = None
+                    logger.info(f"Model {model} recovered (probe {elapsed:.1f}s)")
+                    metrics.incr(f"model.{model}.recovered")
+                    return
+        except Exception as e:
+            logger.error(f"Probe of {model} stopped: {e}")
+        finally:
+            with self._lock:
+                self._probing.pop(model, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            degraded = {m: w.degraded_since for m, w in self._windows.items() if w.degraded_since is not None}
+        return {
+            "live": {model: self.resolve(model) for model in get_tiers().values()},
+            "degraded_since": degraded,
+        }
+
+
+health_router = ModelHealthRouter()
+
+
+# ==================== Client pool ====================
+
+_clients: Dict[Tuple[str, float], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(model: str, temperature: float):
+    """Shared ChatGoogleGenerativeAI client per (model, temperature)."""
+    key = (model, temperature)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            client = ChatGoogleGenerativeAI(
+                model=model,
+                api_key=os.getenv("GEMINI_API_KEY"),
+                temperature=temperature,
+            )
+            _clients[key] = client
+        return client
+
+
+class RoutedChat:
+    """Chat model for one task; resolves its model on every call.
+
+    ``model`` pins a specific model instead of following the routing table.
+    ``invoke``/``stream`` also take a ``model`` for a single call, for callers
+    that resolved it already (e.g. to look up a prompt cache made for it).
+    """
+
+    def __init__(self, task: str, temperature: float, model: Optional[str] = None):
+        self.task = task
+        self.temperature = temperature
+        self.pinned_model = model
+
+    @property
+    def model(self) -> str:
+        return self.pinned_model or model_for(self.task)
+
+    def invoke(self, messages, model: Optional[str] = None, **kwargs):
+        model = model or self.model
+        with track_task(self.task, model):
+            return get_client(model, self.temperature).invoke(messages, **kwargs)
+
+    def stream(self, messages, model: Optional[str] = None, **kwargs):
+        """Yield response chunks as they arrive; also records time to first chunk."""
+        model = model or self.model
+        start = time.monotonic()
+        first = True
+        with track_task(self.task, model):
+            for chunk in get_client(model, self.temperature).stream(messages, **kwargs):
+                if first:
+                    metrics.observe(f"task.{self.task}.first_chunk", time.monotonic() - start)
+                    first = False
+                yield chunk
+
+
+def chunk_text(chunk) -> str:
+    """Text of one streamed message chunk."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    # Multi-part content: list of strings or {"type": "text", "text": ...} parts
+    return "".join(p if isinstance(p, str) else p.get("text", "") for p in content or [])
+
+
+def get_chat_model(task: str, temperature: float, model: Optional[str] = None) -> RoutedChat:
+    return RoutedChat(task, temperature, model)
+
+
+metrics.register_gauge(
+    "routing.task_models",
+    lambda: {task: LOCAL_TIER if is_local(task) else model_for(task) for task in get_routes()},
+)
+metrics.register_gauge("routing.model_health", health_router.snapshot)
@@ -0,0 +1,125 @@
+"""
+Phrase Matcher
+==============
+Compiled multi-phrase matcher for the interview engines' intent and closing
+phrases (dsa_interview, behavioral_interview).
+
+A PhraseMatcher maps intents to phrase lists and compiles all phrases into
+one Aho-Corasick automaton, so a text is scanned once however many phrases
+there are, and every matching intent is reported from that single pass.
+Matches respect word boundaries: "done" matches "I'm done." but not
+"abandoned", and "help" does not match "helpful". A matcher built with
+``suffixes`` also accepts phrases followed by one of them, e.g. PLURAL_SUFFIXES
+lets "hint" match "hints" and "clue" match "clues". Text and phrases are
+lowercased, curly apostrophes are straightened and whitespace runs are
+collapsed before matching.
+"""
+
+import re
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "ʼ": "'"})
+
+PLURAL_SUFFIXES = ("s", "es")
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", (text or "").translate(_APOSTROPHES).lower()).strip()
+
+
+def _is_word(char: str) -> bool:
+    # Apostrophes belong to words, so "don" never matches inside "don't"
+    return char.isalnum() or char in "_'"
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over intent phrases, matched on word boundaries."""
+
+    def __init__(self, intents: Dict[str, Iterable[str]], suffixes: Iterable[str] = ()):
+        self.intents = tuple(intents)
+        self.suffixes = tuple(suffixes)
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (phrase length, intent, phrase starts with a word char, phrase ends with one)
+        self._out: List[List[Tuple[int, str, bool, bool]]] = [[]]
+        for intent, phrases in intents.items():
+            for phrase in phrases:
+                self._add(normalize(phrase), intent)
+        self._link()
+
+    def _add(self, phrase: str, intent: str) -> None:
+        if not phrase:
+            return
+        node = 0
+        for char in phrase:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(phrase), intent, _is_word(phrase[0]), _is_word(phrase[-1])))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs are merged along them.
+
+        Failure links are then folded into a complete transition table, so
+        matching takes exactly one dict lookup per character.
+        """
+        # Depth-1 nodes fail to the root, which they already do
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            if node:
+                self._delta[node] = {**self._delta[self._fail[node]], **self._goto[node]}
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0) if node else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """(intent, start, end) of every phrase occurrence in the normalized text."""
+        text = normalize(text)
+        delta, out = self._delta, self._out
+        found = []
+        node = 0
+        last = len(text) - 1
+        for i, char in enumerate(text):
+            node = delta[node].get(char, 0)
+            for length, intent, word_start, word_end in out[node]:
+                start = i - length + 1
+                if word_start and start > 0 and _is_word(text[start - 1]):
+                    continue
+                end = i + 1
+                if word_end and i < last and _is_word(text[end]):
+                    end = self._suffix_end(text, end)
+                    if end is None:
+                        continue
+                found.append((intent, start, end))
+        return found
+
+    def _suffix_end(self, text: str, end: int):
+        """End of an allowed suffix (and word) starting at ``end``, or None."""
+        for suffix in self.suffixes:
+            stop = end + len(suffix)
+            if text.startswith(suffix, end) and (stop == len(text) or not _is_word(text[stop])):
+                return stop
+        return None
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Every intent with at least one phrase in ``text``."""
+        return frozenset(intent for intent, _, _ in self.find(text))
+
+    def first(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """The first intent, in declaration order, that matches ``text``."""
+        matched = self.match(text)
+        return next((intent for intent in self.intents if intent in matched), default)
@@ -0,0 +1,237 @@
+"""
+Prompt Prefix Cache
+===================
+Registers the static prefix of an interview (system prompt, role, resume,
+question JSON, ...) once per session with Gemini context caching, so later
+turns only send the variable tail of the conversation.
+
+Registration happens on a background thread: the turn that first sees a
+session sends the full prompt as usual, and subsequent turns switch to the
+cached prefix as soon as it is ready. Prefixes too small to be cached by
+Gemini are never registered. Sessions release their prefix when they end;
+the registry also keeps at most MAX_SESSIONS of them, least recently used
+first out, and deletes the cached content of every entry it drops.
+
+Settings:
+- GEMINI_CONTEXT_CACHE enables prefix registration (off by default).
+- LLM_CACHE_METRICS logs cached vs. uncached input tokens per turn.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .conf import setting
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+CACHE_TTL_SECONDS = 1800
+MIN_CACHEABLE_TOKENS = 1024  # Gemini rejects smaller cached contents
+CHARS_PER_TOKEN = 4
+REGISTRATION_WORKERS = 2
+MAX_SESSIONS = 1024
+
+
+def is_enabled() -> bool:
+    return bool(setting("GEMINI_CONTEXT_CACHE", False))
+
+
+def metrics_enabled() -> bool:
+    return bool(setting("LLM_CACHE_METRICS", False))
+
+
+def _prefix_hash(model: str, prefix: List[Tuple[str, str]]) -> str:
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for role, content in prefix:
+        digest.update(b"\x00" + role.encode("utf-8") + b"\x00" + content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_tokens(messages: List[Tuple[str, str]]) -> int:
+    return sum(len(content) for _, content in messages) // CHARS_PER_TOKEN
+
+
+class _Entry:
+    __slots__ = ("prefix_hash", "name", "expires_at", "pending")
+
+    def __init__(self, prefix_hash: str):
+        self.prefix_hash = prefix_hash
+        self.name = None
+        self.expires_at = 0.0
+        self.pending = True
+
+
+class PrefixCacheRegistry:
+    """Per-session registry of Gemini cached-content names."""
+
+    def __init__(self, ttl_seconds: int = CACHE_TTL_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._usage: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=REGISTRATION_WORKERS, thread_name_prefix="prefix-cache")
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        return self._client
+
+    def lookup(self, session_key: str, model: str, prefix: List[Tuple[str, str]]) -> Optional[str]:
+        """Return the cached-content name for this prefix, scheduling registration if needed.
+
+        Never blocks on the network: returns None until registration finishes.
+        """
+        if not is_enabled() or estimate_tokens(prefix) < MIN_CACHEABLE_TOKENS:
+            return None
+        prefix_hash = _prefix_hash(model, prefix)
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry:
+                self._entries.move_to_end(session_key)
+            if entry and entry.prefix_hash == prefix_hash:
+                # Pending, or failed (not retried until the prefix changes)
+                if entry.pending or entry.name is None:
+                    return None
+                if entry.expires_at > time.monotonic():
+                    return entry.name
+            # A changed prefix leaves the old cached content unused
+            stale = [entry.name] if entry and entry.name else []
+            entry = _Entry(prefix_hash)
+            self._entries[session_key] = entry
+            while len(self._entries) > self.max_sessions:
+                _, evicted = self._entries.popitem(last=False)
+                if evicted.name:
+                    stale.append(evicted.name)
+        for name in stale:
+            self._executor.submit(self._delete, name)
+        self._executor.submit(self._register, session_key, entry, model, prefix)
+        return None
+
+    def _register(self, session_key: str, entry: _Entry, model: str, prefix: List[Tuple[str, str]]) -> None:
+        from google.genai import types
+
+        system = "\n\n".join(content for role, content in prefix if role == "system")
+        contents = [
+            types.Content(role="user" if role == "human" else "model", parts=[types.Part.from_text(text=content)])
+            for role, content in prefix if role != "system"
+        ]
+        try:
+            cached = self._get_client().caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system or None,
+                    contents=contents or None,
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+            entry.name = cached.name
+            # Leave a margin so we never reference a cache that just expired
+            entry.expires_at = time.monotonic() + self.ttl_seconds * 0.9
+            logger.info(f"Registered prompt prefix for {session_key}: {cached.name}")
+            with self._lock:
+                dropped = self._entries.get(session_key) is not entry
+            if dropped:
+                # Released, evicted or replaced while registering
+                self._delete(cached.name)
+        except Exception as e:
+            logger.warning(f"Prompt prefix registration failed for {session_key}: {e}")
+        finally:
+            entry.pending = False
+
+    def release(self, session_key: str) -> None:
+        """Forget a session and delete its cached content (best effort)."""
+        with self._lock:
+            entry = self._entries.pop(session_key, None)
+            self._usage.pop(session_key, None)
+        if entry and entry.name:
+            name = entry.name
+            self._executor.submit(self._delete, name)
+
+    def _delete(self, name: str) -> None:
+        try:
+            self._get_client().caches.delete(name=name)
+        except Exception as e:
+            logger.debug(f"Failed to delete cached content {name}: {e}")
+
+    # ---------------- Measurement ----------------
+    def record_usage(self, session_key: str, response: Any) -> Optional[Dict[str, int]]:
+        """Record cached vs. uncached input tokens of one turn (measurement mode only)."""
+        if not metrics_enabled():
+            return None
+        usage = getattr(response, "usage_metadata", None) or {}
+        raw = (getattr(response, "response_metadata", None) or {}).get("usage_metadata") or {}
+        input_tokens = usage.get("input_tokens") or raw.get("prompt_token_count") or 0
+        cached_tokens = (
+            (usage.get("input_token_details") or {}).get("cache_read")
+            or raw.get("cached_content_token_count")
+            or 0
+        )
+        turn = {"cached": cached_tokens, "uncached": max(input_tokens - cached_tokens, 0)}
+        with self._lock:
+            totals = self._usage.setdefault(session_key, {"turns": 0, "cached": 0, "uncached": 0})
+            self._usage.move_to_end(session_key)
+            while len(self._usage) > self.max_sessions:
+                self._usage.popitem(last=False)
+            totals["turns"] += 1
+            totals["cached"] += turn["cached"]
+            totals["uncached"] += turn["uncached"]
+        logger.info(
+            f"LLM turn {session_key}: cached_tokens={turn['cached']} uncached_tokens={turn['uncached']}"
+        )
+        return turn
+
+    def usage(self, session_key: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._usage.get(session_key, {"turns": 0, "cached": 0, "uncached": 0}))
+
+
+prefix_registry = PrefixCacheRegistry()
+
+
+class PrefixedChat:
+    """Chat wrapper that sends a static prefix once per session.
+
+    Exposes ``invoke(messages, **kwargs)`` and ``stream(messages, **kwargs)``
+    like a LangChain chat model, where ``messages`` are only the per-turn
+    messages that follow the prefix. The model is resolved once per call and
+    passed to the wrapped RoutedChat, so a cached prefix is only ever sent to
+    the model it was created for, even if routing falls back mid-call.
+    """
+
+    def __init__(self, llm, session_key: str, prefix: List[Tuple[str, str]], registry: PrefixCacheRegistry = prefix_registry):
+        self.llm = llm
+        self.session_key = session_key
+        self.prefix = prefix
+        self.registry = registry
+
+    def _model_kwargs(self) -> Tuple[str, Dict[str, str]]:
+        model = getattr(self.llm, "model", "")
+        return model, ({"model": model} if model else {})
+
+    def invoke(self, messages: List[Any], **kwargs):
+        model, model_kwargs = self._model_kwargs()
+        cache_name = self.registry.lookup(self.session_key, model, self.prefix)
+        if cache_name and messages:
+            resp = self.llm.invoke(list(messages), cached_content=cache_name, **model_kwargs, **kwargs)
+        else:
+            resp = self.llm.invoke([*self.prefix, *messages], **model_kwargs, **kwargs)
+        self.registry.record_usage(self.session_key, resp)
+        return resp
+
+    def stream(self, messages: List[Any], **kwargs):
+        """Streaming counterpart of ``invoke``; yields the model's chunks."""
+        model, model_kwargs = self._model_kwargs()
+        cache_name = self.registry.lookup(self.session_key, model, self.prefix)
+        if cache_name and messages:
+            yield from self.llm.stream(list(messages), cached_content=cache_name, **model_kwargs, **kwargs)
+        else:
+            yield from self.llm.stream([*self.prefix, *messages], **model_kwargs, **kwargs)
@@ -0,0 +1,521 @@
+"""
+Prompt Registry
+===============
+Every LLM prompt used by the interview flows, compiled once at import.
+
+Compiling a prompt checks its placeholders, renders messages that have no
+placeholders ahead of time and derives a version id from the prompt name,
+its revision and a hash of its text. The version id changes whenever the
+text does, so it can be used as-is in cache keys; all versions are exposed
+as the ``prompts.versions`` gauge.
+
+Rendering formats each message with ``str.format`` and returns (role, text)
+tuples, which LangChain chat models accept directly. Literal braces in
+templates are escaped as ``{{ }}``.
+"""
+
+import hashlib
+import string
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
+
+from .metrics import metrics
+
+Message = Tuple[str, str]
+
+_FORMATTER = string.Formatter()
+
+
+def _placeholders(name: str, text: str) -> Set[str]:
+    try:
+        parsed = list(_FORMATTER.parse(text))
+    except ValueError as e:
+        raise ValueError(f"Prompt {name} is malformed: {e}") from None
+    fields = set()
+    for _, field, _, _ in parsed:
+        if field is None:
+            continue
+        if not field.isidentifier():
+            raise ValueError(f"Prompt {name} has unsupported placeholder {{{field}}}; escape literal braces as {{{{ }}}}")
+        fields.add(field)
+    return fields
+
+
+class Prompt:
+    """A compiled chat prompt: (role, template) messages plus a version id."""
+
+    __slots__ = ("name", "revision", "version", "fields", "messages", "_compiled")
+
+    def __init__(self, name: str, messages: Sequence[Message], revision: int = 1):
+        self.name = name
+        self.revision = revision
+        compiled = []
+        fields: Set[str] = set()
+        for role, text in messages:
+            names = _placeholders(name, text)
+            fields |= names
+            # Static messages are formatted once here, which also unescapes braces
+            compiled.append((role, text, True) if names else (role, text.format(), False))
+        self.messages: Tuple[Message, ...] = tuple(messages)
+        self._compiled = tuple(compiled)
+        self.fields: FrozenSet[str] = frozenset(fields)
+        digest = hashlib.sha256("\0".join(f"{role}\0{text}" for role, text in messages).encode("utf-8"))
+        self.version = f"{name}@{revision}.{digest.hexdigest()[:10]}"
+
+    def __repr__(self) -> str:
+        return f"<Prompt {self.version}>"
+
+    def render(self, **values) -> List[Message]:
+        """Messages with placeholders filled in; extra values are ignored."""
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"Prompt {self.name} is missing values for {', '.join(sorted(missing))}")
+        return [(role, text.format_map(values) if dynamic else text) for role, text, dynamic in self._compiled]
+
+    def render_text(self, **values) -> str:
+        """All messages joined into one prompt, for APIs that take a single string."""
+        return "\n\n".join(text for _, text in self.render(**values))
+
+    def render_parts(self, **values) -> Tuple[str, str]:
+        """(system instruction, user content), for APIs that take them separately."""
+        system, user = [], []
+        for role, text in self.render(**values):
+            (system if role == "system" else user).append(text)
+        return "\n\n".join(system), "\n\n".join(user)
+
+
+PROMPTS: Dict[str, Prompt] = {}
+
+
+def register(name: str, messages: Sequence[Message], revision: int = 1) -> Prompt:
+    """Compile and register a prompt. Bump ``revision`` to invalidate caches without a text change."""
+    if name in PROMPTS:
+        raise ValueError(f"Prompt {name} is already registered")
+    prompt = PROMPTS[name] = Prompt(name, messages, revision)
+    return prompt
+
+
+def get_prompt(name: str) -> Prompt:
+    return PROMPTS[name]
+
+
+def prompt_versions() -> Dict[str, str]:
+    return {name: prompt.version for name, prompt in PROMPTS.items()}
+
+
+metrics.register_gauge("prompts.versions", prompt_versions)
+
+
+# ==================== Behavioral Interview ====================
+
+# Static per-interview prefix shared by every evaluation turn. It comes first
+# so it can be registered once per session as cached context (see prompt_cache).
+BEHAVIORAL_INTERVIEWER_PREFIX = register("behavioral.interviewer_prefix", [
+    ("system", """You are a senior interviewer. Evaluate answers precisely, adapt the next question, and be conversational and supportive without revealing full solutions.
+
+Context:
+Role: {role}
+Resume: {resume}"""),
+])
+
+
+BEHAVIORAL_FIRST_QUESTION = register("behavioral.first_question", [
+    ("system", "You are a senior interviewer crafting precise, tailored questions."),
+    ("human", """Using the candidate profile and target role, generate ONE interview question optimized to start the interview.
+
+Constraints:
+- Make it relevant to the resume and role.
+- Prefer a behavioral warm-up unless the resume shows very strong hands-on indicators, then a light technical warm-up is fine.
+- Set difficulty as 'easy'|'medium'|'hard'.
+Return ONLY valid JSON:
+{{
+  "question": "one clear question",
+  "type": "behavioral|technical",
+  "difficulty": "easy|medium|hard",
+  "rationale": "why this question as opener"
+}}
+
+Role: {role}
+Candidate Profile:
+{profile}"""),
+])
+
+
+BEHAVIORAL_OPENING_QUESTIONS = register("behavioral.opening_questions", [
+    ("system", "You are a senior interviewer crafting precise, tailored questions."),
+    ("human", """Generate {count} distinct interview questions that could each open an interview for the role below, for a candidate matching the profile.
+
+Constraints:
+- Each question must be relevant to the role and the profile, and different in topic from the others.
+- Prefer behavioral warm-ups; a light technical warm-up is fine for strongly hands-on profiles.
+- Set difficulty as 'easy'|'medium'|'hard'.
+Return ONLY valid JSON:
+{{
+  "questions": [
+    {{
+      "question": "one clear question",
+      "type": "behavioral|technical",
+      "difficulty": "easy|medium|hard",
+      "rationale": "why this question as opener"
+    }}
+  ]
+}}
+
+Role: {role}
+Job Description:
+{job_description}
+Candidate Profile: {profile}"""),
+])
+
+
+BEHAVIORAL_REPHRASE = register("behavioral.rephrase", [
+    ("system", "You are a helpful interviewer. You can rephrase questions more simply without giving away answers."),
+    ("human", """Rewrite the following interview question in simpler, clearer terms for the same role.
+Keep the same intent and difficulty, but use plain language and be concise (1 sentence).
+Return ONLY JSON: {{ "rephrased_question": "..." }}
+
+Question: {q}
+Role: {role}
+"""),
+])
+
+
+BEHAVIORAL_HINT = register("behavioral.hint", [
+    ("system", "You are a coaching interviewer: offer subtle, guiding hints without revealing full answers."),
+    ("human", """Given the role, resume, and the current question, provide 1 brief hint to guide the candidate.
+Rules:
+- Do NOT reveal the full answer
+- Keep it short (max 1 sentence)
+- Focus on guiding their thinking (e.g., what concepts to consider)
+Return ONLY JSON: {{ "hint": "..." }}
+
+Role: {role}
+Resume: {resume}
+Question: {q}
+"""),
+])
+
+
+BEHAVIORAL_EVALUATION_AND_NEXT = register("behavioral.evaluation_and_next_question", [
+    ("human", """Previous Interview History:
+{history}
+
+Latest Question: {latest_q}
+Latest Answer: {latest_a}
+
+Task:
+1) Briefly evaluate the latest answer (score 0-10, strengths, improvements, reason).
+2) Generate ONE next question tailored to the role and resume.
+3) Adapt difficulty:
+   - score >= 8 → increase difficulty
+   - score 5-7 → keep difficulty
+   - score <= 4 → decrease difficulty
+
+Also produce a brief coaching tip (one sentence) that helps the candidate improve next time, WITHOUT giving away full answers.
+
+Return ONLY valid JSON:
+{{
+  "evaluation": {{
+    "score": 7,
+    "strengths": ["..."],
+    "improvements": ["..."],
+    "reason": "..."
+  }},
+    "coach_tip": "one sentence helpful but non-spoiler guidance",
+  "next_question": {{
+    "question": "one clear question",
+    "type": "behavioral|technical",
+    "difficulty": "easy|medium|hard",
+    "rationale": "why this next"
+  }}
+}}"""),
+])
+
+
+BEHAVIORAL_EVALUATION = register("behavioral.evaluation", [
+    ("human", """Previous Interview History:
+{history}
+
+Latest Question: {latest_q}
+Latest Answer: {latest_a}
+
+Task:
+Evaluate the latest answer precisely and provide a brief coaching tip. Do not generate a next question.
+Return ONLY a brief JSON:
+{{
+  "evaluation": {{
+    "score": 7,
+    "strengths": ["..."],
+    "improvements": ["..."],
+    "reason": "..."
+    }},
+    "coach_tip": "one sentence helpful but non-spoiler guidance"
+}}"""),
+])
+
+
+BEHAVIORAL_NEXT_QUESTION = register("behavioral.next_question", [
+    ("human", """Previous Interview History:
+{history}
+
+Latest Question: {latest_q}
+Latest Answer: {latest_a}
+
+Task:
+Generate ONE next question tailored to the role and resume.
+Adapt difficulty to how well the latest answer addressed the question:
+   - strong, specific answer → increase difficulty
+   - adequate answer → keep difficulty
+   - weak or vague answer → decrease difficulty
+
+Return ONLY valid JSON:
+{{
+  "question": "one clear question",
+  "type": "behavioral|technical",
+  "difficulty": "easy|medium|hard",
+  "rationale": "why this next"
+}}"""),
+])
+
+
+BEHAVIORAL_FINAL_FEEDBACK = register("behavioral.final_feedback", [
+    ("system", "You are a senior hiring manager providing comprehensive interview feedback."),
+    ("human", """Based on the complete interview below, provide a detailed performance summary.
+
+Role: {role}
+Resume: {resume}
+
+Full Interview Transcript:
+{transcript}
+
+Provide a comprehensive analysis in JSON format:
+{{
+  "overall_score": (0-10),
+  "overall_assessment": "2-3 sentence summary",
+  "strengths": ["...", "...", "..."],
+  "areas_for_improvement": ["...", "...", "..."],
+  "technical_proficiency": {{"score": (0-10), "comment": "..."}},
+  "communication_skills": {{"score": (0-10), "comment": "..."}},
+  "problem_solving": {{"score": (0-10), "comment": "..."}},
+    "key_focus_areas": ["...", "...", "..."],
+    "recommendation": "Strong Hire|Hire|Maybe|No Hire"
+}}"""),
+])
+
+
+BEHAVIORAL_HISTORY_SUMMARY = register("behavioral.history_summary", [
+    ("system", "You maintain concise running notes of a job interview for the interviewer."),
+    ("human", """Update the interview notes with the new turns below.
+Keep topics covered, notable claims and examples, scores, and recurring strengths or gaps.
+Write plain text, at most {max_chars} characters. Return only the updated notes.
+
+Current notes:
+{summary}
+
+New turns:
+{turns}"""),
+])
+
+
+# ==================== DSA Interview ====================
+
+DSA_QUESTION = register("dsa.question", [
+    ("system", "You are a strict DSA question generator that outputs ONLY JSON."),
+    ("human", """
+You are an expert technical interviewer designing algorithm design questions for technical interviews.
+
+Create ONE algorithm design problem where the candidate must describe their approach and provide pseudocode.
+
+IMPORTANT GUIDELINES:
+- Present a clear problem that requires designing an algorithm to solve it
+- Focus on WHAT needs to be solved, not HOW to implement it in any specific language
+- The candidate should explain their algorithmic approach and write pseudocode (not actual code)
+- Ask for step-by-step logic: what data structures to use, the algorithm steps, and complexity analysis
+- Include concrete examples with input/output to clarify the problem
+- Specify constraints (input size, value ranges, time/space requirements)
+- The problem should test algorithmic thinking, not syntax knowledge
+- End the problem statement with: "Describe your algorithm and provide pseudocode to solve this problem."
+
+Role: {role}
+Difficulty: {difficulty}
+Guidelines: {role_hint}
+
+Return ONLY valid JSON in this exact format
+:
+{{
+  "question_title": "string",
+  "problem_statement": "string (the problem description ending with request for algorithm and pseudocode)",
+  "difficulty": "easy|medium|hard",
+  "expected_topics": ["topic1", "topic2"],
+  "example_input_output": {{
+    "input": "string",
+    "output": "string"
+  }}
+}}
+    """),
+])
+
+
+DSA_HIDDEN_ANALYSIS = register("dsa.hidden_analysis", [
+    ("system", "You are a precise algorithm evaluator. Output only valid JSON."),
+    ("human", """
+You are analyzing a candidate's pseudocode for the following problem. Produce STRICT JSON only.
+
+Question JSON:
+{question_json}
+
+Problem Statement:
+{problem_statement}
+
+Candidate Pseudocode:
+{pseudocode}
+
+Return ONLY valid JSON with keys:
+{{
+  "approach_summary": "string",
+  "time_complexity": "string",
+  "space_complexity": "string",
+  "classification": "brute-force|optimized|unclear",
+  "potential_improvements": ["string", "string"],
+  "edge_cases": ["string", "string"]
+}}
+"""),
+])
+
+
+# Both messages are static for a session (see dsa_interview._session_prefix)
+DSA_INTERVIEWER = register("dsa.interviewer", [
+    ("system", "You are a senior technical interviewer focusing on algorithms and data structures."),
+    ("human", """
+You are a DSA interviewer evaluating a candidate's pseudocode for the following problem.
+
+Full Question (from generator, JSON):
+{question_json}
+
+Problem Statement (reference):
+{problem_statement}
+
+Candidate's Pseudocode:
+{pseudocode}
+
+Structure of the pseudocode (automatic and preliminary; verify it, never quote it):
+{structure_summary}
+
+Your tasks:
+1) First turn (no candidate reply yet): Ask ONE concise follow-up question, aimed at the most important aspect of the structure above (e.g. nested loops or an unstated complexity). Do NOT reveal any analysis.
+2) Subsequent turns (after the candidate replies): Start with a brief, specific acknowledgment reflecting their last answer (1-2 short sentences), THEN ask exactly ONE follow-up question that ties directly to their response. Do NOT reveal any hidden analysis.
+3) Continue until you feel the candidate has fully addressed concerns, then end with a supportive closing statement.
+Output constraints: On each turn, output ONLY one compact message that is either (a) acknowledgment + one follow-up question, or (b) a closing statement. No extra commentary, no analysis.
+"""),
+])
+
+
+# ==================== Reports ====================
+
+CANDIDATE_EVALUATION = register("reports.candidate_evaluation", [
+    ("system", """
+You are a Principal Technical Recruiter. Analyze the JD, Resume, and Transcript provided.
+You must output ONLY a valid JSON object. Do not include markdown formatting or prose outside the JSON.
+
+### SCHEMA REQUIREMENTS:
+1. Technical Depth (0-10)
+2. JD Alignment (0-10)
+3. Claim Verification (0-10)
+4. Problem-Solving Structure (0-10)
+5. Learning Agility (0-10)
+6. Communication & Professionalism (0-10)
+
+### JSON STRUCTURE EXAMPLE:
+{{
+  "evaluation_metrics": [
+    {{
+      "metric": "Technical Depth",
+      "score": 7,
+      "feedback": "Demonstrated understanding of backend state, but struggled with architectural trade-offs.",
+      "evidence": "Candidate stated: 'I used a proxy server' but could not explain the underlying security implications."
+    }}
+  ],
+  "hiring_recommendation": "Strong Hire / Hire / No Hire",
+  "red_flags": ["List of specific concerns found"]
+}}
+
+### RULES:
+- Evidence must be direct quotes from the transcript.
+- If a resume claim is not supported by the transcript, the 'Claim Verification' score must be low.
+- If the transcript shows a lack of depth (e.g., short, one-sentence technical answers), penalize 'Technical Depth'.
+"""),
+    ("human", """
+### JOB DESCRIPTION:
+{jd_text}
+
+### RESUME:
+{resume_text}
+
+### INTERVIEW TRANSCRIPT:
+{transcript_text}
+"""),
+])
+
+
+ENHANCED_FINAL_FEEDBACK = register("reports.final_feedback", [
+    ("system", """You are an expert senior hiring manager and technical interviewer with 15+ years of experience. 
+You specialize in conducting comprehensive candidate evaluations and providing detailed, actionable feedback.
+
+Your task is to analyze the complete interview transcript and provide a thorough, professional assessment in a specific JSON format.
+
+IMPORTANT: You MUST respond ONLY with valid JSON. Do not include any text before or after the JSON. 
+The JSON must be properly formatted and complete.
+
+Guidelines for scoring:
+- Overall Score: 0-10 (0-3: Poor, 4-6: Fair, 7-8: Good, 9-10: Excellent)
+- Individual scores: 0-10 for each category
+- Be specific and constructive in all feedback
+- Focus on actionable insights
+- Consider the role requirements and resume background
+- Provide balanced assessment highlighting both strengths and areas for improvement"""),
+    ("human", """Based on the complete interview below, provide a comprehensive performance analysis.
+
+CANDIDATE INFORMATION:
+Role: {role}
+Resume Background: {resume}...
+
+COMPLETE INTERVIEW TRANSCRIPT:
+{transcript}
+
+Please analyze this interview and provide your assessment in the following EXACT JSON format:
+
+{{
+  "overall_score": 8,
+  "overall_assessment": "The candidate demonstrates strong technical knowledge and clear communication skills. They show good problem-solving abilities and provide detailed, structured answers. However, there are some areas where they could be more specific with examples.",
+  "strengths": [
+    "Strong technical foundation in relevant areas",
+    "Clear and structured communication style",
+    "Good problem-solving approach",
+    "Demonstrates relevant experience"
+  ],
+  "areas_for_improvement": [
+    "Could provide more specific examples from past projects",
+    "Should elaborate more on technical implementation details",
+    "Could demonstrate more leadership experience"
+  ],
+  "technical_proficiency": {{
+    "score": 8,
+    "comment": "Shows solid understanding of core concepts and can explain technical topics clearly. Demonstrates good knowledge of relevant technologies and frameworks."
+  }},
+  "communication_skills": {{
+    "score": 7,
+    "comment": "Communicates ideas clearly and structures responses well. Could improve by providing more specific examples and being more concise in some areas."
+  }},
+  "problem_solving": {{
+    "score": 8,
+    "comment": "Shows good analytical thinking and approaches problems systematically. Demonstrates ability to break down complex problems into manageable parts."
+  }},
+  "key_focus_areas": [
+    "Technical depth and specific examples",
+    "Leadership and team collaboration",
+    "Project management experience"
+  ],
+  "recommendation": "Hire"
+}}
+
+Remember: Respond ONLY with the JSON object above, no additional text."""),
+])
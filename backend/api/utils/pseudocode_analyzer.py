@@ -0,0 +1,313 @@
+"""
+Pseudocode Static Analyzer
+==========================
+Fast, local structure analysis of candidate pseudocode, run before any LLM
+call: length, loop nesting depth, recursion (and memoization), and the use
+of hash maps, sorting, heaps and binary search. From these it derives a
+preliminary time and space complexity estimate.
+
+The result feeds the DSA interviewer prompt (as a short structure summary)
+and the final report, and identifies trivially empty submissions, which
+are closed without calling the LLM. Estimates are heuristics over free-form
+text, not a parser: loops are nested by indentation, and library calls
+hidden behind helper names are not seen. Recursion branches only when more
+than one self-call can run on the same path through a function, so a binary
+search recursing from either side of an if/else is not tree recursion.
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# ==================== Constants ====================
+TAB_WIDTH = 4
+
+_LOOP_RE = re.compile(r"^(?:\d+[.)]\s*|[-*]\s*)?(?:for|foreach|while|loop|repeat)\b")
+_FUNCTION_RE = re.compile(r"\b(?:function|def|procedure|proc|func|algorithm)\s+([a-z_][a-z0-9_]*)\s*\(")
+_WORD_RE = re.compile(r"[a-z0-9_]")
+_END_RE = re.compile(r"^end\b")
+_END_FUNCTION_RE = re.compile(r"^end(?:\s+(?:function|def|procedure|proc|func|algorithm)\b.*)?$")
+_IF_RE = re.compile(r"^(?:if|unless|switch|match)\b")
+_ELSE_RE = re.compile(r"^(?:else|elif|elsif|otherwise|case|default)\b")
+_EXIT_RE = re.compile(r"^(?:return|raise|throw|break)\b")
+# Statement after a block header on the same line, e.g. "if n < 2: return n"
+_INLINE_BODY_RE = re.compile(r"(?::|\bthen\b|\bdo\b)\s+(?=\S)")
+_TERNARY_RE = re.compile(r"(.*)\bif\b(.*)\belse\b(.*)")
+_USES = {
+    "hash_map": re.compile(r"\b(?:hash\s*map|hashmap|hash\s*set|hashset|hash\s*table|dict(?:ionary)?|map|counter)\b|\bset\s*\(|\{\s*\}"),
+    "sort": re.compile(r"\bsort(?:ed|ing)?\b"),
+    "heap": re.compile(r"\b(?:heap|heapq|heappush|heappop|priority\s*queue|min[-_ ]?heap|max[-_ ]?heap)\b"),
+    "binary_search": re.compile(r"\bbinary\s*search\b|\b(?:mid|middle)\s*=\s*.*(?://|/)\s*2\b|\(\s*(?:lo|low|left|l)\s*\+\s*(?:hi|high|right|r)\s*\)\s*(?://|/)\s*2"),
+    "memoized": re.compile(r"\b(?:memo|memoize|memoization|cache|dp)\b"),
+}
+
+
+@dataclass(slots=True)
+class PseudocodeStructure:
+    """Structure of one pseudocode submission."""
+
+    chars: int = 0
+    lines: int = 0
+    trivial: bool = True
+    loops: int = 0
+    loop_depth: int = 0
+    recursive: bool = False
+    branching_recursion: bool = False
+    hash_map: bool = False
+    sort: bool = False
+    heap: bool = False
+    binary_search: bool = False
+    memoized: bool = False
+    functions: List[str] = field(default_factory=list)
+    time_complexity: Optional[str] = None
+    space_complexity: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def summary(self) -> str:
+        """One line for prompts, e.g. 'nested loops (depth 2), hash map; estimated time O(n^2), space O(n)'."""
+        if self.trivial:
+            return "empty or trivial submission"
+        parts = []
+        if self.loop_depth > 1:
+            parts.append(f"nested loops (depth {self.loop_depth})")
+        elif self.loops:
+            parts.append("single loop" if self.loops == 1 else f"{self.loops} sequential loops")
+        if self.recursive:
+            parts.append("branching recursion" if self.branching_recursion else "recursion")
+        for flag, label in (("memoized", "memoization"), ("hash_map", "hash map/set"), ("sort", "sorting"),
+                            ("heap", "heap"), ("binary_search", "binary search")):
+            if getattr(self, flag):
+                parts.append(label)
+        shape = ", ".join(parts) or "straight-line steps"
+        return f"{shape}; estimated time {self.time_complexity}, space {self.space_complexity} ({self.lines} lines)"
+
+
+def _indent(line: str) -> int:
+    expanded = line.expandtabs(TAB_WIDTH)
+    return len(expanded) - len(expanded.lstrip())
+
+
+def _loop_nesting(lines: List[str]):
+    """(loop count, max loop depth), nesting loops by indentation."""
+    stack = []  # (indent, is_loop) of enclosing lines
+    loops = depth = 0
+    for line in lines:
+        indent = _indent(line)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        is_loop = bool(_LOOP_RE.match(line.strip()))
+        if is_loop:
+            loops += 1
+            depth = max(depth, 1 + sum(1 for _, enclosing in stack if enclosing))
+        stack.append((indent, is_loop))
+    return loops, depth
+
+
+def _function_bodies(lines: List[str]) -> Dict[str, List[str]]:
+    """Body lines of each defined function, by name.
+
+    A body is the lines indented deeper than its definition; unindented
+    pseudocode ends a body at the next definition or ``end``/``end function``.
+    """
+    bodies: Dict[str, List[str]] = {}
+    for i, line in enumerate(lines):
+        match = _FUNCTION_RE.search(line)
+        if not match:
+            continue
+        indent = _indent(line)
+        body = [line[match.end():]]  # one-line definitions
+        for following in lines[i + 1:]:
+            if _FUNCTION_RE.search(following) and _indent(following) <= indent:
+                break
+            if _indent(following) <= indent:
+                if len(body) > 1 and _indent(body[1]) > indent:
+                    break
+                if _END_FUNCTION_RE.match(following.strip()):
+                    break
+            body.append(following)
+        bodies.setdefault(match.group(1), []).extend(body)
+    return bodies
+
+
+# Self-calls on one path through a block: (most on a path that falls through
+# the block, most on a path that returns), -1 when there is no such path
+Paths = Tuple[int, int]
+
+
+def _then(a: Paths, b: Paths) -> Paths:
+    """``a`` followed by ``b``."""
+    through = a[0] + b[0] if a[0] >= 0 and b[0] >= 0 else -1
+    returned = max(a[1], a[0] + b[1] if a[0] >= 0 and b[1] >= 0 else -1)
+    return through, returned
+
+
+def _either(alternatives: List[Paths], exhaustive: bool) -> Paths:
+    """One of mutually exclusive branches; without an ``else`` none may run."""
+    if not exhaustive:
+        alternatives = alternatives + [(0, -1)]
+    return max(a[0] for a in alternatives), max(a[1] for a in alternatives)
+
+
+def _repeat(header: Paths, body: Paths) -> Paths:
+    """A loop: a self-call on a path that stays in the loop runs more than once."""
+    return _then(header, (2 * body[0] if body[0] > 0 else 0, body[1]))
+
+
+def _tree(lines: List[str]) -> List[Tuple[str, list]]:
+    """(statement, nested statements) items, nested by indentation."""
+    items, i = [], 0
+    while i < len(lines):
+        j = i + 1
+        while j < len(lines) and _indent(lines[j]) > _indent(lines[i]):
+            j += 1
+        items.append((lines[i].strip(), _tree(lines[i + 1:j])))
+        i = j
+    return items
+
+
+class _Frame:
+    """An open sequence, if/else chain or loop while walking a block."""
+
+    __slots__ = ("kind", "paths", "flat", "exhaustive", "header")
+
+    def __init__(self, kind: str, paths: List[Paths], flat: bool = False, header: Paths = (0, -1)):
+        self.kind = kind
+        self.paths = paths
+        # Flat frames span the following statements up to "end ..." (unindented pseudocode)
+        self.flat = flat
+        self.exhaustive = False
+        self.header = header
+
+
+def _block_paths(items: List[Tuple[str, list]], call_re) -> Paths:
+    def calls(text: str) -> int:
+        ternary = _TERNARY_RE.match(text)
+        if ternary:
+            value, condition, other = (len(call_re.findall(part)) for part in ternary.groups())
+            return condition + max(value, other)
+        return len(call_re.findall(text))
+
+    def statement(text: str) -> Paths:
+        return (-1, calls(text)) if _EXIT_RE.match(text) else (calls(text), -1)
+
+    frames = [_Frame("seq", [(0, -1)])]
+
+    def add(value: Paths) -> None:
+        frames[-1].paths[-1] = _then(frames[-1].paths[-1], value)
+
+    def close() -> None:
+        frame = frames.pop()
+        if frame.kind == "chain":
+            add(_either(frame.paths, frame.exhaustive))
+        else:
+            add(_repeat(frame.header, frame.paths[0]))
+
+    for text, children in items:
+        inline = _INLINE_BODY_RE.search(text)
+        header, body = (text[:inline.start()], text[inline.end():]) if inline else (text, "")
+        nested = _block_paths(children, call_re) if children else (0, -1)
+        branch = _then(_then((calls(header), -1), statement(body) if body else (0, -1)), nested)
+        flat = not children and not inline
+
+        if frames[-1].kind == "chain" and _ELSE_RE.match(text):
+            frames[-1].paths.append(branch)
+            frames[-1].flat = flat
+            frames[-1].exhaustive = text.startswith("else") and not re.match(r"else\s+if\b", text)
+            continue
+        if _END_RE.match(text):
+            if len(frames) > 1:
+                close()
+            continue
+        # Any other statement ends a chain whose branches are indented or inline
+        while len(frames) > 1 and not frames[-1].flat:
+            close()
+
+        if _IF_RE.match(text):
+            frames.append(_Frame("chain", [branch], flat=flat))
+        elif _LOOP_RE.match(text):
+            if flat:
+                frames.append(_Frame("loop", [(0, -1)], flat=True, header=(calls(header), -1)))
+            else:
+                add(_repeat((calls(header), -1), _then(statement(body) if body else (0, -1), nested)))
+        else:
+            add(_then(statement(text), nested))
+
+    while len(frames) > 1:
+        close()
+    return frames[0].paths[0]
+
+
+def _self_calls(lines: List[str]) -> int:
+    """Most calls a defined function makes to itself on one path through its body (0 if none recurse).
+
+    Calls in mutually exclusive branches (if/else, after an early return) are
+    on different paths; a call inside a loop counts as more than one.
+    """
+    most = 0
+    for name, body in _function_bodies(lines).items():
+        call_re = re.compile(rf"\b{re.escape(name)}\s*\(")
+        if not any(call_re.search(line) for line in body):
+            continue
+        inline = _INLINE_BODY_RE.search(body[0])
+        items = ([(body[0][inline.end():].strip(), [])] if inline else []) + _tree(body[1:])
+        most = max(most, max(_block_paths(items, call_re)))
+    return most
+
+
+def _estimate(s: PseudocodeStructure) -> None:
+    if s.recursive and s.binary_search and s.loop_depth <= 1:
+        # Halving recursion: binary search, or divide and conquer when it branches
+        if s.branching_recursion:
+            time = "O(n log n)" if s.loops else "O(n)"
+        else:
+            time = "O(n)" if s.loops else "O(log n)"
+    elif s.recursive and s.branching_recursion and not s.memoized:
+        time = "O(2^n)"
+    elif s.binary_search and s.loop_depth >= 2:
+        # The innermost loop is the binary search
+        time = "O(n log n)" if s.loop_depth == 2 else f"O(n^{s.loop_depth - 1} log n)"
+    elif s.loop_depth >= 2:
+        time = f"O(n^{s.loop_depth})"
+    elif s.sort or (s.heap and s.loops):
+        time = "O(n log n)"
+    elif s.binary_search and s.loop_depth <= 1 and not s.recursive and s.loops <= 1:
+        time = "O(log n)"
+    elif s.loops or s.recursive or s.hash_map:
+        time = "O(n)"
+    else:
+        time = "O(1)"
+
+    if s.hash_map or s.heap or s.memoized:
+        space = "O(n)"
+    elif s.recursive:
+        space = "O(n) (call stack)" if not s.binary_search else "O(log n) (call stack)"
+    else:
+        space = "O(1)"
+    s.time_complexity, s.space_complexity = time, space
+
+
+def analyze(pseudocode: str, trivial_length: int) -> PseudocodeStructure:
+    """Structure and preliminary complexity of ``pseudocode``.
+
+    Submissions shorter than ``trivial_length`` characters, or without a
+    single letter or digit, are trivial and not analyzed further.
+    """
+    text = (pseudocode or "").strip()
+    lines = [line for line in text.lower().splitlines() if line.strip()]
+    s = PseudocodeStructure(chars=len(text), lines=len(lines))
+    s.trivial = len(text) < trivial_length or not _WORD_RE.search(text.lower())
+    if s.trivial:
+        return s
+
+    lowered = "\n".join(lines)
+    s.loops, s.loop_depth = _loop_nesting(lines)
+    s.functions = list(dict.fromkeys(_FUNCTION_RE.findall(lowered)))
+    self_calls = _self_calls(lines)
+    s.recursive = self_calls >= 1
+    s.branching_recursion = self_calls >= 2
+    for flag, pattern in _USES.items():
+        setattr(s, flag, bool(pattern.search(lowered)))
+    _estimate(s)
+    return s
@@ -0,0 +1,259 @@
+"""
+DSA Question Bank
+=================
+Persisted DSA questions per role category (the keys of
+dsa_interview.ROLE_HINTS) and difficulty, so fetching a question is a memory
+lookup instead of an LLM call.
+
+Each bank is loaded once per process into a rotation, least-served
+questions first. A fetch takes the question at the head and moves it to the
+tail in O(1), so every question in a bank is served once before any is
+served again. Serve counts are written back in the background, so the order
+survives restarts. Banks are topped up to DSA_QUESTION_BANK_TARGET by a
+background replenisher, which is scheduled whenever a fetch finds its bank
+short and adds at most DSA_QUESTION_BANK_BATCH_SIZE questions per run, so a
+cold bank fills with traffic instead of costing a burst of LLM calls. A bank
+is not reloaded while its replenisher runs. Generated questions are rejected if their word-shingle (Jaccard)
+similarity to a question already in the bank reaches
+DSA_QUESTION_BANK_MAX_SIMILARITY, which catches the near-duplicates an
+exact hash misses.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import DSAQuestion
+from .dsa_interview import DEFAULT_ROLE, ROLE_HINTS, generate_dsa_question
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+DIFFICULTIES = ("easy", "medium", "hard")
+SHINGLE_SIZE = 3
+EXTRA_ATTEMPTS = 3  # generations on top of the shortfall to absorb rejections
+RELOAD_SECONDS = 300  # pick up questions added by other processes
+REPLENISH_WORKERS = 2
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_ROLE_PATTERNS = [
+    (category, re.compile(rf"\b{category}\b")) for category in ROLE_HINTS if category != DEFAULT_ROLE
+]
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "DSA_QUESTION_BANK_ENABLED", True)
+
+
+def role_category(role: str) -> str:
+    """ROLE_HINTS key for a free-form role, e.g. 'Senior Backend Engineer' -> 'backend'."""
+    text = (role or "").lower()
+    if text in ROLE_HINTS:
+        return text
+    for category, pattern in _ROLE_PATTERNS:
+        if pattern.search(text):
+            return category
+    return DEFAULT_ROLE
+
+
+def bank_key(role: str, difficulty: str) -> Optional[Tuple[str, str]]:
+    """(role category, difficulty), or None for difficulties the bank does not hold."""
+    difficulty = (difficulty or "").strip().lower()
+    if difficulty not in DIFFICULTIES:
+        return None
+    return role_category(role), difficulty
+
+
+def _words(question: Dict[str, Any]) -> List[str]:
+    text = f"{question.get('question_title', '')} {question.get('problem_statement', '')}"
+    return _NON_WORD_RE.sub(" ", text.lower()).split()
+
+
+def question_hash(question: Dict[str, Any]) -> str:
+    """Hash of the title and problem statement with case, punctuation and spacing normalized."""
+    return hashlib.sha1(" ".join(_words(question)).encode("utf-8")).hexdigest()
+
+
+def shingles(question: Dict[str, Any]) -> FrozenSet[Tuple[str, ...]]:
+    words = _words(question)
+    if len(words) < SHINGLE_SIZE:
+        return frozenset([tuple(words)])
+    return frozenset(tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+
+def similarity(a: FrozenSet, b: FrozenSet) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# ==================== Bank ====================
+
+class _Bank:
+    """In-memory rotation of one (role, difficulty) bank."""
+
+    __slots__ = ("rotation", "shingles", "loaded_at")
+
+    def __init__(self, rows):
+        # (pk, question), least served first
+        self.rotation = deque((pk, question) for pk, question in rows)
+        self.shingles = [shingles(question) for _, question in self.rotation]
+        self.loaded_at = time.monotonic()
+
+    def is_near_duplicate(self, candidate: FrozenSet) -> bool:
+        threshold = settings.DSA_QUESTION_BANK_MAX_SIMILARITY
+        return any(similarity(candidate, existing) >= threshold for existing in self.shingles)
+
+
+class QuestionBank:
+    """Per-process view of the DSA question banks with a background replenisher."""
+
+    def __init__(self):
+        self._banks: Dict[Tuple[str, str], _Bank] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=REPLENISH_WORKERS, thread_name_prefix="dsa-question-bank")
+        # Serve counts are recorded apart from replenishing, which waits on the LLM
+        self._recorder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dsa-question-served")
+        self._inflight = set()
+
+    def _load(self, key: Tuple[str, str]) -> _Bank:
+        rows = (
+            DSAQuestion.objects
+            .filter(role=key[0], difficulty=key[1])
+            .order_by("served_count", "last_served_at", "id")
+            .values_list("id", "question")
+        )
+        return _Bank(list(rows))
+
+    def _bank(self, key: Tuple[str, str]) -> _Bank:
+        bank = self._banks.get(key)
+        if bank is not None and key in self._inflight:
+            # The replenisher is adding to this bank; a reload would drop its additions
+            return bank
+        if bank is None or time.monotonic() - bank.loaded_at > RELOAD_SECONDS:
+            bank = self._load(key)
+            with self._lock:
+                self._banks[key] = bank
+        return bank
+
+    def take(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Next question of the bank in rotation, or None if it is empty."""
+        bank = self._bank(key)
+        with self._lock:
+            if bank.rotation:
+                pk, question = bank.rotation[0]
+                bank.rotation.rotate(-1)
+            else:
+                pk = question = None
+            size = len(bank.rotation)
+
+        metrics.incr("dsa_bank.hits" if question else "dsa_bank.misses")
+        if size < settings.DSA_QUESTION_BANK_TARGET:
+            self.schedule_replenish(key)
+        if pk is not None:
+            self._recorder.submit(_record_served, pk)
+        return question
+
+    def add(self, key: Tuple[str, str], question: Dict[str, Any]) -> bool:
+        """Bank ``question`` unless it is invalid or a (near-)duplicate; returns whether it was added."""
+        if not question.get("question_title") or not question.get("problem_statement"):
+            metrics.incr("dsa_bank.invalid")
+            return False
+        bank = self._bank(key)
+        candidate = shingles(question)
+        with self._lock:
+            if bank.is_near_duplicate(candidate):
+                metrics.incr("dsa_bank.near_duplicates")
+                return False
+        try:
+            pk = DSAQuestion.objects.create(
+                role=key[0], difficulty=key[1], question=question, question_hash=question_hash(question),
+            ).pk
+        except IntegrityError:
+            # Same question already banked, possibly by another process
+            metrics.incr("dsa_bank.duplicates")
+            return False
+        with self._lock:
+            # Never served, so it goes to the head of the rotation
+            bank.rotation.appendleft((pk, question))
+            bank.shingles.append(candidate)
+        metrics.incr("dsa_bank.generated")
+        return True
+
+    def size(self, key: Tuple[str, str]) -> int:
+        return len(self._bank(key).rotation)
+
+    def replenish(self, key: Tuple[str, str], limit: Optional[int] = None) -> int:
+        """Top the bank up to DSA_QUESTION_BANK_TARGET, adding at most ``limit`` questions.
+
+        Returns the number of questions added.
+        """
+        missing = settings.DSA_QUESTION_BANK_TARGET - self.size(key)
+        if limit is not None:
+            missing = min(missing, limit)
+        if missing <= 0:
+            return 0
+        added = 0
+        for _ in range(missing + EXTRA_ATTEMPTS):
+            if added >= missing:
+                break
+            question = generate_dsa_question(role=key[0], difficulty=key[1])
+            if self.add(key, question):
+                added += 1
+        return added
+
+    def schedule_replenish(self, key: Tuple[str, str]) -> None:
+        """Replenish in the background, at most once in flight per bank."""
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+        self._executor.submit(self._run_replenish, key)
+
+    def _run_replenish(self, key: Tuple[str, str]) -> None:
+        try:
+            self.replenish(key, limit=settings.DSA_QUESTION_BANK_BATCH_SIZE)
+        except Exception as e:
+            metrics.incr("dsa_bank.replenish_errors")
+            logger.warning(f"DSA question bank replenish failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+            close_old_connections()
+
+
+def _record_served(pk: int) -> None:
+    try:
+        DSAQuestion.objects.filter(pk=pk).update(served_count=F("served_count") + 1, last_served_at=timezone.now())
+    except Exception as e:
+        logger.warning(f"Failed to record DSA question {pk} as served: {e}")
+    finally:
+        close_old_connections()
+
+
+question_bank = QuestionBank()
+
+
+def get_question(role: str, difficulty: str) -> Dict[str, Any]:
+    """A question for the role and difficulty: banked if available, generated otherwise."""
+    key = bank_key(role, difficulty) if is_enabled() else None
+    if key is None:
+        return generate_dsa_question(role=role, difficulty=difficulty)
+    question = question_bank.take(key)
+    if question is None:
+        # Empty bank (take scheduled a batch replenish); bank this one too
+        question = generate_dsa_question(role=key[0], difficulty=key[1])
+        question_bank.add(key, question)
+    return question
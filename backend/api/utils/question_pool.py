@@ -0,0 +1,234 @@
+"""
+Opening Question Pool
+=====================
+Pre-generated first interview questions per job description and resume
+profile bucket, so starting a behavioral interview is a database read
+instead of an LLM call.
+
+A resume is mapped to a coarse bucket (seniority and skill family, e.g.
+'senior:backend') by keyword matching. Each (job description, bucket) pool
+is kept at QUESTION_POOL_TARGET unserved questions: taking a question
+schedules an asynchronous refill once the pool drops below
+QUESTION_POOL_LOW_WATERMARK, and uploading a resume warms its bucket ahead
+of the interview. Questions are de-duplicated by a hash of their
+normalized text, including against questions already served.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from ..models import JobDescription, OpeningQuestion
+from .behavioral_interview import generate_opening_questions
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+CLAIM_ATTEMPTS = 5
+EXTRA_QUESTIONS = 2  # generated on top of the shortfall to absorb duplicates
+JD_PROMPT_CHARS = 2000
+SERVED_RETENTION_DAYS = 30
+REFILL_WORKERS = 2
+
+SENIORITY_KEYWORDS = [
+    ("lead", re.compile(r"\b(lead|principal|staff|head of|manager|director|architect)\b")),
+    ("junior", re.compile(r"\b(intern|internship|junior|jr\.?|graduate|student|entry[- ]level|bootcamp)\b")),
+    ("senior", re.compile(r"\b(senior|sr\.?)\b")),
+]
+YEARS_RE = re.compile(r"\b(\d{1,2})\+?\s*(?:years|yrs)\b")
+SENIOR_YEARS = 5
+DEFAULT_SENIORITY = "mid"
+
+SKILL_FAMILIES = {
+    "frontend": ["react", "angular", "vue", "css", "html", "frontend", "front-end", "typescript", "ui"],
+    "backend": ["django", "flask", "spring", "node", "api", "microservices", "sql", "postgres", "backend", "java", "golang"],
+    "data": ["machine learning", "pandas", "tensorflow", "pytorch", "data science", "spark", "analytics", "ml", "statistics"],
+    "mobile": ["android", "ios", "swift", "kotlin", "flutter", "react native"],
+    "devops": ["kubernetes", "docker", "terraform", "aws", "ci/cd", "devops", "sre", "linux"],
+}
+DEFAULT_FAMILY = "general"
+
+_FAMILY_PATTERNS = {
+    family: re.compile(r"(?<![\w])(" + "|".join(re.escape(k) for k in keywords) + r")(?![\w])")
+    for family, keywords in SKILL_FAMILIES.items()
+}
+
+SENIORITY_LABELS = {
+    "junior": "Early-career",
+    "mid": "Mid-level",
+    "senior": "Senior",
+    "lead": "Lead / principal-level",
+}
+FAMILY_LABELS = {
+    "frontend": "frontend engineer",
+    "backend": "backend engineer",
+    "data": "data / machine learning practitioner",
+    "mobile": "mobile developer",
+    "devops": "infrastructure / DevOps engineer",
+    "general": "professional without a strong software specialization",
+}
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "QUESTION_POOL_ENABLED", True)
+
+
+def profile_bucket(resume_text: str) -> str:
+    """Coarse '<seniority>:<family>' bucket for a resume."""
+    text = (resume_text or "").lower()
+
+    seniority = None
+    for label, pattern in SENIORITY_KEYWORDS:
+        if pattern.search(text):
+            seniority = label
+            break
+    if seniority is None:
+        years = [int(y) for y in YEARS_RE.findall(text)]
+        seniority = "senior" if years and max(years) >= SENIOR_YEARS else DEFAULT_SENIORITY
+
+    counts = {family: len(pattern.findall(text)) for family, pattern in _FAMILY_PATTERNS.items()}
+    family = max(counts, key=counts.get)
+    if counts[family] == 0:
+        family = DEFAULT_FAMILY
+    return f"{seniority}:{family}"
+
+
+def all_buckets() -> List[str]:
+    return [f"{s}:{f}" for s in SENIORITY_LABELS for f in FAMILY_LABELS]
+
+
+def describe_bucket(bucket: str) -> str:
+    seniority, _, family = bucket.partition(":")
+    return f"{SENIORITY_LABELS.get(seniority, seniority)} {FAMILY_LABELS.get(family, family)}"
+
+
+def question_hash(text: str) -> str:
+    """Hash of the question text with case, punctuation and spacing normalized."""
+    normalized = _NON_WORD_RE.sub(" ", (text or "").lower()).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+# ==================== Pool ====================
+
+def take(job_description: Optional[JobDescription], resume_text: str) -> Optional[Dict[str, Any]]:
+    """Claim an unserved opening question for this job description and resume, or None."""
+    if not is_enabled() or job_description is None:
+        return None
+    bucket = profile_bucket(resume_text)
+    candidates = (
+        OpeningQuestion.objects
+        .filter(job_description=job_description, profile_bucket=bucket, served_at__isnull=True)
+        .values_list("id", "question")[:CLAIM_ATTEMPTS]
+    )
+    claimed = None
+    for pk, question in candidates:
+        # Conditional update: concurrent starts never get the same question
+        if OpeningQuestion.objects.filter(pk=pk, served_at__isnull=True).update(served_at=timezone.now()):
+            claimed = question
+            break
+
+    metrics.incr("question_pool.hits" if claimed else "question_pool.misses")
+    schedule_refill(job_description.id, bucket)
+    return claimed
+
+
+def available(job_description_id: int, bucket: str) -> int:
+    return OpeningQuestion.objects.filter(
+        job_description_id=job_description_id, profile_bucket=bucket, served_at__isnull=True
+    ).count()
+
+
+def refill(job_description_id: int, bucket: str) -> int:
+    """Top the pool up to QUESTION_POOL_TARGET; returns the number of questions added."""
+    missing = settings.QUESTION_POOL_TARGET - available(job_description_id, bucket)
+    if missing <= 0:
+        return 0
+    job_description = JobDescription.objects.get(pk=job_description_id)
+    questions = generate_opening_questions(
+        role=job_description.title,
+        job_description=job_description.description[:JD_PROMPT_CHARS],
+        profile=describe_bucket(bucket),
+        count=missing + EXTRA_QUESTIONS,
+    )
+
+    added = 0
+    for question in questions:
+        if added >= missing:
+            break
+        try:
+            _, created = OpeningQuestion.objects.get_or_create(
+                job_description_id=job_description_id,
+                profile_bucket=bucket,
+                question_hash=question_hash(question["question"]),
+                defaults={"question": question},
+            )
+        except IntegrityError:
+            # Inserted by a concurrent refill
+            created = False
+        if created:
+            added += 1
+        else:
+            metrics.incr("question_pool.duplicates")
+    metrics.incr("question_pool.generated", added)
+
+    OpeningQuestion.objects.filter(
+        job_description_id=job_description_id,
+        served_at__lt=timezone.now() - timedelta(days=SERVED_RETENTION_DAYS),
+    ).delete()
+    return added
+
+
+class _Refiller:
+    """Background refills, at most one in flight per (job description, bucket)."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=REFILL_WORKERS, thread_name_prefix="question-pool")
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, job_description_id: int, bucket: str) -> None:
+        key = (job_description_id, bucket)
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+        self._executor.submit(self._run, key)
+
+    def _run(self, key: Tuple[int, str]) -> None:
+        try:
+            if available(*key) < settings.QUESTION_POOL_LOW_WATERMARK:
+                refill(*key)
+        except Exception as e:
+            metrics.incr("question_pool.refill_errors")
+            logger.warning(f"Opening question refill failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+            close_old_connections()
+
+
+_refiller = _Refiller()
+
+
+def schedule_refill(job_description_id: int, bucket: str) -> None:
+    """Refill the pool in the background if it is below the low watermark."""
+    if is_enabled():
+        _refiller.schedule(job_description_id, bucket)
+
+
+def warm_for_resume(job_description: Optional[JobDescription], resume_text: str) -> None:
+    """Warm the pool a candidate will draw from, ahead of the interview start."""
+    if job_description is not None:
+        schedule_refill(job_description.id, profile_bucket(resume_text))
+
@@ -0,0 +1,319 @@
+"""
+DSA Session Log Index
+=====================
+Sidecar index of the session log (see session_log): for every record, the
+segment it lives in, its byte offset and length, and the keys it can be
+looked up by (timestamp, role, difficulty, hire recommendation, question
+title).
+
+The index is a SQLite file next to the segments, with one B-tree per key, so
+lookups stay fast however many sessions have been logged. The writer adds
+entries as it appends batches and renames segments in the index when it
+rotates or compresses them; rebuild() recreates the index from the segments
+on disk. Records are read back by seeking into memory-mapped segments;
+compressed segments are decompressed once per read.
+
+Each decoded record is checked against its index row (session_idx and
+logged_at); a record that does not match, or a segment that is gone, raises
+StaleIndexError so the caller can rebuild and query again. An index written
+by an older version of the schema counts as stale too (needs_rebuild()).
+Writers, compression and rebuilds of one directory serialize on its
+DirectoryLock.
+"""
+
+import gzip
+import io
+import json
+import mmap
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ==================== Constants ====================
+INDEX_FILE = "session_logs.idx.sqlite3"
+LOCK_FILE = "session_logs.lock"
+# Stored as the index's user_version by rebuild()
+SCHEMA_VERSION = 2
+# Query filters and the record fields they match
+KEYS = {
+    "role": ("session", "role"),
+    "difficulty": ("session", "difficulty"),
+    "hire": ("report", "hire_recommendation"),
+    "question_title": ("report", "question_title"),
+}
+CONNECT_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS records (
+    segment_id INTEGER NOT NULL REFERENCES segments(id),
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    session_idx INTEGER,
+    logged_at TEXT,
+    role TEXT COLLATE NOCASE,
+    difficulty TEXT COLLATE NOCASE,
+    hire TEXT COLLATE NOCASE,
+    question_title TEXT COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS records_logged_at ON records(logged_at);
+CREATE INDEX IF NOT EXISTS records_role ON records(role, logged_at);
+CREATE INDEX IF NOT EXISTS records_difficulty ON records(difficulty, logged_at);
+CREATE INDEX IF NOT EXISTS records_hire ON records(hire, logged_at);
+CREATE INDEX IF NOT EXISTS records_question_title ON records(question_title, logged_at);
+"""
+
+Entry = Tuple[int, int, Dict[str, Any]]
+# (segment, offset, length, session_idx, logged_at)
+Location = Tuple[str, int, int, Optional[int], Optional[str]]
+
+
+class StaleIndexError(Exception):
+    """The index no longer matches the segments on disk."""
+
+
+class DirectoryLock:
+    """Exclusive lock shared by every process using one session log directory.
+
+    A lock file held with ``flock``, plus a thread lock since flock does not
+    exclude threads sharing the file. Without ``fcntl`` (Windows) only the
+    thread lock applies.
+    """
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, LOCK_FILE)
+        self._file = None
+        self._thread_lock = threading.Lock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "ab")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+def index_keys(record: Dict[str, Any]) -> Tuple[Optional[str], ...]:
+    """(logged_at, role, difficulty, hire, question_title) for a log record."""
+    values = [record.get("logged_at")]
+    for section, field in KEYS.values():
+        value = (record.get(section) or {}).get(field)
+        values.append(value if value is None else str(value))
+    return tuple(values)
+
+
+class SessionLogIndex:
+    """Index of one session log directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_FILE)
+        self._conn = None
+        # The writer and compression threads share one connection
+        self._lock = threading.RLock()
+        self.lock = DirectoryLock(directory)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=CONNECT_TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if columns and "session_idx" not in columns:
+                # Older schema; rebuild() repopulates it
+                conn.executescript("DROP TABLE records; DROP TABLE segments;")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _segment_id(self, conn: sqlite3.Connection, name: str) -> int:
+        conn.execute("INSERT OR IGNORE INTO segments (name) VALUES (?)", (name,))
+        return conn.execute("SELECT id FROM segments WHERE name = ?", (name,)).fetchone()[0]
+
+    def needs_rebuild(self) -> bool:
+        """Whether the index was not built by rebuild() with the current schema."""
+        with self._lock:
+            return self._connect().execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION
+
+    def add(self, segment: str, entries: Iterable[Entry]) -> None:
+        """Index records appended to ``segment`` as (offset, length, record)."""
+        with self._lock, self._connect() as conn:
+            self._add(conn, segment, entries)
+
+    def _add(self, conn: sqlite3.Connection, segment: str, entries: Iterable[Entry]) -> None:
+        segment_id = self._segment_id(conn, segment)
+        conn.executemany(
+            "INSERT INTO records (segment_id, offset, length, session_idx, logged_at, role, difficulty, hire, question_title) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (segment_id, offset, length, record.get("session_idx"), *index_keys(record))
+                for offset, length, record in entries
+            ),
+        )
+
+    def rename(self, old: str, new: str) -> None:
+        """Point the entries of segment ``old`` at its new name."""
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE segments SET name = ? WHERE name = ?", (new, old))
+
+    def _where(self, filters: Dict[str, str], since: Optional[str], until: Optional[str]) -> Tuple[str, List[str]]:
+        clauses, params = [], []
+        for key, value in filters.items():
+            if key not in KEYS:
+                raise ValueError(f"Unknown session log key: {key}")
+            clauses.append(f"r.{key} = ?")
+            params.append(value)
+        if since:
+            clauses.append("r.logged_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("r.logged_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        filters: Dict[str, str],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True,
+    ) -> List[Location]:
+        """(segment, offset, length, session_idx, logged_at) of matching records, by timestamp.
+
+        ``filters`` maps KEYS names to values, matched case-insensitively;
+        ``since``/``until`` are ISO timestamps (inclusive, exclusive).
+        """
+        where, params = self._where(filters, since, until)
+        sql = f"SELECT s.name, r.offset, r.length, r.session_idx, r.logged_at FROM records r JOIN segments s ON s.id = r.segment_id{where}"
+        sql += f" ORDER BY r.logged_at {'DESC' if newest_first else 'ASC'}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def count(self, filters: Optional[Dict[str, str]] = None, since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Number of matching records (all records by default)."""
+        where, params = self._where(filters or {}, since, until)
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM records r{where}", params).fetchone()[0]
+
+    # ------------- Reading -------------
+    def read(self, locations: Iterable[Location]) -> List[Dict[str, Any]]:
+        """Records at the given locations, in order; each segment is opened once.
+
+        Raises StaleIndexError if a record does not match its index row.
+        """
+        locations = list(locations)
+        by_segment: Dict[str, List[Tuple[int, Location]]] = {}
+        for position, location in enumerate(locations):
+            by_segment.setdefault(location[0], []).append((position, location))
+
+        records: List[Dict[str, Any]] = [None] * len(locations)
+        for segment, entries in by_segment.items():
+            path = os.path.join(self.directory, segment)
+            if not os.path.exists(path):
+                raise StaleIndexError(f"Indexed segment {segment} is missing")
+            with _open_segment(path) as data:
+                for position, (_, offset, length, session_idx, logged_at) in entries:
+                    try:
+                        record = json.loads(data[offset:offset + length])
+                    except ValueError:
+                        record = None
+                    if not isinstance(record, dict) or (record.get("session_idx"), record.get("logged_at")) != (session_idx, logged_at):
+                        raise StaleIndexError(f"Record at {segment}:{offset} does not match the index")
+                    records[position] = record
+        return records
+
+    # ------------- Rebuild -------------
+    def rebuild(self, segments: Iterable[str]) -> int:
+        """Recreate the index from ``segments`` (names in the directory); returns the record count.
+
+        Hold ``self.lock`` while listing the segments and rebuilding if
+        writers may be running.
+        """
+        total = 0
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM segments")
+            for segment in segments:
+                with _open_segment(os.path.join(self.directory, segment)) as data:
+                    entries = list(_scan(data))
+                self._add(conn, segment, entries)
+                total += len(entries)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return total
+
+
+def _scan(data) -> Iterator[Entry]:
+    offset, size = 0, len(data)
+    while offset < size:
+        end = data.find(b"\n", offset)
+        if end == -1:
+            end = size
+        line = data[offset:end]
+        if line.strip():
+            try:
+                yield offset, len(line), json.loads(line)
+            except ValueError:
+                # Torn last line from a crash; not indexed
+                pass
+        offset = end + 1
+
+
+@contextmanager
+def _open_segment(path: str):
+    """Bytes-like view of a segment: memory-mapped, or decompressed in memory."""
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            yield f.read()
+        return
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        out = io.BytesIO()
+        with open(path, "rb") as f:
+            zstandard.ZstdDecompressor().copy_stream(f, out)
+        yield out.getvalue()
+        return
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
@@ -0,0 +1,294 @@
+"""
+DSA Session Log
+===============
+Append-only JSON-lines log of finished DSA sessions and their reports,
+written by a background thread.
+
+Callers enqueue records on a bounded queue and return immediately. The
+writer drains the queue in batches of up to SESSION_LOG_BATCH_SIZE records,
+writing each batch with one write and flush, at least every
+SESSION_LOG_FLUSH_INTERVAL seconds. The active segment
+(SESSION_LOG_DIR/session_logs.jsonl) is rotated once it reaches
+SESSION_LOG_MAX_BYTES or is older than SESSION_LOG_ROTATE_SECONDS; rotated
+segments are renamed with their rotation time and optionally compressed
+(SESSION_LOG_COMPRESSION = gzip or zstd, the latter needs ``zstandard``).
+Every batch is also added to the sidecar index (see session_index) so
+records can be looked up without scanning the log.
+
+When the queue is full, enqueueing waits up to SESSION_LOG_ENQUEUE_TIMEOUT
+seconds and then drops the record. Queue depth, waits, drops, batches and
+flush times are reported through api.utils.metrics.
+
+Each process has its own writer. Writers that share a SESSION_LOG_DIR
+serialize on the directory lock (session_index.DirectoryLock): a batch is
+written, and its index offsets taken from the end of the segment, while the
+lock is held, and rotation and compression happen under the same lock. A
+writer whose active segment was rotated by another process reopens the new
+one.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .conf import setting
+from .metrics import metrics
+from .session_index import SessionLogIndex
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+ACTIVE_SEGMENT = "session_logs.jsonl"
+SEGMENT_PREFIX = "session_logs."
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+# Defaults when Django is not configured (CLI usage); see settings.py
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "session_logs")
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_ENQUEUE_TIMEOUT = 0.05
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_ROTATE_SECONDS = 86400
+
+
+def _compress(path: str, method: str, index: SessionLogIndex) -> None:
+    """Compress a rotated segment next to itself and remove the original."""
+    target = path + COMPRESSION_SUFFIXES[method]
+    tmp = target + ".tmp"
+    try:
+        with open(path, "rb") as src:
+            if method == "zstd":
+                with open(tmp, "wb") as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+            else:
+                with gzip.open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+        with index.lock:
+            os.replace(tmp, target)
+            index.rename(os.path.basename(path), os.path.basename(target))
+            os.remove(path)
+        metrics.incr("session_log.compressed_segments")
+    except Exception as e:
+        logger.error(f"Failed to compress session log segment {path}: {e}")
+
+
+class SessionLogWriter:
+    """Background writer for the DSA session log."""
+
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._thread = None
+        self._lock = threading.Lock()
+        # Serializes file access between the writer thread, rotate() and close()
+        self._io_lock = threading.Lock()
+        self._file = None
+        self._index = None
+        self._opened_at = 0.0
+        self._zstd_warned = False
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-log-compress")
+        metrics.register_gauge("session_log.queue_depth", lambda: self._queue.qsize() if self._queue else 0)
+
+    @property
+    def directory(self) -> str:
+        return str(setting("SESSION_LOG_DIR", DEFAULT_DIR))
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.directory, ACTIVE_SEGMENT)
+
+    @property
+    def index(self) -> SessionLogIndex:
+        if self._index is None:
+            self._index = SessionLogIndex(self.directory)
+        return self._index
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._queue = queue.Queue(maxsize=setting("SESSION_LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+                    self._thread = threading.Thread(target=self._run, name="session-log", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def write(self, record: Dict[str, Any]) -> bool:
+        """Queue ``record`` for the log; returns False if it was dropped."""
+        self._ensure_thread()
+        record.setdefault("logged_at", datetime.now(timezone.utc).isoformat())
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("session_log.backpressure")
+            start = time.monotonic()
+            try:
+                self._queue.put(record, timeout=setting("SESSION_LOG_ENQUEUE_TIMEOUT", DEFAULT_ENQUEUE_TIMEOUT))
+            except queue.Full:
+                metrics.incr("session_log.dropped")
+                logger.warning("Session log queue is full; dropping a session record")
+                return False
+            finally:
+                metrics.observe("session_log.enqueue_wait", time.monotonic() - start)
+        metrics.incr("session_log.enqueued")
+        return True
+
+    # ------------- Writer thread -------------
+    def _next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        batch_size = setting("SESSION_LOG_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        while len(batch) < batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch(setting("SESSION_LOG_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+            try:
+                with self._io_lock, self.index.lock:
+                    self._maybe_rotate()
+                    if batch:
+                        self._write_batch(batch)
+            except Exception as e:
+                metrics.incr("session_log.write_errors")
+                logger.error(f"Failed to write {len(batch)} session log records: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _open(self):
+        if self._file is not None and not self._is_active(self._file):
+            # Another process rotated the segment this file points at
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self.active_path, "ab")
+            self._opened_at = time.time()
+        return self._file
+
+    def _is_active(self, f) -> bool:
+        try:
+            return os.path.samestat(os.fstat(f.fileno()), os.stat(self.active_path))
+        except FileNotFoundError:
+            return False
+
+    def _encode(self, record: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        except (TypeError, ValueError) as e:
+            metrics.incr("session_log.encode_errors")
+            logger.error(f"Dropping unserializable session log record: {e}")
+            return None
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        start = time.monotonic()
+        encoded = [(record, line) for record in batch if (line := self._encode(record))]
+        f = self._open()
+        # Under the directory lock nobody else appends, so the end is where this batch starts
+        offset = f.seek(0, os.SEEK_END)
+        data = b"".join(line for _, line in encoded)
+        f.write(data)
+        f.flush()
+        metrics.observe("session_log.flush", time.monotonic() - start)
+        metrics.incr("session_log.batches")
+        metrics.incr("session_log.records_written", len(encoded))
+        metrics.incr("session_log.bytes_written", len(data))
+
+        entries = []
+        for record, line in encoded:
+            entries.append((offset, len(line) - 1, record))
+            offset += len(line)
+        try:
+            self.index.add(ACTIVE_SEGMENT, entries)
+        except Exception as e:
+            # The log stays authoritative; query_sessions --rebuild recovers the index
+            metrics.incr("session_log.index_errors")
+            logger.warning(f"Failed to index {len(entries)} session log records: {e}")
+
+    def _maybe_rotate(self) -> None:
+        f = self._file
+        if f is None:
+            return
+        if not self._is_active(f):
+            self._open()
+            return
+        max_bytes = setting("SESSION_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)
+        max_age = setting("SESSION_LOG_ROTATE_SECONDS", DEFAULT_ROTATE_SECONDS)
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        if (max_bytes and size >= max_bytes) or (max_age and time.time() - self._opened_at >= max_age):
+            self._rotate()
+
+    def rotate(self) -> Optional[str]:
+        """Close the active segment and rename it; returns the rotated path."""
+        with self._io_lock, self.index.lock:
+            return self._rotate()
+
+    def _rotate(self) -> Optional[str]:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not os.path.exists(self.active_path) or not os.path.getsize(self.active_path):
+            return None
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        rotated = os.path.join(self.directory, f"{SEGMENT_PREFIX}{stamp}.jsonl")
+        os.replace(self.active_path, rotated)
+        metrics.incr("session_log.rotations")
+        try:
+            self.index.rename(ACTIVE_SEGMENT, os.path.basename(rotated))
+        except Exception as e:
+            metrics.incr("session_log.index_errors")
+            logger.warning(f"Failed to rename session log segment in the index: {e}")
+
+        method = (setting("SESSION_LOG_COMPRESSION", "") or "").lower()
+        if method == "zstd" and zstandard is None:
+            if not self._zstd_warned:
+                logger.warning("SESSION_LOG_COMPRESSION=zstd but zstandard is not installed; using gzip")
+                self._zstd_warned = True
+            method = "gzip"
+        if method in COMPRESSION_SUFFIXES:
+            self._compressor.submit(_compress, rotated, method, self.index)
+        return rotated
+
+    def close(self) -> None:
+        """Write everything queued so far (called at exit)."""
+        if self._queue is None:
+            return
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            with self._io_lock, self.index.lock:
+                if remaining:
+                    self._write_batch(remaining)
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+        except Exception as e:
+            logger.error(f"Failed to write {len(remaining)} session log records at exit: {e}")
+
+
+session_log_writer = SessionLogWriter()
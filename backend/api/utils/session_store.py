@@ -0,0 +1,346 @@
+"""
+Behavioral Session Store
+========================
+Persists InterviewLLMService state per report so the behavioral text flow
+can be served by any worker.
+
+State is compact (role and resume are not stored; they are read back from
+the report, and chat history is stored as rows, see turns) and versioned.
+Saves are written before the request returns, so the next request sees them
+whichever worker serves it. A row is only overwritten by a state that is at
+least as far along (questions asked, then answers evaluated), so a late
+write never rolls a session back. Background history summaries are written
+to the row's summary columns when they finish, only over an older summary,
+and loads use the newer of those and the state's.
+
+Split-mode evaluations finish after their turn was saved. They are stored
+as BehavioralEvaluation rows, apart from the session state, so a later turn
+saved by another worker cannot discard them; loads merge them back in. The
+row is written as pending, with the evaluation's inputs, before the answer
+is acknowledged, and marked done (or failed) by the worker running the
+evaluation. Those writes are batched: a background thread writes all
+finished evaluations every BEHAVIORAL_SESSION_FLUSH_INTERVAL seconds or as
+soon as BEHAVIORAL_SESSION_BATCH_SIZE are pending, and loads read through
+the batch.
+
+Reports are built from load_evaluated(), which waits for pending rows and
+runs an evaluation itself when its row failed, is missing, or stayed
+pending past EVALUATION_STALE_SECONDS (its worker went away).
+"""
+
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import (
+    EVALUATION_DONE,
+    EVALUATION_FAILED,
+    EVALUATION_PENDING,
+    BehavioralEvaluation,
+    BehavioralSession,
+    InterviewReport,
+)
+from .behavioral_interview import EVALUATION_WAIT_SECONDS, InterviewLLMService
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ==================== Constants ====================
+STATE_VERSION = 2
+# Fields rebuilt from the report on load instead of being stored
+REPORT_FIELDS = ("role", "resume_text")
+# A pending evaluation not finished by then is run again by load_evaluated()
+EVALUATION_STALE_SECONDS = EVALUATION_WAIT_SECONDS * 2
+EVALUATION_POLL_SECONDS = 0.5
+
+# Upgrade functions keyed by the version they upgrade from
+_UPGRADES: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    # v2 stores chat_history as rows; turns.decode still reads v1 dicts
+    1: lambda state: state,
+}
+
+
+def pack_state(svc: InterviewLLMService) -> Dict[str, Any]:
+    """Compact, versioned state of ``svc`` for storage."""
+    state = svc.to_dict(compact=True)
+    for key in REPORT_FIELDS:
+        state.pop(key, None)
+    if not state.get("history_summary"):
+        state.pop("history_summary", None)
+        state.pop("summarized_turns", None)
+    state["v"] = STATE_VERSION
+    return state
+
+
+def unpack_state(state: Dict[str, Any], report: InterviewReport) -> Optional[InterviewLLMService]:
+    """Rebuild a service from stored state; None if the version cannot be read."""
+    state = dict(state)
+    version = state.pop("v", 1)
+    while version < STATE_VERSION and version in _UPGRADES:
+        state = _UPGRADES[version](state)
+        version += 1
+    if version != STATE_VERSION:
+        logger.warning(f"Unsupported behavioral session version {version} for report {report.id}")
+        return None
+    state["role"] = report.position
+    state["resume_text"] = report.resume_text
+    # Clients come from the shared pool in model_routing, so this is cheap
+    return InterviewLLMService.from_dict(state)
+
+
+def _unevaluated(svc: InterviewLLMService) -> List[int]:
+    return [idx for idx, turn in enumerate(svc.chat_history) if turn.answer and not turn.evaluation]
+
+
+def _progress(svc: InterviewLLMService) -> Tuple[int, int]:
+    evaluated = sum(1 for item in svc.chat_history if item.evaluation)
+    return len(svc.chat_history), evaluated
+
+
+class BehavioralSessionStore:
+    """Behavioral interview state keyed by report id, shared by all workers."""
+
+    def __init__(self):
+        # Finished split-mode evaluations not yet written, by report id and
+        # turn, as (status, evaluation, coach tip)
+        self._pending: Dict[str, Dict[int, Tuple[str, Dict[str, Any], str]]] = {}
+        # Batch being written; still served by load() until committed
+        self._flushing: Dict[str, Dict[int, Tuple[str, Dict[str, Any], str]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-evaluations")
+        metrics.register_gauge("session_store.pending", lambda: sum(len(turns) for turns in self._pending.values()))
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="session-store", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def save(self, report_id, svc: InterviewLLMService) -> None:
+        """Write the current state of ``svc`` for ``report_id`` before returning."""
+        turns, evaluated = _progress(svc)
+        self._write(str(report_id), (turns, evaluated, pack_state(svc)), timezone.now())
+        metrics.incr("session_store.saves")
+
+    def save_when_evaluated(self, report_id, svc: InterviewLLMService) -> None:
+        """Record split-mode evaluations apart from the session state.
+
+        Pending rows with the evaluations' inputs are written before
+        returning; the rows are completed in the background as the
+        evaluations finish.
+        """
+        key = str(report_id)
+        waiting = [idx for idx in _unevaluated(svc) if idx in svc.evaluation_inputs]
+        BehavioralEvaluation.objects.bulk_create(
+            [
+                BehavioralEvaluation(
+                    report_id=key, turn=idx, status=EVALUATION_PENDING,
+                    history=svc.evaluation_inputs[idx][0],
+                    question=svc.evaluation_inputs[idx][1],
+                    answer=svc.evaluation_inputs[idx][2],
+                )
+                for idx in waiting
+            ],
+            ignore_conflicts=True,
+        )
+
+        def record():
+            svc.wait_for_evaluations()
+            for idx in waiting:
+                turn = svc.chat_history[idx]
+                if turn.evaluation:
+                    self._queue_evaluation(key, idx, EVALUATION_DONE, turn.evaluation, turn.coach_tip or "")
+                else:
+                    # Failed or timed out; load_evaluated() runs it again
+                    self._queue_evaluation(key, idx, EVALUATION_FAILED, {}, "")
+        self._executor.submit(record)
+
+    def _queue_evaluation(self, key: str, turn: int, status: str, evaluation: Dict[str, Any], coach_tip: str) -> None:
+        with self._lock:
+            self._pending.setdefault(key, {})[turn] = (status, evaluation, coach_tip)
+            full = sum(len(turns) for turns in self._pending.values()) >= settings.BEHAVIORAL_SESSION_BATCH_SIZE
+        metrics.incr("session_store.evaluations")
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def load(self, report: InterviewReport) -> Optional[InterviewLLMService]:
+        """Service for ``report`` with every recorded evaluation merged in."""
+        session = (
+            BehavioralSession.objects.filter(report_id=report.id)
+            .only("state", "history_summary", "summarized_turns").first()
+        )
+        if session is None:
+            return None
+        svc = unpack_state(session.state, report)
+        if svc is not None:
+            if session.summarized_turns > svc.summarized_turns:
+                svc.summarized_turns, svc.history_summary = session.summarized_turns, session.history_summary
+            svc.on_summary = partial(self._save_summary, str(report.id))
+            self._merge_evaluations(str(report.id), svc)
+        return svc
+
+    @staticmethod
+    def _save_summary(report_id: str, summarized_turns: int, summary: str) -> None:
+        """Write a finished background summary unless a newer one is stored."""
+        try:
+            BehavioralSession.objects.filter(
+                report_id=report_id, summarized_turns__lt=summarized_turns,
+            ).update(history_summary=summary, summarized_turns=summarized_turns)
+            metrics.incr("session_store.summaries")
+        except Exception as e:
+            # Only this process has it then; the next fold elsewhere redoes it
+            logger.warning(f"Failed to save history summary for report {report_id}: {e}")
+        finally:
+            close_old_connections()
+
+    def load_evaluated(self, report: InterviewReport, timeout: float = EVALUATION_WAIT_SECONDS) -> Optional[InterviewLLMService]:
+        """Service for ``report`` with every answer evaluated, for building reports.
+
+        Waits up to ``timeout`` seconds for evaluations still running on any
+        worker, then evaluates the rest here.
+        """
+        svc = self.load(report)
+        if svc is None:
+            return None
+        key = str(report.id)
+        # Evaluations this process started itself
+        svc.wait_for_evaluations(timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            self._merge_evaluations(key, svc)
+            missing = _unevaluated(svc)
+            if not missing:
+                return svc
+            rows = {row.turn: row for row in BehavioralEvaluation.objects.filter(report_id=key, turn__in=missing)}
+            stale_before = timezone.now() - timedelta(seconds=EVALUATION_STALE_SECONDS)
+            expired = time.monotonic() >= deadline
+            rerun = [
+                idx for idx in missing
+                if expired or idx not in rows or rows[idx].status != EVALUATION_PENDING or rows[idx].updated_at < stale_before
+            ]
+            for idx in rerun:
+                self._evaluate(key, svc, idx, rows.get(idx))
+            if len(rerun) == len(missing):
+                return svc
+            time.sleep(EVALUATION_POLL_SECONDS)
+
+    def _evaluate(self, key: str, svc: InterviewLLMService, idx: int, row: Optional[BehavioralEvaluation]) -> None:
+        """Run the evaluation of turn ``idx`` here and record it."""
+        turn = svc.chat_history[idx]
+        if row is not None and row.answer:
+            inputs = (row.history, row.question, row.answer)
+        else:
+            inputs = (svc._build_history_string(), turn.question, turn.answer)
+        try:
+            result = svc.evaluate_turn(idx, *inputs)
+        except Exception as e:
+            logger.warning(f"Evaluation of turn {idx + 1} failed again for report {key}: {e}")
+            return
+        metrics.incr("session_store.evaluations_rerun")
+        self._write_evaluations([BehavioralEvaluation(
+            report_id=key, turn=idx, status=EVALUATION_DONE, evaluation=result["evaluation"],
+            coach_tip=result.get("coach_tip") or "", question=inputs[1], answer=inputs[2], history=inputs[0],
+        )])
+
+    def _merge_evaluations(self, key: str, svc: InterviewLLMService) -> None:
+        evaluations = {
+            turn: (status, evaluation, coach_tip)
+            for turn, status, evaluation, coach_tip in BehavioralEvaluation.objects
+            .filter(report_id=key, status=EVALUATION_DONE).values_list("turn", "status", "evaluation", "coach_tip")
+        }
+        with self._lock:
+            evaluations.update(self._flushing.get(key, {}))
+            evaluations.update(self._pending.get(key, {}))
+        for idx, (status, evaluation, coach_tip) in evaluations.items():
+            if status != EVALUATION_DONE:
+                continue
+            if idx < len(svc.chat_history) and not svc.chat_history[idx].evaluation:
+                svc.chat_history[idx].evaluation = evaluation
+                if coach_tip:
+                    svc.chat_history[idx].coach_tip = coach_tip
+
+    @staticmethod
+    def _write(report_id: str, entry: Tuple[int, int, Dict[str, Any]], now) -> None:
+        turns, evaluated, state = entry
+        fields = {"version": STATE_VERSION, "state": state, "turns": turns, "evaluated": evaluated, "updated_at": now}
+        updated = BehavioralSession.objects.filter(
+            Q(turns__lt=turns) | Q(turns=turns, evaluated__lte=evaluated),
+            report_id=report_id,
+        ).update(**fields)
+        if not updated:
+            BehavioralSession.objects.get_or_create(report_id=report_id, defaults=fields)
+
+    @staticmethod
+    def _write_evaluations(rows) -> None:
+        BehavioralEvaluation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["report", "turn"],
+            update_fields=["status", "evaluation", "coach_tip", "updated_at"],
+        )
+
+    def flush(self) -> int:
+        """Write all pending evaluations; returns the number written.
+
+        The batch is written in one statement; if that fails, rows are
+        retried one by one and rows that still fail are dropped.
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._flushing = batch
+        rows = [
+            BehavioralEvaluation(report_id=report_id, turn=turn, status=status, evaluation=evaluation, coach_tip=coach_tip)
+            for report_id, turns in batch.items()
+            for turn, (status, evaluation, coach_tip) in turns.items()
+        ]
+        if not rows:
+            return 0
+        written = len(rows)
+        try:
+            self._write_evaluations(rows)
+        except Exception as e:
+            logger.warning(f"Batch write of {len(rows)} behavioral evaluations failed, writing rows individually: {e}")
+            written = 0
+            for row in rows:
+                try:
+                    self._write_evaluations([row])
+                    written += 1
+                except Exception as row_error:
+                    metrics.incr("session_store.dropped")
+                    logger.error(f"Failed to save evaluation of turn {row.turn} for report {row.report_id}: {row_error}")
+        finally:
+            with self._lock:
+                self._flushing = {}
+        metrics.incr("session_store.flushes")
+        metrics.incr("session_store.rows_written", written)
+        return written
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(settings.BEHAVIORAL_SESSION_FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+            close_old_connections()
+
+
+session_store = BehavioralSessionStore()
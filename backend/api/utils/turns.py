@@ -0,0 +1,102 @@
+"""
+Interview Turns
+===============
+Compact records for interview history: behavioral questions and answers
+(Turn), DSA chat messages (Message) and DSA question/reply pairs (Exchange).
+
+All three are slotted dataclasses, so a turn costs a fixed handful of
+pointers instead of a per-instance dict, and their low-cardinality strings
+(roles, question types, difficulties) are interned so every session shares
+one copy. Each record has a ``to_dict``/``from_dict`` pair matching the dicts
+the API has always exposed, and a row codec (``to_row``/``from_row``) that
+stores fields positionally with trailing empty fields dropped, used where
+state is serialized on every turn (see session_store).
+"""
+
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Record:
+    """Dict and row conversion shared by the turn records."""
+
+    __slots__ = ()
+    _FIELDS = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public dict form; empty fields are omitted."""
+        return {name: value for name in self._FIELDS if (value := getattr(self, name)) is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(**{name: data[name] for name in cls._FIELDS if name in data})
+
+    def to_row(self) -> List[Any]:
+        row = [getattr(self, name) for name in self._FIELDS]
+        while row and row[-1] is None:
+            row.pop()
+        return row
+
+    @classmethod
+    def from_row(cls, row: List[Any]):
+        return cls(*row)
+
+
+def _record(cls):
+    cls = dataclass(slots=True)(cls)
+    cls._FIELDS = tuple(f.name for f in fields(cls))
+    return cls
+
+
+@_record
+class Turn(_Record):
+    """One behavioral question with the candidate's answer and its evaluation."""
+
+    question: str
+    type: str = "behavioral"
+    difficulty: str = "medium"
+    answer: Optional[str] = None
+    evaluation: Optional[Dict[str, Any]] = None
+    coach_tip: Optional[str] = None
+
+    def __post_init__(self):
+        self.type = _intern(self.type)
+        self.difficulty = _intern(self.difficulty)
+
+    @property
+    def score(self):
+        return (self.evaluation or {}).get("score", "N/A")
+
+
+@_record
+class Message(_Record):
+    """One DSA chat message after the session's prompt prefix."""
+
+    role: str
+    content: str
+
+    def __post_init__(self):
+        self.role = _intern(self.role)
+
+
+@_record
+class Exchange(_Record):
+    """One interviewer message and the candidate's reply to it."""
+
+    interviewer: Optional[str] = None
+    candidate: Optional[str] = None
+
+
+def encode(records: Iterable[_Record]) -> List[List[Any]]:
+    """Rows for a list of records."""
+    return [record.to_row() for record in records]
+
+
+def decode(cls, items: Iterable[Any]) -> List[Any]:
+    """Records from rows or from their dict form (older stored state)."""
+    return [cls.from_row(item) if type(item) is list else cls.from_dict(item) for item in items]
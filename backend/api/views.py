@@ -1,9 +1,11 @@
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 import json
 import logging
 import traceback
@@ -25,20 +27,21 @@ from .utils.behavioral_interview import InterviewLLMService
 from .utils.dsa_interview import (
     analyze_pseudocode_initial,
     continue_pseudocode_analysis,
-    final_report as dsa_final_report
+    stream_pseudocode_initial,
+    stream_pseudocode_analysis,
+    get_dsa_question
 )
 from .utils.get_transcript import run_evaluation_stage
 from .utils.resume import (
     ResumeParser)
 from .utils.audio import generate_elevenlabs_audio
-from .utils.scoring import (
-    score_to_rating,
-    calculate_overall_score,
-    determine_overall_recommendation
-)
 from .utils.feedback import generate_enhanced_final_feedback
 from .utils.email_service import email_service
 from .utils.evaluate_interview import evaluate_candidate
+from .utils.combined_report import get_combined_report
+from .utils.metrics import metrics
+from .utils.session_store import session_store
+from .utils import question_pool
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +98,26 @@ def get_optional_field(data, field_name, default=None, field_type=str):
             return default
     return field_type(value) if value else default
 
+class EventStreamRenderer(BaseRenderer):
+    """Lets streaming views accept 'text/event-stream'; errors are still JSON bodies"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset) if data is not None else b''
+
+def sse_event(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events):
+    """Stream server-sent events without proxy buffering"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @api_view(['GET'])
 def job_description_list(request):
     """GET /api/job-descriptions/ - List available job descriptions"""
@@ -173,6 +196,7 @@ def upload_resume(request):
         
         report.resume_text = resume_text
         report.save()
+        question_pool.warm_for_resume(job_description, resume_text)
         
         return success_response({
             'report_id': str(report.id),
@@ -197,7 +221,13 @@ def generate_behavioral_report(request):
             transcript = run_evaluation_stage(audio_bytes, report.job_description.description)
             print(transcript)
             report.transcript = transcript
-            evaluations = evaluate_candidate(report.job_description.description, report.resume_text, transcript)
+            refresh = str(request.data.get('refresh_evaluation', '')).lower() in ('1', 'true', 'yes')
+            evaluations = evaluate_candidate(
+                report.job_description.description,
+                report.resume_text,
+                transcript,
+                use_cache=not refresh
+            )
             print(evaluations)
             report.save()
             
@@ -217,6 +247,142 @@ def generate_behavioral_report(request):
             
 
 
+def _behavioral_question_payload(report, svc, question):
+    return {
+        'report_id': str(report.id),
+        'question': question['question'],
+        'type': question['type'],
+        'difficulty': question['difficulty'],
+        'question_number': len(svc.chat_history),
+        'total_questions': svc.total_questions
+    }
+
+def _load_behavioral_session(request):
+    """Report, session and candidate text for a behavioral answer request"""
+    report_id = validate_uuid(get_required_field(request.data, 'report_id'))
+    report = get_report(report_id)
+    text = get_required_field(request.data, 'answer')
+    svc = session_store.load(report)
+    if svc is None:
+        raise ValueError('No active behavioral session found')
+    return report, svc, text
+
+def _behavioral_side_turn(report, svc, intent):
+    """Clarify / hint turns: no answer is recorded"""
+    if intent == 'clarify':
+        return {'report_id': str(report.id), 'intent': intent, 'message': svc.rephrase_current_question_simple()}
+    return {'report_id': str(report.id), 'intent': intent, 'message': svc.hint_for_current_question()}
+
+def _finish_behavioral_answer(report, svc, result):
+    session_store.save(report.id, svc)
+    if result.get('evaluation_pending'):
+        session_store.save_when_evaluated(report.id, svc)
+    data = {
+        'report_id': str(report.id),
+        'intent': 'answer',
+        'evaluation': result.get('evaluation'),
+        'evaluation_pending': bool(result.get('evaluation_pending')),
+        'coach_tip': result.get('coach_tip'),
+        'is_complete': 'next_question' not in result
+    }
+    if 'next_question' in result:
+        data['next_question'] = _behavioral_question_payload(report, svc, result['next_question'])
+    return data
+
+
+@api_view(['POST'])
+def start_behavioral_interview(request):
+    """POST /api/behavioral/start/ - Start the behavioral text interview and return the first question"""
+    try:
+        report_id = validate_uuid(get_required_field(request.data, 'report_id'))
+        report = get_report(report_id)
+        
+        svc = InterviewLLMService()
+        svc.initialize_interview(report.resume_text, report.position)
+        pooled = question_pool.take(report.job_description, report.resume_text)
+        question = svc.start_with_question(pooled) if pooled else svc.generate_first_question()
+        session_store.save(report.id, svc)
+        
+        return success_response(_behavioral_question_payload(report, svc, question))
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    except Exception as e:
+        return error_response(f'Failed to start behavioral interview: {str(e)}')
+
+
+@api_view(['POST'])
+def answer_behavioral_question(request):
+    """POST /api/behavioral/answer/ - Answer the current behavioral question (or ask to clarify / for a hint)"""
+    try:
+        report, svc, text = _load_behavioral_session(request)
+        intent = svc.detect_intent(text)
+        if intent != 'answer':
+            return success_response(_behavioral_side_turn(report, svc, intent))
+        
+        is_last = len(svc.chat_history) >= svc.total_questions
+        result = svc.evaluate_and_get_next_question(text, generate_next=not is_last, hedge=True)
+        return success_response(_finish_behavioral_answer(report, svc, result))
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    except Exception as e:
+        return error_response(f'Failed to answer behavioral question: {str(e)}')
+
+
+@api_view(['POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def answer_behavioral_question_stream(request):
+    """POST /api/behavioral/answer/stream/ - Streaming (SSE) variant of behavioral/answer"""
+    try:
+        report, svc, text = _load_behavioral_session(request)
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    
+    def events():
+        try:
+            intent = svc.detect_intent(text)
+            if intent != 'answer':
+                yield sse_event('done', _behavioral_side_turn(report, svc, intent))
+                return
+            if len(svc.chat_history) >= svc.total_questions:
+                # Last question: nothing to stream, only the evaluation
+                result = svc.evaluate_and_get_next_question(text, generate_next=False, hedge=True)
+                yield sse_event('done', _finish_behavioral_answer(report, svc, result))
+                return
+            for event in svc.answer_stream(text):
+                if event['type'] == 'token':
+                    yield sse_event('token', {'text': event['text']})
+                else:
+                    yield sse_event('done', _finish_behavioral_answer(report, svc, event))
+        except Exception as e:
+            logger.error(f"Failed to answer behavioral question: {traceback.format_exc()}")
+            yield sse_event('error', {'error': f'Failed to answer behavioral question: {str(e)}'})
+    
+    return sse_response(events())
+
+
+@api_view(['POST'])
+def get_dsa_question_endpoint(request):
+    """POST /api/get-dsa-question/ - Get a DSA question for the report (served from the question bank)"""
+    try:
+        report_id = validate_uuid(get_required_field(request.data, 'report_id'))
+        report = get_report(report_id)
+        role = request.data.get('role') or report.position or 'general'
+        difficulty = request.data.get('difficulty') or 'medium'
+        
+        question = get_dsa_question(role=role, difficulty=difficulty)
+        report.dsa_question = question
+        report.save()
+        
+        return success_response({
+            'report_id': str(report.id),
+            'question': question
+        })
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    except Exception as e:
+        return error_response(f'Failed to get DSA question: {str(e)}')
+
+
 @api_view(['POST'])
 def submit_pseudocode(request):
     """POST /api/submit-pseudocode/ - Submit pseudocode and start analysis conversation"""
@@ -269,6 +435,76 @@ def continue_pseudocode_conversation(request):
         return error_response(f'Failed to continue conversation: {str(e)}')
 
 
+@api_view(['POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def submit_pseudocode_stream(request):
+    """POST /api/submit-pseudocode/stream/ - Streaming (SSE) variant of submit-pseudocode"""
+    try:
+        report_id = validate_uuid(get_required_field(request.data, 'report_id'))
+        report = get_report(report_id)
+        pseudocode = get_required_field(request.data, 'pseudocode')
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    
+    report.dsa_pseudocode = pseudocode
+    question = report.dsa_question
+    role = report.position or 'general'
+    difficulty = question.get('difficulty', 'medium') if question else 'medium'
+    
+    def events():
+        try:
+            for event in stream_pseudocode_initial(pseudocode, question, role=role, difficulty=difficulty):
+                if event['type'] == 'session':
+                    report.dsa_session_idx = event['session_idx']
+                    report.save()
+                elif event['type'] == 'token':
+                    yield sse_event('token', {'text': event['text']})
+                else:
+                    yield sse_event('done', {
+                        'report_id': str(report.id),
+                        'interviewer_question': event['interviewer_question'],
+                        'is_closing': event['is_closing']
+                    })
+        except Exception as e:
+            logger.error(f"Failed to submit pseudocode: {traceback.format_exc()}")
+            yield sse_event('error', {'error': f'Failed to submit pseudocode: {str(e)}'})
+    
+    return sse_response(events())
+
+
+@api_view(['POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def continue_pseudocode_stream(request):
+    """POST /api/continue-pseudocode/stream/ - Streaming (SSE) variant of continue-pseudocode"""
+    try:
+        report_id = validate_uuid(get_required_field(request.data, 'report_id'))
+        report = get_report(report_id)
+        reply = get_required_field(request.data, 'reply')
+    except ValueError as e:
+        return error_response(str(e), status.HTTP_400_BAD_REQUEST, log_error=False)
+    
+    if report.dsa_session_idx < 0:
+        return error_response('No active DSA session found', status.HTTP_400_BAD_REQUEST, log_error=False)
+    
+    def events():
+        try:
+            for event in stream_pseudocode_analysis(report.dsa_session_idx, reply):
+                if event['type'] == 'token':
+                    yield sse_event('token', {'text': event['text']})
+                else:
+                    yield sse_event('done', {
+                        'report_id': str(report.id),
+                        'interviewer_question': event['interviewer_question'],
+                        'is_closing': event['is_closing'],
+                        'ended_by': event.get('ended_by')
+                    })
+        except Exception as e:
+            logger.error(f"Failed to continue conversation: {traceback.format_exc()}")
+            yield sse_event('error', {'error': f'Failed to continue conversation: {str(e)}'})
+    
+    return sse_response(events())
+
+
 @api_view(['POST'])
 def get_combined_final_report(request):
     """POST /api/get-combined-report/ - Get combined report (behavioral + DSA)"""
@@ -276,30 +512,8 @@ def get_combined_final_report(request):
         report_id = validate_uuid(get_required_field(request.data, 'report_id'))
         report = get_report(report_id)
         
-        dsa_report = {}
-        if report.dsa_session_idx >= 0:
-            dsa_report = dsa_final_report(report.dsa_session_idx, return_dict=True)
-            report.dsa_report = dsa_report
-        
-        behavioral_report = report.behavioral_report or {}
-        combined_report = {
-            'behavioral_interview': behavioral_report,
-            'dsa_interview': dsa_report,
-            'overall_recommendation': determine_overall_recommendation(behavioral_report, dsa_report)
-        }
-        
-        # Update report with combined data
-        behavioral_score = behavioral_report.get('overall_score', 0)
-        dsa_score = dsa_report.get('overall_score', 0) if dsa_report else 0
-        overall_score = calculate_overall_score(behavioral_score, dsa_score)
-        
-        report.overall_score = overall_score
-        report.overall_rating = score_to_rating(overall_score)
-        report.strengths = behavioral_report.get('strengths', [])
-        report.areas_for_improvement = behavioral_report.get('areas_for_improvement', [])
-        report.report_data = combined_report
-        report.save()
-        
+        # Rebuilt and saved only when the behavioral report or DSA session changed
+        combined_report = get_combined_report(report)
         combined_report['report_id'] = str(report.id)
         
         return success_response({
@@ -319,7 +533,7 @@ def get_combined_final_report(request):
 def get_all_reports(request):
     """Get all interview reports for recruiter dashboard"""
     try:
-        reports = InterviewReport.objects.all()
+        reports = InterviewReport.objects.prefetch_related('conversation_turns')
         serializer = InterviewReportSerializer(reports, many=True)
         return success_response({
             'success': True,
@@ -341,6 +555,18 @@ def get_report_by_id(request, report_id):
     except Exception as e:
         return error_response(str(e))
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_metrics(request):
+    """GET /api/metrics/ - In-process LLM and background-worker metrics (staff only)"""
+    try:
+        return success_response({
+            'success': True,
+            'metrics': metrics.snapshot()
+        })
+    except Exception as e:
+        return error_response(str(e))
+
 @api_view(['GET'])
 def get_dashboard_statistics(request):
     """Get statistics for recruiter dashboard"""